@@ -5,8 +5,10 @@ from django import forms
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from .models import Profile, SellerProfile, Notification
+from .services import NotificationService
 from .forms import SellerProfileAdminForm
 from .utils import send_seller_approval_email
+from store.services import ProductService
 
 
 class ProfileInline(admin.StackedInline):
@@ -110,6 +112,7 @@ class SellerProfileAdmin(admin.ModelAdmin):
         # Store seller profiles before update
         seller_profiles = list(queryset)
         updated = queryset.update(approval_status='approved')
+        ProductService.refresh_listing([profile.user_id for profile in seller_profiles])
         # Send email to each approved seller (reload from DB to get updated status)
         for seller_profile in seller_profiles:
             seller_profile.refresh_from_db()
@@ -126,6 +129,7 @@ class SellerProfileAdmin(admin.ModelAdmin):
         # Store seller profiles before update
         seller_profiles = list(queryset)
         updated = queryset.update(approval_status='rejected')
+        ProductService.refresh_listing([profile.user_id for profile in seller_profiles])
         # Send email to each rejected seller (reload from DB to get updated status)
         for seller_profile in seller_profiles:
             seller_profile.refresh_from_db()
@@ -142,6 +146,7 @@ class SellerProfileAdmin(admin.ModelAdmin):
         # Store seller profiles before update
         seller_profiles = list(queryset)
         updated = queryset.update(approval_status='suspended')
+        ProductService.refresh_listing([profile.user_id for profile in seller_profiles])
         # Send email to each suspended seller (reload from DB to get updated status)
         for seller_profile in seller_profiles:
             seller_profile.refresh_from_db()
@@ -194,12 +199,22 @@ class NotificationAdmin(admin.ModelAdmin):
     
     actions = ['mark_as_read', 'mark_as_unread']
     
+    def _set_read_in_chunks(self, queryset, is_read, chunk_size=1000):
+        """Update in primary-key chunks so a huge selection never becomes one long-locking UPDATE"""
+        rows = list(queryset.exclude(is_read=is_read).values_list('pk', 'user_id'))
+        updated = 0
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            updated += Notification.objects.filter(pk__in=[pk for pk, _ in chunk]).update(is_read=is_read)
+            NotificationService.invalidate_unread_count([user_id for _, user_id in chunk])
+        return updated
+    
     def mark_as_read(self, request, queryset):
-        updated = queryset.update(is_read=True)
+        updated = self._set_read_in_chunks(queryset, True)
         self.message_user(request, f'{updated} notifications marked as read.')
     mark_as_read.short_description = "Mark selected as read"
     
     def mark_as_unread(self, request, queryset):
-        updated = queryset.update(is_read=False)
+        updated = self._set_read_in_chunks(queryset, False)
         self.message_user(request, f'{updated} notifications marked as unread.')
     mark_as_unread.short_description = "Mark selected as unread"
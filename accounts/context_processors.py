@@ -1,15 +1,16 @@
-from .models import Notification
+from django.utils.functional import SimpleLazyObject
+from .services import NotificationService
 
 
 def notification_count(request):
-    """Context processor to add unread notification count to all templates"""
+    """
+    Context processor to add unread notification count to all templates.
+    Lazy: the cached counter is only read if a template actually uses it.
+    """
     if request.user.is_authenticated:
-        unread_count = Notification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).count()
+        user = request.user
         return {
-            'unread_notifications_count': unread_count
+            'unread_notifications_count': SimpleLazyObject(lambda: NotificationService.get_unread_count(user))
         }
     return {
         'unread_notifications_count': 0
@@ -0,0 +1,32 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from accounts.models import Notification
+from accounts.services import NotificationService
+
+
+class Command(BaseCommand):
+    help = 'Send a notification to all customers (or sellers) using batched inserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--title', type=str, required=True)
+        parser.add_argument('--message', type=str, required=True)
+        parser.add_argument('--link', type=str, default='')
+        parser.add_argument('--type', type=str, default='promotion',
+                            choices=[choice for choice, _ in Notification.NOTIFICATION_TYPES])
+        parser.add_argument('--role', type=str, default='customer', choices=['customer', 'seller', 'all'])
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **kwargs):
+        users = User.objects.filter(is_active=True)
+        if kwargs['role'] != 'all':
+            users = users.filter(profile__role=kwargs['role'])
+
+        created = NotificationService.broadcast(
+            users.values_list('id', flat=True).iterator(chunk_size=kwargs['batch_size']),
+            title=kwargs['title'],
+            message=kwargs['message'],
+            notification_type=kwargs['type'],
+            link=kwargs['link'],
+            batch_size=kwargs['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Sent {created} notifications'))
@@ -0,0 +1,39 @@
+import gzip
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from accounts.services import NotificationService
+
+
+class Command(BaseCommand):
+    help = 'Delete (optionally archive) read notifications older than N days, in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help='Retention period in days (default: 90)')
+        parser.add_argument('--include-unread', action='store_true', help='Also prune unread notifications')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows deleted per statement')
+        parser.add_argument('--archive', type=str, help='Write pruned rows to this gzipped JSON-lines file first')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be pruned')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['days'] < 1:
+            raise CommandError('--days must be at least 1')
+        cutoff = timezone.now() - timedelta(days=kwargs['days'])
+
+        archive = gzip.open(kwargs['archive'], 'at', encoding='utf-8') if kwargs['archive'] else None
+        try:
+            count = NotificationService.prune(
+                cutoff,
+                include_unread=kwargs['include_unread'],
+                chunk_size=kwargs['chunk_size'],
+                archive=archive,
+                dry_run=kwargs['dry_run'],
+            )
+        finally:
+            if archive:
+                archive.close()
+
+        if kwargs['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{count} notifications older than {cutoff:%Y-%m-%d} would be pruned'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Pruned {count} notifications older than {cutoff:%Y-%m-%d}'))
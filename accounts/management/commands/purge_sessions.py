@@ -0,0 +1,33 @@
+import time
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Delete expired django_session rows in small chunks (a non-locking clearsessions)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows deleted per statement')
+        parser.add_argument('--sleep', type=float, default=0, help='Seconds to pause between chunks')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be deleted')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+        expired = Session.objects.filter(expire_date__lt=timezone.now())
+
+        if kwargs['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{expired.count()} expired sessions would be deleted'))
+            return
+
+        total = 0
+        while True:
+            keys = list(expired.values_list('session_key', flat=True)[:kwargs['chunk_size']])
+            if not keys:
+                break
+            total += Session.objects.filter(session_key__in=keys).delete()[0]
+            if kwargs['sleep']:
+                time.sleep(kwargs['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Deleted {total} expired sessions'))
@@ -160,6 +160,11 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created']
+        indexes = [
+            models.Index(fields=['user', 'is_read'], name='notif_user_is_read_idx'),
+            models.Index(fields=['user', '-created', '-id'], name='notif_user_feed_idx'),
+            models.Index(fields=['is_read', 'created'], name='notif_retention_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.title}"
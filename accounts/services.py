@@ -2,12 +2,17 @@
 Service layer for accounts business logic.
 Handles user authentication, profiles, and dashboard data.
 """
-from typing import Optional, Dict, List, Tuple, Any
+import json
+from datetime import datetime
+from typing import Optional, Dict, List, Tuple, Any, Iterable
 from django.contrib.auth.models import User
 from django.db.models import Sum, F, Count, Q, QuerySet
 from django.db import transaction
-from .models import Profile, SellerProfile
+from django.core.cache import cache
+from django.utils import timezone
+from .models import Profile, SellerProfile, Notification
 from orders.models import Order, OrderItem
+from orders.services import SellerStatsService
 
 
 class UserService:
@@ -79,47 +84,30 @@ class SellerAnalyticsService:
         if not seller_profile:
             return {}
         
-        # Optimize queries with select_related and prefetch_related
         products_qs = user.products.all().select_related('category')
         order_items_qs = OrderItem.objects.filter(
             product__seller=user
         ).select_related('order', 'product', 'order__user')
         
-        orders_qs = Order.objects.filter(
-            items__product__seller=user
-        ).distinct().select_related('user')
+        # Totals come from daily rollups plus a live aggregate for today only
+        totals = SellerStatsService.get_seller_totals(user)
         
-        # Calculate metrics in single queries where possible
-        total_products = products_qs.count()
-        total_orders = orders_qs.count()
-        
-        # Aggregate sales and revenue in one query
-        sales_data = order_items_qs.aggregate(
-            total_sales=Sum('quantity'),
-            total_revenue=Sum(F('price') * F('quantity'))
-        )
-        
-        total_sales = sales_data['total_sales'] or 0
-        total_revenue = sales_data['total_revenue'] or 0
-        
-        # Get pending orders count
-        pending_orders = orders_qs.filter(order_status='pending').count()
-        
-        # Get pending shipments
-        pending_shipments = orders_qs.filter(
+        # Orders still waiting for a shipment are a live, narrow query
+        pending_shipments = Order.objects.filter(
+            items__product__seller=user,
             paid=True,
             shiprocket_order_id__isnull=True
-        ).count()
+        ).distinct().count()
         
         return {
             'seller_profile': seller_profile,
             'products': list(products_qs[:10]),
             'order_items': list(order_items_qs[:20]),
-            'total_products': total_products,
-            'total_orders': total_orders,
-            'total_sales': total_sales,
-            'total_revenue': total_revenue,
-            'pending_orders': pending_orders,
+            'total_products': products_qs.count(),
+            'total_orders': totals['total_orders'],
+            'total_sales': totals['total_sales'],
+            'total_revenue': totals['total_revenue'],
+            'pending_orders': totals['orders_pending'],
             'pending_shipments': pending_shipments,
         }
     
@@ -134,36 +122,18 @@ class SellerAnalyticsService:
         Returns:
             Dictionary with analytics data.
         """
-        order_items_qs = OrderItem.objects.filter(
-            product__seller=user
-        ).select_related('order', 'product')
-        
-        orders_qs = Order.objects.filter(
-            items__product__seller=user
-        ).distinct()
-        
-        # Aggregate all metrics in optimized queries
-        sales_data = order_items_qs.aggregate(
-            total_sales=Sum('quantity'),
-            total_revenue=Sum(F('price') * F('quantity'))
-        )
+        totals = SellerStatsService.get_seller_totals(user)
         
-        order_stats = orders_qs.aggregate(
-            total_orders=Count('id'),
-            pending_orders=Count('id', filter=Q(order_status='pending')),
-            completed_orders=Count('id', filter=Q(order_status='completed'))
-        )
-        
-        total_revenue = sales_data['total_revenue'] or 0
-        total_orders = order_stats['total_orders'] or 0
+        total_revenue = totals['total_revenue']
+        total_orders = totals['total_orders']
         average_order_value = total_revenue / total_orders if total_orders > 0 else 0
         
         return {
-            'total_sales': sales_data['total_sales'] or 0,
+            'total_sales': totals['total_sales'],
             'total_revenue': total_revenue,
             'total_orders': total_orders,
-            'pending_orders': order_stats['pending_orders'] or 0,
-            'completed_orders': order_stats['completed_orders'] or 0,
+            'pending_orders': totals['orders_pending'],
+            'completed_orders': totals['orders_delivered'],
             'average_order_value': round(average_order_value, 2),
         }
 
@@ -210,3 +180,227 @@ class CustomerService:
             except Exception:
                 return []
 
+
+
+class NotificationService:
+    """Service for notification counters (cached per user)."""
+    
+    UNREAD_CACHE_TIMEOUT = 60 * 60 * 24  # 1 day; recomputed from the (user, is_read) index on miss
+    FEED_PAGE_SIZE = 20
+    BULK_BATCH_SIZE = 1000
+    
+    @staticmethod
+    def _unread_key(user_id: int) -> str:
+        return f'notif_unread_{user_id}'
+    
+    @staticmethod
+    def get_unread_count(user: User) -> int:
+        """
+        Get the number of unread notifications for a user.
+        
+        Args:
+            user: User instance.
+            
+        Returns:
+            Unread notification count.
+        """
+        if not user or not user.is_authenticated:
+            return 0
+        key = NotificationService._unread_key(user.pk)
+        count = cache.get(key)
+        if count is None:
+            count = Notification.objects.filter(user=user, is_read=False).count()
+            cache.set(key, count, NotificationService.UNREAD_CACHE_TIMEOUT)
+        return max(0, count)
+    
+    @staticmethod
+    def adjust_unread_count(user_id: int, delta: int) -> None:
+        """
+        Increment/decrement a cached counter; a missing counter is left to be recomputed.
+        
+        Args:
+            user_id: User primary key.
+            delta: Amount to add (negative to subtract).
+        """
+        if not delta:
+            return
+        key = NotificationService._unread_key(user_id)
+        try:
+            if delta > 0:
+                cache.incr(key, delta)
+            else:
+                cache.decr(key, -delta)
+        except ValueError:
+            # Not cached yet: nothing to keep in sync
+            pass
+    
+    @staticmethod
+    def invalidate_unread_count(user_ids: List[int]) -> None:
+        """
+        Drop cached counters so they are recomputed on next read.
+        
+        Args:
+            user_ids: User primary keys.
+        """
+        cache.delete_many([NotificationService._unread_key(user_id) for user_id in set(user_ids)])
+    
+    @staticmethod
+    def mark_as_read(user: User, notification_ids: Optional[List[int]] = None) -> int:
+        """
+        Mark a user's notifications as read and update the counter.
+        
+        Args:
+            user: User instance.
+            notification_ids: Specific notifications (default: all unread).
+            
+        Returns:
+            Number of notifications marked as read.
+        """
+        queryset = Notification.objects.filter(user=user, is_read=False)
+        if notification_ids is not None:
+            queryset = queryset.filter(pk__in=notification_ids)
+        updated = queryset.update(is_read=True)
+        NotificationService.adjust_unread_count(user.pk, -updated)
+        return updated
+    
+    @staticmethod
+    def notify(user: User, title: str, message: str, notification_type: str = 'system', link: str = '') -> Notification:
+        """
+        Create a single notification.
+        
+        Args:
+            user: Recipient.
+            title: Notification title.
+            message: Notification body.
+            notification_type: One of Notification.NOTIFICATION_TYPES.
+            link: Optional link to related page.
+            
+        Returns:
+            Created Notification instance.
+        """
+        return Notification.objects.create(
+            user=user,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            link=link
+        )
+    
+    @staticmethod
+    def broadcast(user_ids: Iterable[int], title: str, message: str, notification_type: str = 'promotion',
+                  link: str = '', batch_size: Optional[int] = None) -> int:
+        """
+        Fan a notification out to many users with batched bulk_create.
+        
+        Args:
+            user_ids: Recipient user primary keys (an iterator is fine).
+            title: Notification title.
+            message: Notification body.
+            notification_type: One of Notification.NOTIFICATION_TYPES.
+            link: Optional link to related page.
+            batch_size: Rows per INSERT (default BULK_BATCH_SIZE).
+            
+        Returns:
+            Number of notifications created.
+        """
+        batch_size = batch_size or NotificationService.BULK_BATCH_SIZE
+        created = 0
+        batch = []
+        
+        def flush():
+            # bulk_create skips signals, so counters are dropped per batch instead
+            Notification.objects.bulk_create([
+                Notification(user_id=user_id, notification_type=notification_type,
+                             title=title, message=message, link=link)
+                for user_id in batch
+            ])
+            NotificationService.invalidate_unread_count(batch)
+        
+        for user_id in user_ids:
+            batch.append(user_id)
+            if len(batch) >= batch_size:
+                flush()
+                created += len(batch)
+                batch = []
+        if batch:
+            flush()
+            created += len(batch)
+        return created
+    
+    @staticmethod
+    def encode_cursor(notification: Notification) -> str:
+        # ISO format keeps full microsecond precision (a float timestamp does not)
+        return f'{notification.created.isoformat()}_{notification.pk}'
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+        try:
+            created, pk = cursor.rsplit('_', 1)
+            created = datetime.fromisoformat(created)
+            if timezone.is_naive(created):
+                created = timezone.make_aware(created)
+            return created, int(pk)
+        except (ValueError, AttributeError):
+            return None
+    
+    @staticmethod
+    def get_feed(user: User, cursor: Optional[str] = None, limit: Optional[int] = None) -> Tuple[List[Notification], Optional[str]]:
+        """
+        Keyset-paginated notification feed, newest first.
+        
+        Args:
+            user: User instance.
+            cursor: Opaque cursor from a previous page (None for the first page).
+            limit: Page size (default FEED_PAGE_SIZE).
+            
+        Returns:
+            Tuple of (notifications, next_cursor or None when there are no more).
+        """
+        limit = limit or NotificationService.FEED_PAGE_SIZE
+        queryset = Notification.objects.filter(user=user).order_by('-created', '-id')
+        position = NotificationService.decode_cursor(cursor) if cursor else None
+        if position:
+            created, pk = position
+            queryset = queryset.filter(Q(created__lt=created) | Q(created=created, id__lt=pk))
+        
+        items = list(queryset[:limit + 1])
+        next_cursor = NotificationService.encode_cursor(items[limit - 1]) if len(items) > limit else None
+        return items[:limit], next_cursor
+    
+    @staticmethod
+    def prune(older_than: datetime, include_unread: bool = False, chunk_size: int = 1000,
+              archive=None, dry_run: bool = False) -> int:
+        """
+        Delete old notifications in primary-key chunks so no single statement locks the table for long.
+        
+        Args:
+            older_than: Delete notifications created before this time.
+            include_unread: Also delete unread notifications (default: read only).
+            chunk_size: Rows per DELETE.
+            archive: Optional writable text file; each row is written as a JSON line before deletion.
+            dry_run: Only count matching rows.
+            
+        Returns:
+            Number of notifications deleted (or that would be deleted).
+        """
+        queryset = Notification.objects.filter(created__lt=older_than)
+        if not include_unread:
+            queryset = queryset.filter(is_read=True)
+        if dry_run:
+            return queryset.count()
+        
+        deleted = 0
+        while True:
+            chunk = list(queryset.order_by('pk').values(
+                'id', 'user_id', 'notification_type', 'title', 'message', 'link', 'is_read', 'created'
+            )[:chunk_size])
+            if not chunk:
+                break
+            if archive is not None:
+                for row in chunk:
+                    archive.write(json.dumps(row, default=str) + '\n')
+            with transaction.atomic():
+                # post_delete keeps unread counters in sync when unread rows are pruned
+                Notification.objects.filter(pk__in=[row['id'] for row in chunk]).delete()
+            deleted += len(chunk)
+        return deleted
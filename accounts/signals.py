@@ -1,7 +1,9 @@
 """Signals for accounts app - handle email notifications"""
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
-from .models import SellerProfile
+from .models import SellerProfile, Notification
+from .services import NotificationService
 from .utils import send_seller_approval_email
 
 # Track previous approval status to detect changes
@@ -38,3 +40,22 @@ def send_seller_status_email(sender, instance, created, **kwargs):
         if instance.pk in _previous_seller_status:
             del _previous_seller_status[instance.pk]
 
+
+
+@receiver(post_save, sender=Notification)
+def update_unread_count_on_save(sender, instance, created, **kwargs):
+    """Keep the cached unread counter in step with notification writes"""
+    user_id = instance.user_id
+    if created:
+        if not instance.is_read:
+            transaction.on_commit(lambda: NotificationService.adjust_unread_count(user_id, 1))
+    else:
+        # is_read may have flipped either way (e.g. admin list_editable)
+        transaction.on_commit(lambda: NotificationService.invalidate_unread_count([user_id]))
+
+
+@receiver(post_delete, sender=Notification)
+def update_unread_count_on_delete(sender, instance, **kwargs):
+    user_id = instance.user_id
+    if not instance.is_read:
+        transaction.on_commit(lambda: NotificationService.adjust_unread_count(user_id, -1))
@@ -1,3 +1,58 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from benchmarks.seed import seed
+from store.models import Product
+
+
+class HybridSessionTests(TestCase):
+    """utils.sessions: signed cookie for anonymous browsing, server rows once state matters."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(sellers=1, products=1, users=0, categories=1)
+        cls.product = Product.objects.get()
+
+    def test_anonymous_browsing_writes_no_session_rows(self):
+        self.client.get(reverse('store:home'))
+        self.client.get(reverse('store:product_detail', args=[self.product.slug]))
+        self.assertEqual(Session.objects.count(), 0)
+
+    def test_empty_cart_does_not_touch_the_session(self):
+        response = self.client.get(reverse('store:product_detail', args=[self.product.slug]))
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_crawler_get_skips_session_handling(self):
+        response = self.client.get(reverse('store:home'), HTTP_USER_AGENT='Mozilla/5.0 (compatible; Googlebot/2.1)')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertTrue(response.wsgi_request.session_skipped)
+
+    def test_cart_moves_session_to_server_and_keeps_it(self):
+        self.client.post(reverse('cart:cart_add', args=[self.product.id]), {'quantity': 1})
+        self.assertEqual(Session.objects.count(), 1)
+        self.assertEqual(len(self.client.session['cart']), 1)
+
+        self.client.get(reverse('store:home'))
+        self.assertEqual(len(self.client.session['cart']), 1)
+
+    def test_login_uses_server_session(self):
+        User.objects.create_user('shopper', password='pw-12345')
+        self.client.login(username='shopper', password='pw-12345')
+        self.assertEqual(Session.objects.count(), 1)
+
+    def test_purge_sessions_deletes_only_expired_rows(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f'expired{i:025d}', session_data='', expire_date=now - timedelta(days=1))
+        Session.objects.create(session_key='live' + '0' * 28, session_data='', expire_date=now + timedelta(days=1))
 
-# Create your tests here.
+        call_command('purge_sessions', chunk_size=2, stdout=open('/dev/null', 'w'))
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live' + '0' * 28])
@@ -38,6 +38,7 @@ urlpatterns = [
     path('customer/profile/', views.customer_profile, name='customer_profile'),
     path('customer/orders/', views.customer_orders, name='customer_orders'),
     path('customer/notifications/', views.customer_notifications, name='customer_notifications'),
+    path('customer/notifications/mark-read/', views.mark_notifications_read, name='mark_notifications_read'),
     path('customer/addresses/', views.customer_addresses, name='customer_addresses'),
     
     # ============================================================================
@@ -9,7 +9,6 @@ from django.contrib import messages
 from django.core.mail import send_mail
 from django.conf import settings
 from django.db import models
-from django.core.exceptions import FieldError
 from django.utils import timezone
 from django.http import JsonResponse
 from functools import wraps
@@ -18,10 +17,12 @@ import json
 from .models import Profile, SellerProfile, PasswordResetOTP, RegistrationOTP
 from .forms import CustomerRegistrationForm, SellerRegistrationForm, ProfileUpdateForm, SellerProfileUpdateForm
 from orders.models import Order, OrderItem
+from .services import SellerAnalyticsService, NotificationService
+from utils.db import replica_reads
 
 
 # AJAX: Check if email is already taken
-from django.views.decorators.http import require_GET
+from django.views.decorators.http import require_GET, require_POST
 
 @require_GET
 def check_email_taken(request):
@@ -504,16 +505,8 @@ def customer_dashboard(request):
     # Get customer data
     orders = Order.objects.filter(user=request.user).order_by('-created')[:10]
     
-    # Get notifications
-    notifications = []
-    if hasattr(request.user, 'notifications'):
-        # Notification model usually uses `created`; some installs may use `created_at`.
-        # Try ordering by the canonical `created` first, then fall back to `created_at`.
-        try:
-            notifications = request.user.notifications.all().order_by('-created')[:10]
-        except FieldError:
-            # Fallback for different notification implementations
-            notifications = request.user.notifications.all().order_by('-created_at')[:10]
+    # Latest notifications (first page of the feed)
+    notifications, _ = NotificationService.get_feed(request.user, limit=10)
     
     context = {
         'orders': orders,
@@ -581,22 +574,27 @@ def customer_notifications(request):
         messages.error(request, 'Access denied. This is a customer-only area.')
         return redirect('accounts:seller_dashboard')
     
-    notifications = []
-    if hasattr(request.user, 'notifications'):
-        # Notification model usually uses `created`; some installs may use `created_at`.
-        try:
-            notifications = request.user.notifications.all().order_by('-created')
-        except FieldError:
-            notifications = request.user.notifications.all().order_by('-created_at')
+    # Keyset pagination: ?before=<cursor> loads the next (older) page
+    notifications, next_cursor = NotificationService.get_feed(request.user, cursor=request.GET.get('before'))
     
     context = {
         'notifications': notifications,
+        'next_cursor': next_cursor,
         'profile': request.user.profile,
         'current_page': 'notifications',
     }
     return render(request, 'accounts/customer_dashboard.html', context)
 
 
+@login_required
+@require_POST
+def mark_notifications_read(request):
+    """Mark the posted notification ids (or all unread ones) as read"""
+    ids = [int(pk) for pk in request.POST.getlist('notification_ids') if pk.isdigit()]
+    NotificationService.mark_as_read(request.user, ids or None)
+    return redirect('accounts:customer_notifications')
+
+
 @login_required
 def customer_addresses(request):
     """Customer saved addresses"""
@@ -638,49 +636,19 @@ def seller_dashboard(request):
     if not seller_profile.is_approved:
         messages.warning(request, f'Your seller account is {seller_profile.get_approval_status_display()}.')
     
-    # Get seller's products (optimized query)
-    products = request.user.products.select_related('category')[:10] if hasattr(request.user, 'products') else []
-    
-    # Get seller's orders (optimized with select_related and prefetch_related)
-    order_items = OrderItem.objects.filter(
-        product__seller=request.user
-    ).select_related('order', 'product', 'order__user')
-    
-    orders = Order.objects.filter(
-        items__product__seller=request.user
-    ).distinct().select_related('user').prefetch_related('items', 'items__product')
-    
-    # Calculate analytics (optimized - combine aggregations)
-    total_products = request.user.products.count() if hasattr(request.user, 'products') else 0
-    
-    # Single query for sales and revenue
-    sales_data = order_items.aggregate(
-        total_sales=models.Sum('quantity'),
-        total_revenue=models.Sum(models.F('price') * models.F('quantity'))
-    )
-    total_sales = sales_data['total_sales'] or 0
-    total_revenue = sales_data['total_revenue'] or 0
-    
-    # Optimize order counts
-    order_counts = orders.aggregate(
-        total_orders=models.Count('id'),
-        pending_orders=models.Count('id', filter=models.Q(order_status='pending')),
-        pending_shipments=models.Count('id', filter=models.Q(paid=True, shiprocket_order_id__isnull=True))
-    )
-    total_orders = order_counts['total_orders'] or 0
-    pending_orders = order_counts['pending_orders'] or 0
-    pending_shipments = order_counts['pending_shipments'] or 0
+    # Totals come from SellerDailyStats rollups plus today's live delta
+    dashboard_data = SellerAnalyticsService.get_seller_dashboard_data(request.user)
     
     context = {
         'seller_profile': seller_profile,
-        'products': products,
-        'order_items': order_items[:20],
-        'total_products': total_products,
-        'total_orders': total_orders,
-        'total_sales': total_sales,
-        'total_revenue': total_revenue,
-        'pending_orders': pending_orders,
-        'pending_shipments': pending_shipments,
+        'products': dashboard_data['products'],
+        'order_items': dashboard_data['order_items'],
+        'total_products': dashboard_data['total_products'],
+        'total_orders': dashboard_data['total_orders'],
+        'total_sales': dashboard_data['total_sales'],
+        'total_revenue': dashboard_data['total_revenue'],
+        'pending_orders': dashboard_data['pending_orders'],
+        'pending_shipments': dashboard_data['pending_shipments'],
     }
     return render(request, 'accounts/seller_dashboard.html', context)
 
@@ -724,6 +692,7 @@ def seller_orders(request):
 
 
 @login_required
+@replica_reads
 def seller_analytics(request):
     """Seller analytics and insights"""
     if not hasattr(request.user, 'profile'):
@@ -733,23 +702,7 @@ def seller_analytics(request):
         messages.error(request, 'Access denied. Seller account required.')
         return redirect('accounts:customer_dashboard')
     
-    order_items = OrderItem.objects.filter(product__seller=request.user)
-    orders = Order.objects.filter(items__product__seller=request.user).distinct()
-    
-    # Calculate detailed analytics
-    analytics = {
-        'total_sales': order_items.aggregate(total=models.Sum('quantity'))['total'] or 0,
-        'total_revenue': order_items.aggregate(
-            total=models.Sum(models.F('price') * models.F('quantity'))
-        )['total'] or 0,
-        'total_orders': orders.count(),
-        'pending_orders': orders.filter(order_status='pending').count(),
-        'completed_orders': orders.filter(order_status='completed').count(),
-        'average_order_value': 0,
-    }
-    
-    if analytics['total_orders'] > 0:
-        analytics['average_order_value'] = analytics['total_revenue'] / analytics['total_orders']
+    analytics = SellerAnalyticsService.get_seller_analytics(request.user)
     
     context = {
         'analytics': analytics,
@@ -0,0 +1,7 @@
+"""
+Load benchmarks for the storefront and checkout hot paths.
+
+Scenarios in scenarios.py are shared by the `run_benchmarks` management
+command (in-process, reports latency percentiles and queries per request)
+and locustfile.py (concurrent load against a running server).
+"""
@@ -0,0 +1,60 @@
+"""
+Locust load profile built from the shared benchmark scenarios.
+
+Seed data first (`python manage.py run_benchmarks --iterations 0`), start the
+site and the fake providers with FAKE_PROVIDERS_ENABLED=True, then:
+
+    locust -f benchmarks/locustfile.py --host http://127.0.0.1:8000
+
+Locust is not a runtime dependency: `pip install locust` where you run it.
+"""
+import os
+import random
+import sys
+
+from locust import HttpUser, between, task
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce.settings')
+
+import django  # noqa: E402
+django.setup()
+
+from benchmarks.scenarios import DEFAULT_WEIGHTS, SCENARIOS, ScenarioContext  # noqa: E402
+from benchmarks.seed import load_targets  # noqa: E402
+
+TARGETS = load_targets()
+
+
+class StorefrontUser(HttpUser):
+    """Anonymous shopper following the production traffic mix"""
+
+    wait_time = between(0.5, 2)
+
+    def on_start(self):
+        self.ctx = ScenarioContext(
+            product_ids=TARGETS['product_ids'],
+            product_slugs=TARGETS['product_slugs'],
+            category_slugs=TARGETS['category_slugs'],
+            rng=random.Random(),
+        )
+        # Prime the CSRF cookie for the POST steps
+        self.client.get('/', name='home')
+
+    @task
+    def run_scenario(self):
+        names = list(DEFAULT_WEIGHTS)
+        scenario = random.choices(names, weights=[DEFAULT_WEIGHTS[n] for n in names])[0]
+        for step in SCENARIOS[scenario]:
+            path, data = step.build(self.ctx)
+            headers = {'X-CSRFToken': self.client.cookies.get('csrftoken', '')}
+            if step.ajax:
+                headers['X-Requested-With'] = 'XMLHttpRequest'
+            if step.method == 'POST':
+                response = self.client.post(path, data=data, headers=headers, name=step.name,
+                                            allow_redirects=False)
+            else:
+                response = self.client.get(path, params=data, headers=headers, name=step.name,
+                                           allow_redirects=False)
+            if step.capture:
+                step.capture(self.ctx, response.text)
@@ -0,0 +1,173 @@
+"""
+In-process benchmark runner.
+
+Replays scenarios through django.test.Client, timing each request and
+counting the SQL it issues, then summarises p50/p95/p99 latency, queries
+per request and throughput per step.
+"""
+import math
+import random
+import time
+from typing import Dict, Iterable, List, Optional
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from .scenarios import SCENARIOS, ScenarioContext
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (no interpolation, matches what locust reports)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class StepStats:
+    """Samples collected for one scenario step"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies_ms: List[float] = []
+        self.queries: List[int] = []
+        self.errors = 0
+
+    def add(self, latency_ms: float, queries: int, ok: bool) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.queries.append(queries)
+        if not ok:
+            self.errors += 1
+
+    def summary(self) -> Dict[str, float]:
+        count = len(self.latencies_ms)
+        return {
+            'requests': count,
+            'errors': self.errors,
+            'mean_ms': round(sum(self.latencies_ms) / count, 2) if count else 0,
+            'p50_ms': round(percentile(self.latencies_ms, 50), 2),
+            'p95_ms': round(percentile(self.latencies_ms, 95), 2),
+            'p99_ms': round(percentile(self.latencies_ms, 99), 2),
+            'mean_queries': round(sum(self.queries) / count, 2) if count else 0,
+            'max_queries': max(self.queries) if self.queries else 0,
+        }
+
+
+class BenchmarkRunner:
+    """Drive scenarios sequentially against the local Django stack"""
+
+    def __init__(self, targets: Dict[str, List], iterations: int = 50, warmup: int = 5,
+                 authenticated_ratio: float = 0.5, seed_value: int = 42):
+        self.targets = targets
+        self.iterations = iterations
+        self.warmup = warmup
+        self.authenticated_ratio = authenticated_ratio
+        self.rng = random.Random(seed_value)
+        self.stats: Dict[str, StepStats] = {}
+        self.wall_seconds = 0.0
+        self.scenario_wall_seconds: Dict[str, float] = {}
+
+    def _new_client(self) -> Client:
+        client = Client()
+        user_ids = self.targets.get('user_ids') or []
+        if user_ids and self.rng.random() < self.authenticated_ratio:
+            client.force_login(User.objects.get(pk=self.rng.choice(user_ids)))
+        return client
+
+    def _context(self) -> ScenarioContext:
+        return ScenarioContext(
+            product_ids=self.targets['product_ids'],
+            product_slugs=self.targets['product_slugs'],
+            category_slugs=self.targets['category_slugs'],
+            rng=random.Random(self.rng.random()),
+        )
+
+    def _run_once(self, scenario: str, record: bool) -> None:
+        client = self._new_client()
+        ctx = self._context()
+        for step in SCENARIOS[scenario]:
+            path, data = step.build(ctx)
+            extra = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'} if step.ajax else {}
+            request = client.post if step.method == 'POST' else client.get
+
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = request(path, data or {}, **extra)
+                elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+            if step.capture:
+                step.capture(ctx, response.content.decode('utf-8', errors='ignore'))
+            if record:
+                stats = self.stats.setdefault(f'{scenario}:{step.name}', StepStats(step.name))
+                ok = response.status_code < 400
+                if step.expect_redirect:
+                    ok = ok and step.expect_redirect in response.get('Location', '')
+                stats.add(elapsed_ms, len(captured.captured_queries), ok)
+
+    def run(self, scenarios: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Run each scenario `warmup` times unrecorded, then `iterations` times.
+
+        Args:
+            scenarios: Scenario names from SCENARIOS.
+
+        Returns:
+            Mapping of "scenario:step" to summary statistics.
+        """
+        scenarios = list(scenarios)
+        for scenario in scenarios:
+            for _ in range(self.warmup):
+                self._run_once(scenario, record=False)
+
+        started = time.perf_counter()
+        for scenario in scenarios:
+            scenario_started = time.perf_counter()
+            for _ in range(self.iterations):
+                self._run_once(scenario, record=True)
+            self.scenario_wall_seconds[scenario] = time.perf_counter() - scenario_started
+        self.wall_seconds = time.perf_counter() - started
+
+        return {key: stats.summary() for key, stats in self.stats.items()}
+
+    @property
+    def throughput(self) -> float:
+        """Requests per second of wall-clock time across the whole run."""
+        total = sum(len(stats.latencies_ms) for stats in self.stats.values())
+        return round(total / self.wall_seconds, 2) if self.wall_seconds else 0.0
+
+    def scenario_throughput(self) -> Dict[str, float]:
+        """Completed scenario runs per second of wall-clock time, per scenario."""
+        return {
+            scenario: round(self.iterations / seconds, 2) if seconds else 0.0
+            for scenario, seconds in self.scenario_wall_seconds.items()
+        }
+
+
+def compare(current: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            max_regression_pct: float, ignore_latency: bool = False) -> List[str]:
+    """
+    List regressions of p95 latency or mean queries beyond the allowed percentage.
+
+    Args:
+        current: Results from this run.
+        baseline: Results from a previous run (same JSON layout).
+        max_regression_pct: Allowed increase, e.g. 20 for +20%.
+        ignore_latency: Only compare query counts (for noisy CI machines).
+
+    Returns:
+        Human readable regression descriptions (empty if none).
+    """
+    problems = []
+    metrics = ['mean_queries'] if ignore_latency else ['p95_ms', 'mean_queries']
+    for key, result in current.items():
+        previous: Optional[Dict[str, float]] = baseline.get(key)
+        if not previous:
+            continue
+        for metric in metrics:
+            before, after = previous.get(metric, 0), result.get(metric, 0)
+            if before and after > before * (1 + max_regression_pct / 100.0):
+                problems.append(f'{key} {metric}: {before} -> {after}')
+    return problems
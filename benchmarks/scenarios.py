@@ -0,0 +1,117 @@
+"""
+Benchmark scenarios.
+
+A scenario is an ordered list of Steps. Each step builds its request from a
+ScenarioContext so the same definitions can be replayed by the in-process
+runner (django.test.Client) and by locust (HTTP against a live server).
+Paths are literal so locust does not need the URLconf loaded.
+"""
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+CASHFREE_ORDER_ID_RE = re.compile(r'order_[0-9a-f]{16}')
+
+
+@dataclass
+class ScenarioContext:
+    """Per virtual-user state: seeded targets plus whatever earlier steps captured"""
+    product_ids: List[int]
+    product_slugs: List[str]
+    category_slugs: List[str]
+    rng: random.Random = field(default_factory=random.Random)
+    state: Dict[str, Any] = field(default_factory=dict)
+
+    def product_id(self) -> int:
+        return self.rng.choice(self.product_ids)
+
+    def product_slug(self) -> str:
+        return self.rng.choice(self.product_slugs)
+
+    def category_slug(self) -> str:
+        return self.rng.choice(self.category_slugs)
+
+
+@dataclass
+class Step:
+    """One request in a scenario"""
+    name: str
+    method: str
+    build: Callable[[ScenarioContext], Tuple[str, Optional[dict]]]
+    ajax: bool = False
+    capture: Optional[Callable[[ScenarioContext, str], None]] = None
+    # Redirect target that marks success; checkout views redirect on failure too
+    expect_redirect: Optional[str] = None
+
+
+CHECKOUT_FORM = {
+    'first_name': 'Bench',
+    'last_name': 'User',
+    'email': 'bench@example.com',
+    'address': '1 Load Test Road',
+    'city': 'Mumbai',
+    'state': 'Maharashtra',
+    'zipcode': '400001',
+    'phone': '9999999999',
+}
+
+
+def _capture_cashfree_order(ctx: ScenarioContext, content: str) -> None:
+    match = CASHFREE_ORDER_ID_RE.search(content)
+    ctx.state['cashfree_order_id'] = match.group(0) if match else None
+
+
+def _filtered_list(ctx: ScenarioContext):
+    params = ctx.rng.choice([
+        {'min_price': '100', 'max_price': '1500', 'sort': 'price'},
+        {'in_stock': 'true', 'sort': '-created'},
+        {'featured': 'true'},
+        {'major_category': 'best_selling', 'page': str(ctx.rng.randint(1, 3))},
+        {'q': 'bench'},
+    ])
+    return f'/products/{ctx.category_slug()}/', params
+
+
+CART_ADD = Step('cart_add', 'POST', lambda ctx: (f'/cart/add/{ctx.product_id()}/', {'quantity': '1'}), ajax=True)
+
+SCENARIOS: Dict[str, List[Step]] = {
+    'home': [
+        Step('home', 'GET', lambda ctx: ('/', None)),
+    ],
+    'product_list': [
+        Step('product_list', 'GET', lambda ctx: ('/products/', None)),
+        Step('product_list_filtered', 'GET', _filtered_list),
+    ],
+    'product_detail': [
+        Step('product_detail', 'GET', lambda ctx: (f'/product/{ctx.product_slug()}/', None)),
+    ],
+    'cart_add': [
+        CART_ADD,
+    ],
+    'checkout_cod': [
+        CART_ADD,
+        Step('checkout_page', 'GET', lambda ctx: ('/orders/checkout/', None)),
+        Step('checkout_cod', 'POST', lambda ctx: ('/orders/checkout/', dict(CHECKOUT_FORM, payment='cod')),
+             expect_redirect='/orders/confirmation/'),
+    ],
+    'checkout_cashfree': [
+        CART_ADD,
+        Step('checkout_cashfree', 'POST', lambda ctx: ('/orders/checkout/', dict(CHECKOUT_FORM, payment='cashfree')),
+             capture=_capture_cashfree_order),
+        Step('cashfree_return', 'GET',
+             lambda ctx: ('/orders/cashfree/return/', {'order_id': ctx.state.get('cashfree_order_id') or ''}),
+             expect_redirect='/orders/confirmation/'),
+    ],
+}
+
+# Relative weights used when mixing scenarios (roughly our production traffic shape)
+DEFAULT_WEIGHTS: Dict[str, int] = {
+    'home': 30,
+    'product_list': 25,
+    'product_detail': 30,
+    'cart_add': 8,
+    'checkout_cod': 4,
+    'checkout_cashfree': 3,
+}
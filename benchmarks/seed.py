@@ -0,0 +1,118 @@
+"""
+Deterministic seed data for benchmarks.
+
+Everything created here is prefixed with `bench` so it can be found again
+(targets for scenarios) and removed with `flush()`.
+"""
+import random
+from decimal import Decimal
+from typing import Dict, List
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from accounts.models import SellerProfile
+from store.models import Category, Product
+
+PREFIX = 'bench'
+
+
+@transaction.atomic
+def seed(sellers: int = 5, products: int = 500, users: int = 50, categories: int = 8, seed_value: int = 42) -> Dict[str, int]:
+    """
+    Create approved sellers, approved products and customers (idempotent).
+
+    Args:
+        sellers: Number of approved sellers.
+        products: Total number of products spread across sellers.
+        users: Number of customer accounts.
+        categories: Number of categories.
+        seed_value: RNG seed so runs are comparable.
+
+    Returns:
+        Dictionary with the number of rows created per model.
+    """
+    rng = random.Random(seed_value)
+    created = {'categories': 0, 'sellers': 0, 'products': 0, 'users': 0}
+
+    category_objs = []
+    for i in range(categories):
+        category, was_created = Category.objects.get_or_create(
+            slug=f'{PREFIX}-category-{i}', defaults={'name': f'Bench Category {i}'}
+        )
+        category_objs.append(category)
+        created['categories'] += int(was_created)
+
+    seller_users = []
+    for i in range(sellers):
+        user, was_created = User.objects.get_or_create(
+            username=f'{PREFIX}_seller_{i}', defaults={'email': f'{PREFIX}_seller_{i}@example.com'}
+        )
+        if was_created:
+            user.profile.role = 'seller'
+            user.profile.save()
+            created['sellers'] += 1
+        SellerProfile.objects.update_or_create(user=user, defaults={
+            'business_name': f'Bench Seller {i}',
+            'business_address': '1 Load Test Road',
+            'business_phone': '9999999999',
+            'approval_status': 'approved',
+        })
+        seller_users.append(user)
+
+    existing = Product.objects.filter(sku__startswith=f'{PREFIX.upper()}-').count()
+    new_products = []
+    for i in range(existing, products):
+        price = Decimal(rng.randint(99, 2499))
+        new_products.append(Product(
+            seller=seller_users[i % len(seller_users)],
+            category=category_objs[i % len(category_objs)],
+            name=f'Bench Product {i}',
+            slug=f'{PREFIX}-product-{i}',
+            sku=f'{PREFIX.upper()}-{i:06d}',
+            description=f'Bench product {i} used for load testing.',
+            price=price,
+            compare_price=price + rng.randint(0, 500),
+            stock=1_000_000,
+            available=True,
+            approved=True,
+            is_listable=True,  # bulk_create skips save(); the seeded sellers are approved
+            featured=rng.random() < 0.1,
+            major_category=rng.choice(['new_arrivals', 'featured', 'best_selling', 'none']),
+        ))
+    Product.objects.bulk_create(new_products, batch_size=500)
+    created['products'] = len(new_products)
+
+    for i in range(users):
+        _, was_created = User.objects.get_or_create(
+            username=f'{PREFIX}_user_{i}', defaults={'email': f'{PREFIX}_user_{i}@example.com'}
+        )
+        created['users'] += int(was_created)
+
+    return created
+
+
+def load_targets() -> Dict[str, List]:
+    """
+    Collect ids/slugs of seeded data for scenario contexts.
+
+    Returns:
+        Dictionary with product_ids, product_slugs, category_slugs and user_ids.
+    """
+    products = Product.objects.filter(sku__startswith=f'{PREFIX.upper()}-')
+    return {
+        'product_ids': list(products.values_list('id', flat=True)),
+        'product_slugs': list(products.values_list('slug', flat=True)),
+        'category_slugs': list(Category.objects.filter(slug__startswith=f'{PREFIX}-').values_list('slug', flat=True)),
+        'user_ids': list(User.objects.filter(username__startswith=f'{PREFIX}_user_').values_list('id', flat=True)),
+    }
+
+
+@transaction.atomic
+def flush() -> None:
+    """Remove all benchmark data (orders cascade with their users/products)."""
+    from orders.models import Order
+    Order.objects.filter(email__endswith='bench@example.com').delete()
+    Product.objects.filter(sku__startswith=f'{PREFIX.upper()}-').delete()
+    Category.objects.filter(slug__startswith=f'{PREFIX}-').delete()
+    User.objects.filter(username__startswith=f'{PREFIX}_').delete()
@@ -1,3 +1,32 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from .models import BlogPost
+
+
+class BlogDetailConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create_user('author')
+        self.post = BlogPost.objects.create(title='Skin Care Basics', author=author, content='Cleanse daily.')
+
+    def test_returns_304_until_a_post_changes(self):
+        url = reverse('blog:post_detail', args=[self.post.slug])
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        self.post.content = 'Cleanse twice daily.'
+        self.post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertContains(response, 'Cleanse twice daily.')
+
+    def test_unpublished_post_is_not_validated(self):
+        self.post.published = False
+        self.post.save()
+        url = reverse('blog:post_detail', args=[self.post.slug])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='*').status_code, 404)
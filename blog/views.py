@@ -1,7 +1,11 @@
 from django.shortcuts import render, get_object_or_404
 from django.core.paginator import Paginator
+from django.db.models import Max, Q
 from .models import BlogPost
+from utils.db import replica_reads
+from utils.pagecache import conditional_page
 
+@replica_reads
 def blog_list(request):
     posts = BlogPost.objects.filter(published=True)
     category = request.GET.get('category')
@@ -21,6 +25,15 @@ def blog_list(request):
         'selected_category': category,
     })
 
+def _post_updated(request, slug):
+    # The sidebar lists other recent posts, so any published edit changes the page
+    row = BlogPost.objects.filter(published=True).aggregate(
+        latest=Max('updated_at'), post=Max('updated_at', filter=Q(slug=slug))
+    )
+    return row['latest'] if row['post'] else None
+
+@conditional_page(_post_updated)
+@replica_reads
 def blog_detail(request, slug):
     post = get_object_or_404(BlogPost, slug=slug, published=True)
     recent_posts = BlogPost.objects.filter(published=True).exclude(id=post.id)[:3]
@@ -22,13 +22,13 @@ class Cart:
     def __init__(self, request):
         """
         Initialize the cart.
+
+        An empty cart is not written to the session: the session is only
+        modified by the first add(), so anonymous page views that merely
+        render the cart badge never create a session row or cookie.
         """
         self.session = request.session
-        cart = self.session.get(settings.CART_SESSION_ID)
-        if not cart:
-            # save an empty cart in the session
-            cart = self.session[settings.CART_SESSION_ID] = {}
-        self.cart = cart
+        self.cart = self.session.get(settings.CART_SESSION_ID) or {}
 
     def add(self, product, quantity=1, override_quantity=False):
         """
@@ -145,6 +145,12 @@ class Cart:
         """
         return sum(float(item['price']) * item['quantity'] for item in self.cart.values())
 
+    def get_total_price_decimal(self):
+        """
+        Calculate the total cost as a Decimal (for money comparisons such as coupons).
+        """
+        return sum((Decimal(str(item['price'])) * item['quantity'] for item in self.cart.values()), Decimal('0'))
+
     def get_total_quantity(self):
         """
         Return total quantity of all items in the cart.
@@ -155,5 +161,6 @@ class Cart:
         """
         Remove cart from session
         """
-        del self.session[settings.CART_SESSION_ID]
-        self.session.modified = True
\ No newline at end of file
+        self.cart = {}
+        if settings.CART_SESSION_ID in self.session:
+            del self.session[settings.CART_SESSION_ID]
@@ -6,6 +6,7 @@ app_name = 'cart'
 urlpatterns = [
     path('', views.cart_detail, name='cart_detail'),
     path('count/', views.cart_count, name='cart_count'),
+    path('state/', views.session_state, name='session_state'),
     path('add/<int:product_id>/', views.cart_add, name='cart_add'),
     path('remove/<int:product_id>/', views.cart_remove, name='cart_remove'),
     path('update/<int:product_id>/', views.cart_update, name='cart_update'),
@@ -35,6 +35,8 @@ from store.models import Product
 from .cart import Cart
 import logging
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.cache import never_cache
+from django.middleware.csrf import get_token
 
 logger = logging.getLogger(__name__)
 
@@ -256,8 +258,13 @@ def cart_detail(request):
     # Final amount (actual price after all discounts)
     total = max(0, subtotal - float(coupon_discount))
     
+    from store.services import RecommendationService
+    from store.read_models import cards
+    bought_together = cards(RecommendationService.for_cart(item['product'] for item in cart))
+
     return render(request, 'cart/detail.html', {
         'cart': cart,
+        'bought_together': bought_together,
         'mrp_total': mrp_total,  # Price shown as "Price (X items)"
         'subtotal': subtotal,
         'compare_discount': compare_discount,
@@ -274,6 +281,30 @@ def cart_count(request):
     return JsonResponse({'count': cart.get_total_quantity()})
 
 
+@never_cache
+@require_GET
+def session_state(request):
+    """
+    Per-visitor header state for pages served from the full-page cache.
+
+    Cached storefront pages (utils.pagecache) are rendered for an anonymous
+    visitor with an empty cart and CSRF placeholders; base.html fills in the
+    cart badge and form tokens from this response. Pending messages are left
+    for the page that displays them.
+    """
+    from accounts.services import NotificationService, UserService
+    cart = Cart(request)
+    user = request.user
+    return JsonResponse({
+        'count': cart.get_total_quantity(),
+        'total': cart.get_total_price(),
+        'authenticated': user.is_authenticated,
+        'is_seller': UserService.is_seller(user),
+        'unread_notifications': NotificationService.get_unread_count(user) if user.is_authenticated else 0,
+        'csrf_token': get_token(request),
+    })
+
+
 @require_POST
 def clear_cart(request):
     """Remove all items from the cart and redirect to cart detail."""
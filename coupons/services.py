@@ -0,0 +1,204 @@
+"""
+Service layer for coupon validation and redemption.
+"""
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional, Tuple
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Coupon, CouponUsage
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEYS = ('coupon_id', 'coupon_code', 'coupon_discount')
+
+
+class CouponService:
+    """Service for coupon lookups (cached by code), validation and redemption."""
+
+    CACHE_TIMEOUT = 60 * 10  # 10 minutes; invalidated on save/delete and after each redemption
+    MISSING_CACHE_TIMEOUT = 60  # Unknown codes, so guessing codes does not hit the DB every time
+
+    @staticmethod
+    def _cache_key(code: str) -> str:
+        return f'coupon_{code}'
+
+    @staticmethod
+    def normalize_code(code: str) -> str:
+        return (code or '').strip().upper()
+
+    @staticmethod
+    def get_coupon(code: str) -> Optional[Coupon]:
+        """
+        Look up a coupon by code, served from cache when possible.
+
+        Args:
+            code: Coupon code (case-insensitive).
+
+        Returns:
+            Coupon instance or None if no coupon has that code.
+        """
+        code = CouponService.normalize_code(code)
+        if not code:
+            return None
+        key = CouponService._cache_key(code)
+        coupon = cache.get(key)
+        if coupon is None:
+            coupon = Coupon.objects.filter(code=code).first()
+            if coupon is None:
+                cache.set(key, False, CouponService.MISSING_CACHE_TIMEOUT)
+                return None
+            cache.set(key, coupon, CouponService.CACHE_TIMEOUT)
+        return coupon or None
+
+    @staticmethod
+    def invalidate(code: str) -> None:
+        """Drop the cached lookup for a coupon code."""
+        cache.delete(CouponService._cache_key(CouponService.normalize_code(code)))
+
+    @staticmethod
+    def calculate_discount(coupon: Coupon, cart_total: Decimal) -> Decimal:
+        """
+        Calculate the discount for a cart total, rounded to paise.
+
+        Args:
+            coupon: Coupon instance.
+            cart_total: Cart total as Decimal.
+
+        Returns:
+            Discount amount (never more than the cart total).
+        """
+        if coupon.discount_type == 'percentage':
+            discount = cart_total * coupon.discount_value / Decimal('100')
+            if coupon.max_discount_amount:
+                discount = min(discount, coupon.max_discount_amount)
+        else:
+            discount = coupon.discount_value
+        return min(discount, cart_total).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+    @staticmethod
+    def validate(code: str, cart_total: Decimal) -> Tuple[Optional[Coupon], Decimal, Optional[str]]:
+        """
+        Validate a coupon code against a cart total.
+
+        Args:
+            code: Coupon code entered by the customer.
+            cart_total: Cart total as Decimal.
+
+        Returns:
+            Tuple of (coupon, discount, error_message); coupon is None on error.
+        """
+        coupon = CouponService.get_coupon(code)
+        if coupon is None:
+            return None, Decimal('0'), 'Invalid coupon code.'
+        if not coupon.is_valid():
+            return None, Decimal('0'), 'This coupon is invalid or has expired.'
+        if cart_total < coupon.min_purchase_amount:
+            return None, Decimal('0'), f'Minimum purchase amount of ₹{coupon.min_purchase_amount} required for this coupon.'
+        return coupon, CouponService.calculate_discount(coupon, cart_total), None
+
+    @staticmethod
+    def apply_to_session(request, coupon: Coupon, discount: Decimal) -> None:
+        request.session['coupon_id'] = coupon.id
+        request.session['coupon_code'] = coupon.code
+        request.session['coupon_discount'] = str(discount)
+
+    @staticmethod
+    def clear_session(request) -> bool:
+        """
+        Remove the applied coupon from the session.
+
+        Returns:
+            True if a coupon was applied.
+        """
+        had_coupon = 'coupon_code' in request.session
+        for key in SESSION_KEYS:
+            request.session.pop(key, None)
+        return had_coupon
+
+    @staticmethod
+    def revalidate_session(request, cart_total: Decimal) -> Tuple[Optional[Coupon], Decimal, Optional[str]]:
+        """
+        Re-check the session coupon against the current cart (e.g. at checkout).
+
+        The stored discount is recomputed from the coupon, so a cart changed
+        after applying the coupon cannot keep a stale discount. An invalid
+        coupon is removed from the session.
+
+        Args:
+            request: Current request.
+            cart_total: Current cart total as Decimal.
+
+        Returns:
+            Tuple of (coupon, discount, error_message); (None, 0, None) if no coupon is applied.
+        """
+        code = request.session.get('coupon_code')
+        if not code:
+            return None, Decimal('0'), None
+        coupon, discount, error = CouponService.validate(code, cart_total)
+        if error:
+            CouponService.clear_session(request)
+            return None, Decimal('0'), f'Coupon "{code}" was removed: {error}'
+        if request.session.get('coupon_discount') != str(discount):
+            CouponService.apply_to_session(request, coupon, discount)
+        return coupon, discount, None
+
+    @staticmethod
+    def reserve(coupon: Coupon) -> bool:
+        """
+        Count one use of a coupon if it is still valid and not used up.
+
+        Call inside the order's transaction before creating the order, so a
+        lost race is detected before anything (order, emails) is produced.
+        The increment is a single conditional UPDATE bounded by usage_limit
+        and validity, so concurrent checkouts cannot over-redeem a coupon.
+
+        Args:
+            coupon: Coupon being redeemed.
+
+        Returns:
+            True if a use was counted, False if the coupon is no longer valid or used up.
+        """
+        now = timezone.now()
+        reserved = Coupon.objects.filter(
+            Q(usage_limit__isnull=True) | Q(usage_count__lt=F('usage_limit')),
+            pk=coupon.pk, active=True, valid_from__lte=now, valid_to__gte=now,
+        ).update(usage_count=F('usage_count') + 1)
+        if reserved:
+            CouponService.invalidate(coupon.code)
+        return bool(reserved)
+
+    @staticmethod
+    def record_usage(coupon: Coupon, order, user: Optional[User], discount: Decimal) -> None:
+        """
+        Record a reserved coupon use against the order.
+
+        Args:
+            coupon: Coupon reserved with reserve().
+            order: Order the discount was applied to.
+            user: Customer (CouponUsage is only written for logged-in users).
+            discount: Discount amount applied.
+        """
+        if user is not None and user.is_authenticated:
+            CouponUsage.objects.create(coupon=coupon, user=user, order=order, discount_amount=discount)
+
+    @staticmethod
+    def redeem(coupon: Coupon, order, user: Optional[User], discount: Decimal) -> bool:
+        """
+        Reserve a coupon use and record it against an existing order.
+
+        Args:
+            coupon: Coupon being redeemed.
+            order: Order the discount was applied to.
+            user: Customer (CouponUsage is only written for logged-in users).
+            discount: Discount amount applied.
+
+        Returns:
+            True if redeemed, False if the coupon is no longer valid or used up.
+        """
+        if not CouponService.reserve(coupon):
+            return False
+        CouponService.record_usage(coupon, order, user, discount)
+        return True
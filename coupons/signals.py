@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Coupon
+from .services import CouponService
+
+
+@receiver(post_save, sender=Coupon)
+@receiver(post_delete, sender=Coupon)
+def invalidate_coupon_cache(sender, instance, **kwargs):
+    """Drop the cached lookup whenever a coupon changes"""
+    CouponService.invalidate(instance.code)
@@ -1,3 +1,46 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+
+from .models import Coupon, CouponUsage
+from .services import CouponService
+
+
+class CouponServiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.coupon = Coupon.objects.create(
+            code='SAVE10', discount_type='percentage', discount_value=Decimal('10'),
+            min_purchase_amount=Decimal('100'), max_discount_amount=Decimal('50'), usage_limit=1,
+            valid_from=now - timedelta(days=1), valid_to=now + timedelta(days=1),
+        )
+        self.user = User.objects.create_user('coupon_buyer', password='x')
+
+    def test_lookup_is_cached_and_invalidated_on_save(self):
+        CouponService.get_coupon('save10')
+        with self.assertNumQueries(0):
+            coupon, discount, error = CouponService.validate('SAVE10', Decimal('199.99'))
+        self.assertIsNone(error)
+        self.assertEqual(discount, Decimal('20.00'))
+
+        self.coupon.active = False
+        self.coupon.save()
+        self.assertEqual(CouponService.validate('SAVE10', Decimal('199.99'))[2], 'This coupon is invalid or has expired.')
+
+    def test_minimum_purchase_and_cap(self):
+        self.assertIsNotNone(CouponService.validate('SAVE10', Decimal('99.99'))[2])
+        self.assertEqual(CouponService.validate('SAVE10', Decimal('1000'))[1], Decimal('50.00'))
+
+    def test_redeem_is_bounded_by_usage_limit(self):
+        self.assertTrue(CouponService.redeem(self.coupon, None, self.user, Decimal('20.00')))
+        self.assertFalse(CouponService.redeem(self.coupon, None, self.user, Decimal('20.00')))
 
-# Create your tests here.
+        self.coupon.refresh_from_db()
+        self.assertEqual(self.coupon.usage_count, 1)
+        self.assertEqual(CouponUsage.objects.filter(coupon=self.coupon, user=self.user).count(), 1)
+        self.assertIsNotNone(CouponService.validate('SAVE10', Decimal('200'))[2])
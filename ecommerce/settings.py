@@ -26,6 +26,10 @@ CASHFREE_APP_ID = config('CASHFREE_APP_ID', default='')
 CASHFREE_SECRET_KEY = config('CASHFREE_SECRET_KEY', default='')
 CASHFREE_ENV = config('CASHFREE_ENV', default='TEST')  # TEST or PROD
 CASHFREE_ENABLED = config('CASHFREE_ENABLED', default=True, cast=bool)
+CASHFREE_API_URL = config(
+    'CASHFREE_API_URL',
+    default='https://api.cashfree.com' if CASHFREE_ENV == 'PROD' else 'https://sandbox.cashfree.com'
+)
 """
 Django settings for ecommerce project.
 
@@ -79,8 +83,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware first
+    'utils.middleware.RequestMetricsMiddleware',  # Query/cache counters, Server-Timing, query budgets
+    'utils.middleware.ReplicaPinningMiddleware',  # Keep a session on the primary right after it writes
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'utils.sessions.CrawlerAwareSessionMiddleware',  # SessionMiddleware that skips crawler GETs
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -127,6 +133,12 @@ if config('USE_POSTGRES', default=False, cast=bool):
             'OPTIONS': {
                 'connect_timeout': 60,
             },
+            # Reuse connections across requests; checked before reuse so a dropped
+            # connection is replaced instead of failing the request
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            # pgbouncer in transaction pooling mode cannot hold server-side cursors across transactions
+            'DISABLE_SERVER_SIDE_CURSORS': config('DB_PGBOUNCER', default=False, cast=bool),
         }
     }
 else:
@@ -137,6 +149,22 @@ else:
         }
     }
 
+# Optional read replica for catalog/analytics reads (utils/db.py ReplicaRouter). Reads only go
+# there inside @replica_reads views, and stay on the primary for REPLICA_PIN_SECONDS after a write.
+if config('USE_POSTGRES', default=False, cast=bool) and config('POSTGRES_REPLICA_HOST', default=''):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': config('POSTGRES_REPLICA_HOST'),
+        'PORT': config('POSTGRES_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['utils.db.ReplicaRouter']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+
+# Open DB connections when a worker loads the WSGI app (ecommerce/wsgi.py).
+# Leave off with gunicorn --preload: the connection would be shared across forked workers.
+DB_WARMUP = config('DB_WARMUP', default=False, cast=bool)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -178,6 +206,14 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic minifies, hashes and precompresses (.gz, .br with the brotli package) - see utils/staticfiles.py
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},  # Django's default, unchanged
+    'staticfiles': {'BACKEND': 'utils.staticfiles.CompressedManifestStaticFilesStorage'},
+}
+STATIC_HASHED_MAX_AGE = 60 * 60 * 24 * 365  # Content-hashed names never change
+STATIC_PLAIN_MAX_AGE = 60 * 60
+
 # ============================================================================
 # CLOUDINARY CONFIGURATION
 # ============================================================================
@@ -204,6 +240,9 @@ else:
     MEDIA_ROOT = BASE_DIR / 'media'
     CLOUDINARY_AVAILABLE = False
 
+# Serve collected static files from Django (utils.staticfiles.serve) when nothing in front does it
+STATIC_SERVE_LOCAL = config('STATIC_SERVE_LOCAL', default=not CLOUDINARY_AVAILABLE, cast=bool)
+
 # Login URLs
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/'
@@ -212,7 +251,9 @@ LOGOUT_REDIRECT_URL = '/'
 # Email Backend Configuration
 # For development: 'django.core.mail.backends.console.EmailBackend'
 # For production: 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_BACKEND = config('EMAIL_BACKEND')
+# Real transport; wrapped so delivery latency shows up in /metrics
+EMAIL_DELIVERY_BACKEND = config('EMAIL_BACKEND')
+EMAIL_BACKEND = 'utils.mail.InstrumentedEmailBackend'
 EMAIL_HOST = config('EMAIL_HOST')
 EMAIL_PORT = config('EMAIL_PORT', cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', cast=bool)
@@ -223,7 +264,55 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL')
 # Cart settings
 CART_SESSION_ID = 'cart'
 
+# Sessions (utils/sessions.py): anonymous visitors without a cart use a signed cookie; everyone
+# else uses SESSION_SERVER_ENGINE (switched to cached_db below when Redis is available).
+# Expired server rows are removed in chunks by `manage.py purge_sessions`.
+SESSION_ENGINE = config('SESSION_ENGINE', default='utils.sessions')
+SESSION_SERVER_ENGINE = 'django.contrib.sessions.backends.db'
+SESSION_COOKIE_MAX_BYTES = 2048  # Larger anonymous sessions move to the server store
+# Crawler GET/HEAD requests without a session cookie get no session at all (utils.sessions.CrawlerAwareSessionMiddleware)
+CRAWLER_USER_AGENT_PATTERN = config(
+    'CRAWLER_USER_AGENT_PATTERN',
+    default=r'bot|crawl|spider|slurp|facebookexternalhit|embedly|preview|lighthouse|headless|curl|wget|python-requests',
+)
+
+# Rendered product cards are cached per product/updated timestamp (store/templatetags/store_fragments.py);
+# bump the version when the card templates change so stale markup is not served after a deploy
+FRAGMENT_CACHE_VERSION = config('FRAGMENT_CACHE_VERSION', default='1')
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 6
+
+# Full-page cache for visitors without a session cookie (utils/pagecache.py); personal bits load from cart:session_state
+PAGE_CACHE_ENABLED = config('PAGE_CACHE_ENABLED', default=True, cast=bool)
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=60 * 5, cast=int)  # Also the s-maxage sent to proxies
+
+# Similar-product index (store/similarity.py): queue a product for re-indexing when its name/description changes.
+# Cron: build_similarity_index --pending every few minutes, and a full build_similarity_index nightly
+# to refresh IDF weights and other products' neighbor lists
+SIMILARITY_INCREMENTAL = config('SIMILARITY_INCREMENTAL', default=True, cast=bool)
+
+# Request metrics and per-view query budgets (utils/middleware.py)
+SERVER_TIMING_ENABLED = config('SERVER_TIMING_ENABLED', default=DEBUG, cast=bool)
+REQUEST_METRICS_SAMPLE_RATE = config('REQUEST_METRICS_SAMPLE_RATE', default=0.01, cast=float)
+QUERY_BUDGET_STRICT = config('QUERY_BUDGET_STRICT', default=False, cast=bool)  # Raise instead of log (tests/CI)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')  # Bearer token required by /metrics/ when set
+# Without a token, /metrics/ is only served to these client IPs unless DEBUG is on
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1', cast=Csv())
+QUERY_BUDGETS = {
+    'store:home': 10,
+    'store:product_list': 45,
+    'store:product_list_by_category': 45,
+    'store:product_detail': 15,
+    'store:admin_manage_products': 40,
+    'store:manage_sellers': 40,
+    'cart:cart_add': 10,
+    'orders:checkout': 30,
+    'accounts:seller_dashboard': 40,
+}
+
 # Logging configuration
+# The file handler needs logs/ to exist; it is created here rather than committed
+os.makedirs(BASE_DIR / 'logs', exist_ok=True)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -283,6 +372,11 @@ LOGGING = {
             'level': 'DEBUG' if DEBUG else 'INFO',
             'propagate': False,
         },
+        'utils': {
+            'handlers': ['console', 'file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -328,6 +422,18 @@ SHIPROCKET_API_URL = config('SHIPROCKET_API_URL', default='https://apiv2.shiproc
 SHIPROCKET_ENABLED = config('SHIPROCKET_ENABLED', default=True, cast=bool)
 SHIPROCKET_TOKEN = None
 SHIPROCKET_PICKUP_PINCODE = config('SHIPROCKET_PICKUP_PINCODE',default='226022')
+SHIPROCKET_TIMEOUT = config('SHIPROCKET_TIMEOUT', default=10, cast=int)  # seconds per API call
+
+# ============================================================================
+# FAKE PROVIDERS (offline load tests and CI)
+# ============================================================================
+# Start the stand-in server with `python manage.py run_fake_providers` and set
+# FAKE_PROVIDERS_ENABLED=True to point Cashfree and Shiprocket calls at it.
+FAKE_PROVIDERS_ENABLED = config('FAKE_PROVIDERS_ENABLED', default=False, cast=bool)
+FAKE_PROVIDERS_URL = config('FAKE_PROVIDERS_URL', default='http://127.0.0.1:8765').rstrip('/')
+if FAKE_PROVIDERS_ENABLED:
+    CASHFREE_API_URL = f'{FAKE_PROVIDERS_URL}/cashfree'
+    SHIPROCKET_API_URL = f'{FAKE_PROVIDERS_URL}/shiprocket/v1/external'
 
 # Currency setting
 CURRENCY = config('DJANGO_CURRENCY', default='INR')
@@ -384,9 +490,8 @@ if CASHFREE_ENV == 'PROD':
                 'TIMEOUT': 300,  # 5 minutes default timeout
             }
         }
-        # Optional: Use Redis for sessions (uncomment to enable)
-        # SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
-        # SESSION_CACHE_ALIAS = 'default'
+        # Server-side sessions read through Redis, written through to the DB
+        SESSION_SERVER_ENGINE = 'django.contrib.sessions.backends.cached_db'
     else:
         # Fallback to local memory cache if Redis is not available
         CACHES = {
@@ -412,6 +517,18 @@ else:
         }
     }
 
+# Process-local LRU tier in front of the shared cache for tiny hot keys (utils/caching.py).
+# Only useful in front of Redis; workers notice invalidations within LOCAL_CACHE_CHECK_INTERVAL seconds.
+LOCAL_CACHE_ENABLED = config(
+    'LOCAL_CACHE_ENABLED',
+    default=CACHES['default']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache',
+    cast=bool,
+)
+LOCAL_CACHE_PREFIXES = ('all_categories', 'home_', 'product_list_categories')
+LOCAL_CACHE_MAX_ENTRIES = 256
+LOCAL_CACHE_TTL = 30
+LOCAL_CACHE_CHECK_INTERVAL = 2
+
 # ============================================================================
 # CORS CONFIGURATION FOR RAZORPAY
 # ============================================================================
@@ -15,14 +15,16 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
-from store.views import HealthCheckView
+from store.views import HealthCheckView, MetricsView
+from utils import staticfiles
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('health/', HealthCheckView.as_view(), name='health_check'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     path('', include('store.urls')),
     path('cart/', include('cart.urls')),
     path('accounts/', include('accounts.urls')),
@@ -35,3 +37,6 @@ urlpatterns = [
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+elif settings.STATIC_SERVE_LOCAL:
+    # Hashed, precompressed files from collectstatic with far-future caching
+    urlpatterns += [re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), staticfiles.serve)]
@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce.settings')
 
 application = get_wsgi_application()
+
+# Connection-open metrics, and optional warm-up of persistent DB connections
+from django.conf import settings  # noqa: E402
+from utils.db import warm_up_connections  # noqa: E402
+
+if settings.DB_WARMUP:
+    warm_up_connections()
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib import messages
 from django.utils.html import format_html
 from django.conf import settings
-from .models import Order, OrderItem
+from .models import Order, OrderItem, SellerDailyStats
 from .shiprocket import ShiprocketAPI
 
 
@@ -214,3 +214,12 @@ class OrderItemAdmin(admin.ModelAdmin):
     list_display = ['order', 'product', 'price', 'quantity']
     list_filter = ['order__created']
     search_fields = ['order__id', 'product__name']
+
+
+@admin.register(SellerDailyStats)
+class SellerDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ['seller', 'date', 'units_sold', 'revenue', 'orders', 'orders_pending', 'orders_delivered', 'orders_cancelled']
+    list_filter = ['date']
+    search_fields = ['seller__username']
+    date_hierarchy = 'date'
+    readonly_fields = [field.name for field in SellerDailyStats._meta.fields]
@@ -6,6 +6,7 @@ UPDATED: Better error handling and status verification
 import requests
 import logging
 from django.conf import settings
+from utils.metrics import track_provider_call
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +20,10 @@ class CashfreeService:
         self.secret_key = getattr(settings, 'CASHFREE_SECRET_KEY', '')
         self.env = getattr(settings, 'CASHFREE_ENV', 'TEST')  # TEST or PROD
         
-        # Set base URL based on environment
-        if self.env == 'PROD':
-            self.base_url = 'https://api.cashfree.com'
-        else:
-            self.base_url = 'https://sandbox.cashfree.com'
+        # Base URL comes from settings so the fake provider server can stand in
+        self.base_url = getattr(settings, 'CASHFREE_API_URL', '').rstrip('/')
+        if not self.base_url:
+            self.base_url = 'https://api.cashfree.com' if self.env == 'PROD' else 'https://sandbox.cashfree.com'
         
         # Set headers for API requests
         self.headers = {
@@ -55,12 +55,13 @@ class CashfreeService:
         try:
             logger.info(f"Creating Cashfree order: {order_data.get('order_id')}")
             
-            response = requests.post(
-                url,
-                json=order_data,
-                headers=self.headers,
-                timeout=10
-            )
+            with track_provider_call('cashfree', 'create_order'):
+                response = requests.post(
+                    url,
+                    json=order_data,
+                    headers=self.headers,
+                    timeout=10
+                )
             
             logger.info(f"Cashfree response status: {response.status_code}")
             logger.info(f"Cashfree response body: {response.text}")
@@ -105,11 +106,12 @@ class CashfreeService:
         url = f"{self.base_url}/pg/orders/{order_id}"
         
         try:
-            response = requests.get(
-                url,
-                headers=self.headers,
-                timeout=10
-            )
+            with track_provider_call('cashfree', 'get_order'):
+                response = requests.get(
+                    url,
+                    headers=self.headers,
+                    timeout=10
+                )
             
             logger.info(f"Cashfree verify response status: {response.status_code}")
             logger.info(f"Cashfree verify response body: {response.text}")
@@ -163,11 +165,12 @@ class CashfreeService:
         url = f"{self.base_url}/pg/orders/{order_id}/payments/{cf_payment_id}"
         
         try:
-            response = requests.get(
-                url,
-                headers=self.headers,
-                timeout=10
-            )
+            with track_provider_call('cashfree', 'get_payment'):
+                response = requests.get(
+                    url,
+                    headers=self.headers,
+                    timeout=10
+                )
             
             if response.status_code == 200:
                 return {
@@ -211,12 +214,13 @@ class CashfreeService:
         }
         
         try:
-            response = requests.post(
-                url,
-                json=refund_data,
-                headers=self.headers,
-                timeout=10
-            )
+            with track_provider_call('cashfree', 'refund'):
+                response = requests.post(
+                    url,
+                    json=refund_data,
+                    headers=self.headers,
+                    timeout=10
+                )
             
             if response.status_code in [200, 201]:
                 return {
@@ -0,0 +1,355 @@
+"""
+Local stand-in for the Cashfree PG and Shiprocket APIs.
+
+Serves the subset of endpoints used by CashfreeService, ShiprocketAPI,
+shiprocket_api and views_pincode so checkout and shipping can be exercised
+offline (load tests, CI). Latency, error and timeout rates are configurable,
+and payment/shipment status changes are pushed back to the site as webhooks.
+
+Start it with `python manage.py run_fake_providers` and set
+FAKE_PROVIDERS_ENABLED=True (or use FakeProviderServer directly in-process).
+"""
+import hashlib
+import hmac
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class FakeProviderConfig:
+    """Behaviour knobs for the fake provider server"""
+
+    def __init__(self, latency_ms=50, jitter_ms=0, error_rate=0.0, timeout_rate=0.0,
+                 hang_seconds=30, payment_outcome='PAID', pay_after=0.0,
+                 webhook_secret='', send_webhooks=True, shiprocket_webhook_url=None,
+                 shipment_step_seconds=0.0, unserviceable_pincodes=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.payment_outcome = payment_outcome
+        self.pay_after = pay_after
+        self.webhook_secret = webhook_secret
+        self.send_webhooks = send_webhooks
+        self.shiprocket_webhook_url = shiprocket_webhook_url
+        self.shipment_step_seconds = shipment_step_seconds
+        self.unserviceable_pincodes = set(unserviceable_pincodes or [])
+
+
+class FakeProviderState:
+    """In-memory orders, shipments and request counters shared by handler threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cashfree_orders = {}
+        self.shipments = {}
+        self.counters = {}
+        self._next_id = 100000
+
+    def next_id(self):
+        with self.lock:
+            self._next_id += 1
+            return self._next_id
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+
+SHIPMENT_PROGRESSION = ['pickup scheduled', 'in transit', 'out for delivery', 'delivered']
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    """Routes requests to the Cashfree or Shiprocket fakes"""
+
+    server_version = 'FakeProviders/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    routes = [
+        ('POST', r'^/cashfree/pg/orders$', 'cashfree_create_order'),
+        ('GET', r'^/cashfree/pg/orders/(?P<order_id>[^/]+)$', 'cashfree_get_order'),
+        ('GET', r'^/cashfree/pg/orders/(?P<order_id>[^/]+)/payments/(?P<payment_id>[^/]+)$', 'cashfree_get_payment'),
+        ('POST', r'^/cashfree/pg/orders/(?P<order_id>[^/]+)/refunds$', 'cashfree_refund'),
+        ('POST', r'^/shiprocket/v1/external/auth/login$', 'shiprocket_login'),
+        ('GET', r'^/shiprocket/v1/external/courier/serviceability/?$', 'shiprocket_serviceability'),
+        ('POST', r'^/shiprocket/v1/external/courier/serviceability/?$', 'shiprocket_serviceability'),
+        ('POST', r'^/shiprocket/v1/external/orders/create/adhoc$', 'shiprocket_create_order'),
+        ('POST', r'^/shiprocket/v1/external/courier/assign/awb$', 'shiprocket_assign_awb'),
+        ('GET', r'^/shiprocket/v1/external/courier/track/awb/(?P<awb>[^/]+)$', 'shiprocket_track'),
+        ('POST', r'^/shiprocket/v1/external/orders/cancel/shipment/awbs$', 'shiprocket_cancel'),
+        ('GET', r'^/__stats__$', 'stats'),
+    ]
+
+    @property
+    def config(self):
+        return self.server.config
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, format, *args):
+        logger.debug('fake provider: ' + format, *args)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        parsed = urlparse(self.path)
+        self.query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        try:
+            self.body = json.loads(raw) if raw else {}
+        except ValueError:
+            self.body = {}
+
+        for route_method, pattern, handler_name in self.routes:
+            match = re.match(pattern, parsed.path)
+            if route_method == method and match:
+                self.state.count(handler_name)
+                if handler_name != 'stats' and not self._simulate_network():
+                    return
+                return getattr(self, handler_name)(**match.groupdict())
+        self._send_json({'message': f'No fake route for {method} {parsed.path}'}, status=404)
+
+    def _simulate_network(self):
+        """Apply latency, injected errors and hangs. Returns False if the request was answered."""
+        if self.config.timeout_rate and random.random() < self.config.timeout_rate:
+            self.state.count('injected_timeout')
+            time.sleep(self.config.hang_seconds)
+        delay = self.config.latency_ms + random.uniform(0, self.config.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        if self.config.error_rate and random.random() < self.config.error_rate:
+            self.state.count('injected_error')
+            self._send_json({'message': 'Injected provider error', 'code': 'fake_error'}, status=500)
+            return False
+        return True
+
+    def _send_json(self, payload, status=200):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    # ------------------------------------------------------------------
+    # Cashfree PG
+    # ------------------------------------------------------------------
+    def cashfree_create_order(self):
+        order_id = self.body.get('order_id') or f'order_{uuid.uuid4().hex[:16]}'
+        order = {
+            'cf_order_id': str(self.state.next_id()),
+            'order_id': order_id,
+            'order_amount': self.body.get('order_amount'),
+            'order_currency': self.body.get('order_currency', 'INR'),
+            'order_status': 'ACTIVE',
+            'payment_session_id': f'session_{uuid.uuid4().hex}',
+            'customer_details': self.body.get('customer_details', {}),
+            'order_meta': self.body.get('order_meta', {}),
+            'created_at': time.time(),
+            'webhook_sent': False,
+        }
+        with self.state.lock:
+            self.state.cashfree_orders[order_id] = order
+        if self.config.pay_after > 0:
+            timer = threading.Timer(self.config.pay_after, self.server.resolve_payment, args=[order_id])
+            timer.daemon = True
+            timer.start()
+        self._send_json(self.server.public_order(order))
+
+    def cashfree_get_order(self, order_id):
+        with self.state.lock:
+            order = self.state.cashfree_orders.get(order_id)
+        if not order:
+            return self._send_json({'message': 'order not found', 'code': 'order_not_found'}, status=404)
+        if self.config.pay_after <= 0:
+            self.server.resolve_payment(order_id)
+        self._send_json(self.server.public_order(order))
+
+    def cashfree_get_payment(self, order_id, payment_id):
+        with self.state.lock:
+            order = self.state.cashfree_orders.get(order_id)
+        if not order:
+            return self._send_json({'message': 'order not found'}, status=404)
+        self._send_json({
+            'cf_payment_id': payment_id,
+            'order_id': order_id,
+            'payment_amount': order['order_amount'],
+            'payment_status': 'SUCCESS' if order['order_status'] == 'PAID' else order['order_status'],
+        })
+
+    def cashfree_refund(self, order_id):
+        self._send_json({
+            'order_id': order_id,
+            'refund_id': self.body.get('refund_id') or f'refund_{uuid.uuid4().hex[:16]}',
+            'refund_amount': self.body.get('refund_amount'),
+            'refund_status': 'PENDING',
+        })
+
+    # ------------------------------------------------------------------
+    # Shiprocket
+    # ------------------------------------------------------------------
+    def shiprocket_login(self):
+        self._send_json({'token': f'fake-token-{uuid.uuid4().hex}', 'email': self.body.get('email')})
+
+    def shiprocket_serviceability(self):
+        params = self.query or self.body
+        pincode = str(params.get('delivery_postcode', ''))
+        couriers = [] if pincode in self.config.unserviceable_pincodes else [
+            {'courier_company_id': 1, 'courier_name': 'Fake Express', 'rate': 45.0, 'etd': '3 days'},
+            {'courier_company_id': 2, 'courier_name': 'Fake Surface', 'rate': 30.0, 'etd': '6 days'},
+        ]
+        self._send_json({'status': 200, 'data': {'available_courier_companies': couriers}})
+
+    def shiprocket_create_order(self):
+        shipment_id = self.state.next_id()
+        awb = f'FAKEAWB{shipment_id}'
+        shipment = {
+            'order_id': self.state.next_id(),
+            'shipment_id': shipment_id,
+            'channel_order_id': self.body.get('order_id'),
+            'awb_code': awb,
+            'courier_name': 'Fake Express',
+            'status': 'NEW',
+            'history': [],
+        }
+        with self.state.lock:
+            self.state.shipments[awb] = shipment
+        self.server.schedule_shipment_progress(awb)
+        self._send_json({key: shipment[key] for key in ('order_id', 'shipment_id', 'awb_code', 'courier_name', 'status')})
+
+    def shiprocket_assign_awb(self):
+        shipment_id = self.body.get('shipment_id')
+        with self.state.lock:
+            shipment = next((s for s in self.state.shipments.values() if str(s['shipment_id']) == str(shipment_id)), None)
+        if not shipment:
+            return self._send_json({'message': 'shipment not found'}, status=404)
+        self._send_json({'awb_assign_status': 1, 'response': {'data': {
+            'awb_code': shipment['awb_code'], 'courier_name': shipment['courier_name'],
+        }}})
+
+    def shiprocket_track(self, awb):
+        with self.state.lock:
+            shipment = self.state.shipments.get(awb)
+        if not shipment:
+            return self._send_json({'tracking_data': {'track_status': 0, 'error': 'AWB not found'}})
+        self._send_json({'tracking_data': {
+            'track_status': 1,
+            'shipment_status': shipment['status'],
+            'shipment_track': [{'awb_code': awb, 'current_status': shipment['status'],
+                                'courier_name': shipment['courier_name']}],
+            'shipment_track_activities': list(shipment['history']),
+        }})
+
+    def shiprocket_cancel(self):
+        awbs = self.body.get('awbs', [])
+        with self.state.lock:
+            for awb in awbs:
+                if awb in self.state.shipments:
+                    self.state.shipments[awb]['status'] = 'cancelled'
+        self._send_json({'status': 200, 'message': f'{len(awbs)} shipment(s) cancelled'})
+
+    def stats(self):
+        with self.state.lock:
+            counters = dict(self.state.counters)
+        self._send_json({'counters': counters})
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    """Threaded HTTP server hosting the Cashfree and Shiprocket fakes"""
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=8765, config=None):
+        self.config = config or FakeProviderConfig()
+        self.state = FakeProviderState()
+        self._thread = None
+        super().__init__((host, port), FakeProviderHandler)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Serve in a background daemon thread (for in-process benchmarks)"""
+        self._thread = threading.Thread(target=self.serve_forever, name='fake-providers', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    @staticmethod
+    def public_order(order):
+        return {key: value for key, value in order.items() if key not in ('created_at', 'webhook_sent')}
+
+    def resolve_payment(self, order_id):
+        """Move an ACTIVE order to the configured outcome and notify the site once"""
+        with self.state.lock:
+            order = self.state.cashfree_orders.get(order_id)
+            if not order or order['order_status'] != 'ACTIVE':
+                return
+            order['order_status'] = self.config.payment_outcome
+            notify_url = order['order_meta'].get('notify_url')
+            send = self.config.send_webhooks and notify_url and not order['webhook_sent']
+            order['webhook_sent'] = True
+        if send:
+            payload = {'type': 'PAYMENT_WEBHOOK', 'order': self.public_order(order)}
+            self._post_webhook(notify_url, payload, signed=True)
+
+    def schedule_shipment_progress(self, awb):
+        """Walk a shipment through pickup -> delivered, posting Shiprocket webhooks"""
+        if self.config.shipment_step_seconds <= 0:
+            return
+
+        def advance(step):
+            with self.state.lock:
+                shipment = self.state.shipments.get(awb)
+                if not shipment or shipment['status'] == 'cancelled':
+                    return
+                status = SHIPMENT_PROGRESSION[step]
+                shipment['status'] = status
+                shipment['history'].append({'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'activity': status})
+            if self.config.send_webhooks and self.config.shiprocket_webhook_url:
+                self._post_webhook(self.config.shiprocket_webhook_url, {'awb': awb, 'current_status': status})
+            if step + 1 < len(SHIPMENT_PROGRESSION):
+                timer = threading.Timer(self.config.shipment_step_seconds, advance, args=[step + 1])
+                timer.daemon = True
+                timer.start()
+
+        timer = threading.Timer(self.config.shipment_step_seconds, advance, args=[0])
+        timer.daemon = True
+        timer.start()
+
+    def _post_webhook(self, url, payload, signed=False):
+        body = json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if signed and self.config.webhook_secret:
+            headers['x-webhook-signature'] = hmac.new(
+                self.config.webhook_secret.encode('utf-8'), body, hashlib.sha256
+            ).hexdigest()
+        self.state.count('webhook_sent')
+        try:
+            requests.post(url, data=body, headers=headers, timeout=10)
+        except Exception as e:
+            self.state.count('webhook_failed')
+            logger.warning(f'Fake provider webhook to {url} failed: {str(e)}')
@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from orders.services import SellerStatsService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild SellerDailyStats rollups from order items'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seller', action='append', help='Username of a seller to rebuild (repeatable)')
+        parser.add_argument('--since', type=str, help='Only rebuild from this date (YYYY-MM-DD)')
+        parser.add_argument('--days', type=int, help='Only rebuild the last N days')
+
+    def handle(self, *args, **kwargs):
+        since = None
+        if kwargs['since']:
+            try:
+                since = date.fromisoformat(kwargs['since'])
+            except ValueError:
+                raise CommandError('--since must be YYYY-MM-DD')
+        elif kwargs['days']:
+            since = timezone.localdate() - timedelta(days=kwargs['days'])
+
+        seller_ids = None
+        if kwargs['seller']:
+            seller_ids = list(User.objects.filter(username__in=kwargs['seller']).values_list('id', flat=True))
+            if not seller_ids:
+                raise CommandError('No matching sellers found')
+
+        rows = SellerStatsService.rebuild(seller_ids=seller_ids, since=since)
+        scope = f'since {since}' if since else 'for all history'
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} seller daily stats rows {scope}'))
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from urllib.parse import urlparse
+from orders.fake_providers import FakeProviderConfig, FakeProviderServer
+
+
+class Command(BaseCommand):
+    help = 'Run a local stand-in for the Cashfree and Shiprocket APIs (offline load tests and CI)'
+
+    def add_arguments(self, parser):
+        default = urlparse(getattr(settings, 'FAKE_PROVIDERS_URL', 'http://127.0.0.1:8765'))
+        parser.add_argument('--host', default=default.hostname or '127.0.0.1')
+        parser.add_argument('--port', type=int, default=default.port or 8765)
+        parser.add_argument('--latency-ms', type=float, default=50, help='Base latency added to every call')
+        parser.add_argument('--jitter-ms', type=float, default=0, help='Random extra latency (0..jitter)')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of calls answered with HTTP 500')
+        parser.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction of calls that hang')
+        parser.add_argument('--hang-seconds', type=float, default=30, help='How long a hanging call blocks')
+        parser.add_argument('--payment-outcome', default='PAID', choices=['PAID', 'FAILED', 'EXPIRED', 'ACTIVE'])
+        parser.add_argument('--pay-after', type=float, default=0.0,
+                            help='Seconds until payments resolve (0 = on first status lookup)')
+        parser.add_argument('--no-webhooks', action='store_true', help='Do not push webhooks back to the site')
+        parser.add_argument('--shiprocket-webhook-url', default=None,
+                            help='Where to post shipment status updates, e.g. http://127.0.0.1:8000/orders/shiprocket/webhook/')
+        parser.add_argument('--shipment-step-seconds', type=float, default=0.0,
+                            help='Advance shipments one status every N seconds (0 = never)')
+        parser.add_argument('--unserviceable', nargs='*', default=[], help='Pincodes reported as unserviceable')
+
+    def handle(self, *args, **options):
+        config = FakeProviderConfig(
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            error_rate=options['error_rate'],
+            timeout_rate=options['timeout_rate'],
+            hang_seconds=options['hang_seconds'],
+            payment_outcome=options['payment_outcome'],
+            pay_after=options['pay_after'],
+            webhook_secret=getattr(settings, 'CASHFREE_SECRET_KEY', ''),
+            send_webhooks=not options['no_webhooks'],
+            shiprocket_webhook_url=options['shiprocket_webhook_url'],
+            shipment_step_seconds=options['shipment_step_seconds'],
+            unserviceable_pincodes=options['unserviceable'],
+        )
+        server = FakeProviderServer(options['host'], options['port'], config)
+
+        self.stdout.write(self.style.SUCCESS(f'Fake providers listening on {server.url}'))
+        self.stdout.write(f'  Cashfree:   {server.url}/cashfree')
+        self.stdout.write(f'  Shiprocket: {server.url}/shiprocket/v1/external')
+        if not getattr(settings, 'FAKE_PROVIDERS_ENABLED', False):
+            self.stdout.write(self.style.WARNING('FAKE_PROVIDERS_ENABLED is False; the site will still call the real APIs'))
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write('Fake providers stopped')
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_add_confirmed_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SellerDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('units_sold', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('orders', models.IntegerField(default=0, help_text="Orders containing at least one of the seller's items")),
+                ('orders_pending', models.IntegerField(default=0)),
+                ('orders_confirmed', models.IntegerField(default=0)),
+                ('orders_processing', models.IntegerField(default=0)),
+                ('orders_shipped', models.IntegerField(default=0)),
+                ('orders_delivered', models.IntegerField(default=0)),
+                ('orders_cancelled', models.IntegerField(default=0)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Seller daily stats',
+                'ordering': ['-date'],
+                'unique_together': {('seller', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+# Status columns as of 0006; later changes go through the backfill_seller_stats command
+STATUS_FIELDS = {
+    status: f'orders_{status}'
+    for status in ('pending', 'confirmed', 'processing', 'shipped', 'delivered', 'cancelled')
+}
+
+
+def backfill(apps, schema_editor):
+    """Same rollup as SellerStatsService.rebuild(), on the historical models."""
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    SellerDailyStats = apps.get_model('orders', 'SellerDailyStats')
+    items = OrderItem.objects.annotate(day=TruncDate('order__created'))
+    if not items.exists():
+        return
+
+    rows = {}
+    for row in items.values('product__seller_id', 'day').annotate(
+        units=Sum('quantity'), revenue=Sum(F('price') * F('quantity'))
+    ):
+        rows[(row['product__seller_id'], row['day'])] = SellerDailyStats(
+            seller_id=row['product__seller_id'], date=row['day'],
+            units_sold=row['units'] or 0, revenue=row['revenue'] or 0,
+        )
+    for row in items.values('product__seller_id', 'day', 'order__order_status').annotate(
+        count=Count('order_id', distinct=True)
+    ):
+        stats = rows[(row['product__seller_id'], row['day'])]
+        stats.orders += row['count']
+        field = STATUS_FIELDS.get(row['order__order_status'])
+        if field:
+            setattr(stats, field, getattr(stats, field) + row['count'])
+
+    SellerDailyStats.objects.all().delete()
+    SellerDailyStats.objects.bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_seller_daily_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_backfill_seller_daily_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'order_status'], name='order_user_status_idx'),
+        ),
+    ]
@@ -41,6 +41,10 @@ class Order(models.Model):
     
     class Meta:
         ordering = ['-created']
+        indexes = [
+            # A customer's orders by status (verified-purchase lookups, order history filters)
+            models.Index(fields=['user', 'order_status'], name='order_user_status_idx'),
+        ]
 
     def __str__(self):
         return f'Order {self.order_number or self.id}'
@@ -92,3 +96,31 @@ class OrderItem(models.Model):
 
     def get_cost(self):
         return self.price * self.quantity
+
+
+class SellerDailyStats(models.Model):
+    """
+    Per-seller daily rollup of order items, bucketed by the order's creation date.
+    Maintained by orders.signals and rebuilt with `manage.py backfill_seller_stats`.
+    """
+    seller = models.ForeignKey(User, related_name='daily_stats', on_delete=models.CASCADE)
+    date = models.DateField()
+    units_sold = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    orders = models.IntegerField(default=0, help_text='Orders containing at least one of the seller\'s items')
+    # Current status of those orders (moved between columns when the status changes)
+    orders_pending = models.IntegerField(default=0)
+    orders_confirmed = models.IntegerField(default=0)
+    orders_processing = models.IntegerField(default=0)
+    orders_shipped = models.IntegerField(default=0)
+    orders_delivered = models.IntegerField(default=0)
+    orders_cancelled = models.IntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('seller', 'date')
+        ordering = ['-date']
+        verbose_name_plural = 'Seller daily stats'
+
+    def __str__(self):
+        return f'{self.seller} {self.date}: {self.units_sold} units, ₹{self.revenue}'
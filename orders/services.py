@@ -1,14 +1,21 @@
 """
 Service layer for order business logic.
 """
-from typing import Optional, Dict, List, Tuple
-from django.db import transaction
+import logging
+from datetime import date, datetime, time
+from typing import Optional, Dict, List, Tuple, Iterable
+from django.db import IntegrityError, transaction
 from django.contrib.auth.models import User
-from django.db.models import Sum, F
-from .models import Order, OrderItem
+from django.db.models import Sum, F, Count, Q
+from django.db.models.functions import TruncDate
+from django.core.cache import cache
+from django.utils import timezone
+from .models import Order, OrderItem, SellerDailyStats
 from cart.cart import Cart
 from store.models import Product
 
+logger = logging.getLogger(__name__)
+
 
 class OrderService:
     """Service for order operations."""
@@ -151,3 +158,266 @@ class OrderService:
             product__seller=user
         ).select_related('order', 'product', 'order__user').order_by('-order__created'))
 
+
+
+class SellerStatsService:
+    """Service maintaining and reading SellerDailyStats rollups."""
+    
+    STATUS_FIELDS = {status: f'orders_{status}' for status, _ in Order.ORDER_STATUS_CHOICES}
+    
+    @staticmethod
+    def _bucket(order: Order) -> date:
+        return timezone.localdate(order.created)
+    
+    @staticmethod
+    def _apply(seller_id: int, day: date, **deltas) -> None:
+        """
+        Add deltas to one rollup row with F() expressions (safe under concurrency).
+        
+        The common case is a single UPDATE; the row is only created the first
+        time a seller sells on a given day.
+        """
+        deltas = {field: value for field, value in deltas.items() if value}
+        if not deltas:
+            return
+        row = SellerDailyStats.objects.filter(seller_id=seller_id, date=day)
+        increments = {field: F(field) + value for field, value in deltas.items()}
+        if row.update(**increments):
+            return
+        try:
+            with transaction.atomic():
+                SellerDailyStats.objects.create(seller_id=seller_id, date=day, **deltas)
+        except IntegrityError:
+            # Another request created the row first
+            row.update(**increments)
+    
+    @staticmethod
+    def _per_seller(items) -> List[Dict]:
+        return list(items.values('product__seller_id').annotate(
+            units=Sum('quantity'), revenue=Sum(F('price') * F('quantity'))
+        ))
+    
+    @staticmethod
+    def record_items(order_id, item_ids: Iterable[int]) -> None:
+        """
+        Add newly created order items to their sellers' rollups.
+        
+        A single grouped query collects the new units/revenue per seller and
+        whether the seller already had items in the order, so an order costs
+        one rollup update per seller rather than several queries per line item.
+        "Already" means a lower primary key, so batches of one order may be
+        recorded separately and in any order without counting it twice.
+        
+        Args:
+            order_id: Order the items belong to.
+            item_ids: Primary keys of the new OrderItem rows.
+        """
+        item_ids = list(item_ids)
+        new_items = Q(pk__in=item_ids)
+        rows = OrderItem.objects.filter(order_id=order_id).values(
+            'product__seller_id', 'order__created', 'order__order_status'
+        ).annotate(
+            units=Sum('quantity', filter=new_items),
+            revenue=Sum(F('price') * F('quantity'), filter=new_items),
+            earlier_items=Count('pk', filter=Q(pk__lt=min(item_ids))),
+        )
+        for row in rows:
+            if not row['units']:
+                continue
+            deltas = {'units_sold': row['units'], 'revenue': row['revenue']}
+            if not row['earlier_items']:
+                deltas['orders'] = 1
+                deltas[SellerStatsService.STATUS_FIELDS[row['order__order_status']]] = 1
+            day = timezone.localdate(row['order__created'])
+            SellerStatsService._apply(row['product__seller_id'], day, **deltas)
+    
+    @staticmethod
+    def remove_item(item: OrderItem) -> None:
+        """
+        Subtract a single deleted order item from its seller's rollup.
+        
+        Whole-order deletes are handled by remove_order instead, since the
+        order row still exists while its items are being cascaded.
+        
+        Args:
+            item: OrderItem that was just deleted.
+        """
+        try:
+            order = Order.objects.get(pk=item.order_id)
+        except Order.DoesNotExist:
+            return
+        seller_id = item.product.seller_id
+        deltas = {'units_sold': -item.quantity, 'revenue': -(item.price * item.quantity)}
+        seller_has_other_items = OrderItem.objects.filter(
+            order_id=item.order_id, product__seller_id=seller_id
+        ).exclude(pk=item.pk).exists()
+        if not seller_has_other_items:
+            deltas['orders'] = -1
+            deltas[SellerStatsService.STATUS_FIELDS[order.order_status]] = -1
+        SellerStatsService._apply(seller_id, SellerStatsService._bucket(order), **deltas)
+    
+    @staticmethod
+    def remove_order(order: Order) -> None:
+        """
+        Subtract an order that is about to be deleted, once per seller.
+        
+        Args:
+            order: Order being deleted (its items must still exist).
+        """
+        day = SellerStatsService._bucket(order)
+        status_field = SellerStatsService.STATUS_FIELDS[order.order_status]
+        for row in SellerStatsService._per_seller(OrderItem.objects.filter(order=order)):
+            SellerStatsService._apply(row['product__seller_id'], day, **{
+                'units_sold': -row['units'], 'revenue': -row['revenue'], 'orders': -1, status_field: -1,
+            })
+    
+    @staticmethod
+    def move_order_status(order: Order, old_status: str, new_status: str) -> None:
+        """
+        Move an order between status columns for every seller in it.
+        
+        Args:
+            order: Order whose status changed.
+            old_status: Previous order_status.
+            new_status: Current order_status.
+        """
+        old_field = SellerStatsService.STATUS_FIELDS.get(old_status)
+        new_field = SellerStatsService.STATUS_FIELDS.get(new_status)
+        if not old_field or not new_field or old_field == new_field:
+            return
+        day = SellerStatsService._bucket(order)
+        seller_ids = OrderItem.objects.filter(order=order).values_list('product__seller_id', flat=True).distinct()
+        for seller_id in seller_ids:
+            SellerStatsService._apply(seller_id, day, **{old_field: -1, new_field: 1})
+    
+    @staticmethod
+    @transaction.atomic
+    def rebuild(seller_ids: Optional[Iterable[int]] = None, since: Optional[date] = None) -> int:
+        """
+        Recompute rollups from OrderItem rows (backfill / repair).
+        
+        Args:
+            seller_ids: Limit to these sellers (default: all).
+            since: Only rebuild days on or after this date (default: all history).
+            
+        Returns:
+            Number of rollup rows written.
+        """
+        items = OrderItem.objects.annotate(day=TruncDate('order__created'))
+        rollups = SellerDailyStats.objects.all()
+        if seller_ids is not None:
+            seller_ids = list(seller_ids)
+            items = items.filter(product__seller_id__in=seller_ids)
+            rollups = rollups.filter(seller_id__in=seller_ids)
+        if since:
+            items = items.filter(day__gte=since)
+            rollups = rollups.filter(date__gte=since)
+        
+        rows = {}
+        for row in items.values('product__seller_id', 'day').annotate(
+            units=Sum('quantity'), revenue=Sum(F('price') * F('quantity'))
+        ):
+            rows[(row['product__seller_id'], row['day'])] = SellerDailyStats(
+                seller_id=row['product__seller_id'], date=row['day'],
+                units_sold=row['units'] or 0, revenue=row['revenue'] or 0,
+            )
+        for row in items.values('product__seller_id', 'day', 'order__order_status').annotate(
+            count=Count('order_id', distinct=True)
+        ):
+            stats = rows[(row['product__seller_id'], row['day'])]
+            stats.orders += row['count']
+            field = SellerStatsService.STATUS_FIELDS.get(row['order__order_status'])
+            if field:
+                setattr(stats, field, getattr(stats, field) + row['count'])
+        
+        rollups.delete()
+        SellerDailyStats.objects.bulk_create(rows.values(), batch_size=500)
+        return len(rows)
+    
+    @staticmethod
+    def get_seller_totals(user: User) -> Dict[str, any]:
+        """
+        All-time totals for a seller: rollups for closed days plus today's live delta.
+        
+        Args:
+            user: Seller user instance.
+            
+        Returns:
+            Dictionary with total_sales, total_revenue, total_orders and
+            orders_<status> counts.
+        """
+        today = timezone.localdate()
+        status_fields = list(SellerStatsService.STATUS_FIELDS.values())
+        
+        past = SellerDailyStats.objects.filter(seller=user, date__lt=today).aggregate(
+            units=Sum('units_sold'), revenue=Sum('revenue'), orders=Sum('orders'),
+            **{field: Sum(field) for field in status_fields}
+        )
+        
+        start_of_today = timezone.make_aware(datetime.combine(today, time.min))
+        today_items = OrderItem.objects.filter(product__seller=user, order__created__gte=start_of_today)
+        live = today_items.aggregate(units=Sum('quantity'), revenue=Sum(F('price') * F('quantity')))
+        live_status = {
+            row['order__order_status']: row['count']
+            for row in today_items.values('order__order_status').annotate(count=Count('order_id', distinct=True))
+        }
+        
+        totals = {
+            'total_sales': (past['units'] or 0) + (live['units'] or 0),
+            'total_revenue': (past['revenue'] or 0) + (live['revenue'] or 0),
+            'total_orders': (past['orders'] or 0) + sum(live_status.values()),
+        }
+        for status, field in SellerStatsService.STATUS_FIELDS.items():
+            totals[field] = (past[field] or 0) + live_status.get(status, 0)
+        return totals
+
+
+class PurchaseHistoryService:
+    """Service for the cached set of products each customer has received (delivered orders)."""
+    
+    CACHE_TIMEOUT = 60 * 60 * 24  # Invalidated whenever one of the user's orders enters/leaves 'delivered'
+    
+    @staticmethod
+    def _cache_key(user_id: int) -> str:
+        return f'purchased_products_{user_id}'
+    
+    @staticmethod
+    def get_purchased_product_ids(user: User) -> frozenset:
+        """
+        Get the ids of all products in the user's delivered orders.
+        
+        Args:
+            user: User instance (anonymous users have no purchases).
+            
+        Returns:
+            Frozenset of product ids.
+        """
+        if not user or not user.is_authenticated:
+            return frozenset()
+        key = PurchaseHistoryService._cache_key(user.pk)
+        product_ids = cache.get(key)
+        if product_ids is None:
+            product_ids = frozenset(OrderItem.objects.filter(
+                order__user=user, order__order_status='delivered'
+            ).values_list('product_id', flat=True).distinct())
+            cache.set(key, product_ids, PurchaseHistoryService.CACHE_TIMEOUT)
+        return product_ids
+    
+    @staticmethod
+    def has_purchased(user: User, product_id: int) -> bool:
+        """
+        Check whether the user has received this product (verified purchase).
+        
+        Args:
+            user: User instance.
+            product_id: Product primary key.
+            
+        Returns:
+            True if the product was in one of the user's delivered orders.
+        """
+        return product_id in PurchaseHistoryService.get_purchased_product_ids(user)
+    
+    @staticmethod
+    def invalidate(user_id: Optional[int]) -> None:
+        if user_id:
+            cache.delete(PurchaseHistoryService._cache_key(user_id))
@@ -5,6 +5,7 @@ import requests
 from django.conf import settings
 from django.core.cache import cache
 import logging
+from utils.metrics import track_provider_call
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,7 @@ class ShiprocketAPI:
         self.api_url = settings.SHIPROCKET_API_URL
         self.email = settings.SHIPROCKET_API_EMAIL
         self.password = settings.SHIPROCKET_API_PASSWORD
+        self.timeout = getattr(settings, 'SHIPROCKET_TIMEOUT', 10)
     
     def get_token(self):
         """Get authentication token from Shiprocket using API credentials"""
@@ -31,7 +33,8 @@ class ShiprocketAPI:
         }
         
         try:
-            response = requests.post(url, json=payload)
+            with track_provider_call('shiprocket', 'login'):
+                response = requests.post(url, json=payload, timeout=self.timeout)
             response.raise_for_status()
             data = response.json()
             token = data.get('token')
@@ -129,7 +132,8 @@ class ShiprocketAPI:
         url = f"{self.api_url}/orders/create/adhoc"
         
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            with track_provider_call('shiprocket', 'create_order'):
+                response = requests.post(url, json=payload, headers=headers, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -150,7 +154,8 @@ class ShiprocketAPI:
         url = f"{self.api_url}/courier/assign/awb"
         
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            with track_provider_call('shiprocket', 'assign_awb'):
+                response = requests.post(url, json=payload, headers=headers, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -172,7 +177,8 @@ class ShiprocketAPI:
         }
         
         try:
-            response = requests.get(url, params=params, headers=headers)
+            with track_provider_call('shiprocket', 'serviceability'):
+                response = requests.get(url, params=params, headers=headers, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -188,7 +194,8 @@ class ShiprocketAPI:
         url = f"{self.api_url}/courier/track/awb/{awb_code}"
         
         try:
-            response = requests.get(url, headers=headers)
+            with track_provider_call('shiprocket', 'track'):
+                response = requests.get(url, headers=headers, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -208,7 +215,8 @@ class ShiprocketAPI:
         url = f"{self.api_url}/orders/cancel/shipment/awbs"
         
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            with track_provider_call('shiprocket', 'cancel'):
+                response = requests.post(url, json=payload, headers=headers, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
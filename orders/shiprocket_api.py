@@ -1,6 +1,7 @@
 import requests
 from django.conf import settings
 from django.core.cache import cache
+from utils.metrics import track_provider_call
 
 def get_shiprocket_token():
     """
@@ -13,7 +14,7 @@ def get_shiprocket_token():
     
     print("DEBUG: Getting new Shiprocket token")
     # Authenticate and get new token
-    url = "https://apiv2.shiprocket.in/v1/external/auth/login"
+    url = f"{settings.SHIPROCKET_API_URL}/auth/login"
     payload = {
         "email": settings.SHIPROCKET_API_EMAIL,
         "password": settings.SHIPROCKET_API_PASSWORD
@@ -21,7 +22,8 @@ def get_shiprocket_token():
     print(f"DEBUG: Authenticating with email: {settings.SHIPROCKET_API_EMAIL}")
     
     try:
-        response = requests.post(url, json=payload)
+        with track_provider_call('shiprocket', 'login'):
+            response = requests.post(url, json=payload, timeout=getattr(settings, 'SHIPROCKET_TIMEOUT', 10))
         print(f"DEBUG: Auth response status: {response.status_code}")
         
         data = response.json()
@@ -58,7 +60,7 @@ def check_pincode_serviceability(pincode, payment_method):
     print(f"DEBUG: Got Shiprocket token: {token[:20]}...")
     
     # Shiprocket API endpoint for serviceability
-    url = "https://apiv2.shiprocket.in/v1/external/courier/serviceability"
+    url = f"{settings.SHIPROCKET_API_URL}/courier/serviceability"
     headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json"
@@ -74,7 +76,8 @@ def check_pincode_serviceability(pincode, payment_method):
     print(f"DEBUG: Shiprocket API payload: {payload}")
     
     try:
-        response = requests.post(url, json=payload, headers=headers)
+        with track_provider_call('shiprocket', 'serviceability'):
+            response = requests.post(url, json=payload, headers=headers, timeout=getattr(settings, 'SHIPROCKET_TIMEOUT', 10))
         print(f"DEBUG: Shiprocket API response status: {response.status_code}")
         
         data = response.json()
@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save, pre_save
+import logging
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save, pre_delete, post_delete
 from django.dispatch import receiver
-from .models import Order
-from accounts.models import Notification
+from .models import Order, OrderItem
+from .services import SellerStatsService, PurchaseHistoryService
+from accounts.services import NotificationService
 from .utils import (
     send_order_confirmation_email,
     send_order_status_update_email,
@@ -13,6 +17,9 @@ from .utils import (
 # Track previous order status to detect changes
 _previous_status = {}
 
+# Orders being deleted; their cascaded items are handled by SellerStatsService.remove_order
+_deleting_orders = set()
+
 
 @receiver(pre_save, sender=Order)
 def save_previous_status(sender, instance, **kwargs):
@@ -25,6 +32,19 @@ def save_previous_status(sender, instance, **kwargs):
             pass
 
 
+def _send_new_order_emails(order):
+    """Email the customer, the sellers and the admin about a new order"""
+    for send, description in (
+        (send_order_confirmation_email, 'order confirmation email'),
+        (send_new_order_notification_to_seller, 'order notification to sellers'),
+        (send_order_notification_to_admin, 'order notification to admin'),
+    ):
+        try:
+            send(order)
+        except Exception as e:
+            logging.getLogger(__name__).error(f'Failed to send {description}: {str(e)}')
+
+
 @receiver(post_save, sender=Order)
 def create_order_notification(sender, instance, created, **kwargs):
     """Create notification and send emails when order is created or status changes"""
@@ -32,7 +52,7 @@ def create_order_notification(sender, instance, created, **kwargs):
     if created:
         # New order notification (in-app)
         if instance.user:
-            Notification.objects.create(
+            NotificationService.notify(
                 user=instance.user,
                 notification_type='order',
                 title=f'Order Placed Successfully!',
@@ -40,35 +60,24 @@ def create_order_notification(sender, instance, created, **kwargs):
                 link=f'/orders/order/{instance.id}/'
             )
         
-        # Send order confirmation email to customer
-        try:
-            send_order_confirmation_email(instance)
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f'Failed to send order confirmation email: {str(e)}')
-        
-        # Send order notification email to sellers
-        try:
-            send_new_order_notification_to_seller(instance)
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f'Failed to send order notification to sellers: {str(e)}')
-        
-        # Send order notification email to admin
-        try:
-            send_order_notification_to_admin(instance)
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f'Failed to send order notification to admin: {str(e)}')
+        # Emails go out once the order (and its items) is committed, never for a rolled-back checkout
+        transaction.on_commit(partial(_send_new_order_emails, instance))
             
     else:
         # Check if order status changed
         previous_status = _previous_status.get(instance.pk)
         status_changed = previous_status and previous_status != instance.order_status
         
+        if status_changed:
+            try:
+                SellerStatsService.move_order_status(instance, previous_status, instance.order_status)
+            except Exception as e:
+                logging.getLogger(__name__).error(f'Failed to update seller stats for order {instance.pk}: {str(e)}')
+            
+            # Verified-purchase set only depends on delivered orders
+            if 'delivered' in (previous_status, instance.order_status):
+                transaction.on_commit(partial(PurchaseHistoryService.invalidate, instance.user_id))
+        
         # Also check if order_status was in update_fields
         update_fields = kwargs.get('update_fields')
         status_in_update = update_fields and 'order_status' in update_fields
@@ -83,7 +92,7 @@ def create_order_notification(sender, instance, created, **kwargs):
             }
             
             if instance.order_status in status_messages and instance.user:
-                Notification.objects.create(
+                NotificationService.notify(
                     user=instance.user,
                     notification_type='order',
                     title=f'Order {instance.order_status.title()}',
@@ -103,3 +112,46 @@ def create_order_notification(sender, instance, created, **kwargs):
         # Clean up previous status tracking
         if instance.pk in _previous_status:
             del _previous_status[instance.pk]
+
+
+def _flush_seller_stats(order_id, item_ids):
+    """Record new items of an order; see SellerStatsService.record_items"""
+    try:
+        SellerStatsService.record_items(order_id, item_ids)
+    except Exception as e:
+        logging.getLogger(__name__).error(f'Failed to record seller stats for order {order_id}: {str(e)}')
+
+
+@receiver(post_save, sender=OrderItem)
+def add_item_to_seller_stats(sender, instance, created, raw=False, **kwargs):
+    """Add new order items to SellerDailyStats once the transaction commits (nothing is queued on rollback)"""
+    if created and not raw:
+        transaction.on_commit(partial(_flush_seller_stats, instance.order_id, [instance.pk]))
+
+
+@receiver(post_delete, sender=OrderItem)
+def remove_item_from_seller_stats(sender, instance, **kwargs):
+    """Take individually deleted order items back out of SellerDailyStats"""
+    if instance.order_id in _deleting_orders:
+        return
+    try:
+        SellerStatsService.remove_item(instance)
+    except Exception as e:
+        logging.getLogger(__name__).error(f'Failed to remove seller stats for item {instance.pk}: {str(e)}')
+
+
+@receiver(pre_delete, sender=Order)
+def remove_order_from_seller_stats(sender, instance, **kwargs):
+    """Subtract a deleted order from SellerDailyStats once per seller, before its items cascade"""
+    _deleting_orders.add(instance.pk)
+    if instance.order_status == 'delivered':
+        transaction.on_commit(partial(PurchaseHistoryService.invalidate, instance.user_id))
+    try:
+        SellerStatsService.remove_order(instance)
+    except Exception as e:
+        logging.getLogger(__name__).error(f'Failed to remove seller stats for order {instance.pk}: {str(e)}')
+
+
+@receiver(post_delete, sender=Order)
+def forget_deleted_order(sender, instance, **kwargs):
+    _deleting_orders.discard(instance.pk)
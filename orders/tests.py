@@ -1,3 +1,177 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from datetime import timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core import mail
+from django.db import transaction
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from benchmarks.seed import seed
+from cart.cart import Cart
+from coupons.models import Coupon
+from store.models import Product
+from .models import Order, OrderItem, SellerDailyStats
+from .services import SellerStatsService
+from .views_checkout import process_cod_order
+
+
+class SellerDailyStatsTests(TestCase):
+    """Incremental rollup maintenance must always agree with a full rebuild."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(sellers=2, products=4, users=1, categories=1)
+        cls.seller_a = User.objects.get(username='bench_seller_0')
+        cls.seller_b = User.objects.get(username='bench_seller_1')
+        cls.products_a = list(Product.objects.filter(seller=cls.seller_a).order_by('sku'))
+        cls.products_b = list(Product.objects.filter(seller=cls.seller_b).order_by('sku'))
+
+    def _place_order(self, lines, status='pending'):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(
+                first_name='Bench', last_name='Buyer', email='buyer@example.com', address='1 Road',
+                city='City', state='State', zipcode='000000', total_amount=Decimal('0'), order_status=status,
+            )
+            for product, quantity in lines:
+                OrderItem.objects.create(order=order, product=product, price=product.price, quantity=quantity)
+        return order
+
+    def _row(self, seller):
+        return SellerDailyStats.objects.get(seller=seller, date=timezone.localdate())
+
+    def _snapshot(self):
+        return sorted(SellerDailyStats.objects.exclude(units_sold=0, orders=0).values_list(
+            'seller_id', 'date', 'units_sold', 'revenue', 'orders',
+            *SellerStatsService.STATUS_FIELDS.values(),
+        ))
+
+    def assertMatchesRebuild(self):
+        incremental = self._snapshot()
+        SellerStatsService.rebuild()
+        self.assertEqual(incremental, self._snapshot())
+
+    def test_insert_counts_order_once_per_seller(self):
+        a1, a2 = self.products_a[:2]
+        self._place_order([(a1, 2), (a2, 1), (self.products_b[0], 3)])
+
+        row = self._row(self.seller_a)
+        self.assertEqual(row.units_sold, 3)
+        self.assertEqual(row.revenue, a1.price * 2 + a2.price)
+        self.assertEqual((row.orders, row.orders_pending), (1, 1))
+        self.assertEqual(self._row(self.seller_b).orders, 1)
+        self.assertMatchesRebuild()
+
+    def test_status_move_shifts_status_columns(self):
+        order = self._place_order([(self.products_a[0], 1), (self.products_b[0], 1)])
+        order.order_status = 'shipped'
+        order.save()
+
+        for seller in (self.seller_a, self.seller_b):
+            row = self._row(seller)
+            self.assertEqual((row.orders, row.orders_pending, row.orders_shipped), (1, 0, 1))
+        self.assertMatchesRebuild()
+
+    def test_deleting_order_subtracts_once_per_seller(self):
+        keep = self._place_order([(self.products_a[0], 1)])
+        doomed = self._place_order([(self.products_a[0], 2), (self.products_a[1], 1), (self.products_b[0], 1)], status='confirmed')
+        doomed.delete()
+
+        row = self._row(self.seller_a)
+        self.assertEqual((row.units_sold, row.orders, row.orders_pending, row.orders_confirmed), (1, 1, 1, 0))
+        self.assertEqual(row.revenue, self.products_a[0].price)
+        row_b = self._row(self.seller_b)
+        self.assertEqual((row_b.units_sold, row_b.orders, row_b.orders_confirmed), (0, 0, 0))
+        self.assertTrue(Order.objects.filter(pk=keep.pk).exists())
+        self.assertMatchesRebuild()
+
+    def test_deleting_single_item_keeps_order_while_seller_has_items(self):
+        order = self._place_order([(self.products_a[0], 1), (self.products_a[1], 1)])
+        order.items.get(product=self.products_a[1]).delete()
+        row = self._row(self.seller_a)
+        self.assertEqual((row.units_sold, row.orders), (1, 1))
+
+        order.items.get().delete()
+        row.refresh_from_db()
+        self.assertEqual((row.units_sold, row.orders, row.orders_pending), (0, 0, 0))
+        self.assertMatchesRebuild()
+
+    def test_rebuild_repairs_drifted_rows(self):
+        self._place_order([(self.products_a[0], 2), (self.products_b[0], 1)])
+        expected = self._snapshot()
+        SellerDailyStats.objects.filter(seller=self.seller_a).update(units_sold=999, orders=0)
+
+        SellerStatsService.rebuild(seller_ids=[self.seller_a.pk])
+        self.assertEqual(self._snapshot(), expected)
+
+    def test_rolled_back_items_are_never_recorded(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                order = Order.objects.create(
+                    first_name='Bench', last_name='Buyer', email='buyer@example.com', address='1 Road',
+                    city='City', state='State', zipcode='000000', total_amount=Decimal('0'),
+                )
+                OrderItem.objects.create(order=order, product=self.products_a[0], price=1, quantity=1)
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertFalse(SellerDailyStats.objects.exists())
+
+    def test_backfill_migration_matches_rebuild(self):
+        self._place_order([(self.products_a[0], 2), (self.products_a[1], 1), (self.products_b[0], 1)], status='shipped')
+        self._place_order([(self.products_b[0], 3)])
+        expected = self._snapshot()
+        SellerDailyStats.objects.all().delete()
+
+        import_module('orders.migrations.0007_backfill_seller_daily_stats').backfill(apps, None)
+        self.assertEqual(self._snapshot(), expected)
+
+
+class CodCheckoutTests(TestCase):
+    CUSTOMER = {
+        'first_name': 'Cod', 'last_name': 'Buyer', 'email': 'cod@example.com', 'address': '1 Road',
+        'city': 'City', 'state': 'State', 'zipcode': '000000',
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(sellers=1, products=1, users=0, categories=1)
+        cls.product = Product.objects.get()
+        now = timezone.now()
+        cls.coupon = Coupon.objects.create(
+            code='LASTONE', discount_type='fixed', discount_value=Decimal('10'), usage_limit=1,
+            valid_from=now - timedelta(days=1), valid_to=now + timedelta(days=1),
+        )
+
+    def _checkout(self, coupon):
+        request = RequestFactory().post('/orders/checkout/')
+        SessionMiddleware(lambda r: None).process_request(request)
+        request.user = AnonymousUser()
+        request._messages = FallbackStorage(request)
+        cart = Cart(request)
+        cart.add(self.product)
+        with self.captureOnCommitCallbacks(execute=True):
+            return process_cod_order(request, cart, self.product.price - 10, coupon, Decimal('10'), dict(self.CUSTOMER))
+
+    def test_exhausted_coupon_creates_no_order_and_sends_no_email(self):
+        Coupon.objects.filter(pk=self.coupon.pk).update(usage_count=1)  # Taken by a concurrent checkout
+
+        response = self._checkout(self.coupon)
+
+        self.assertEqual(response.url, '/orders/checkout/')
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(Product.objects.get().stock, self.product.stock)
+
+    def test_order_emails_are_sent_after_commit(self):
+        self._checkout(self.coupon)
+
+        order = Order.objects.get()
+        self.assertEqual(order.items.count(), 1)
+        self.assertTrue(mail.outbox)
+        self.coupon.refresh_from_db()
+        self.assertEqual(self.coupon.usage_count, 1)
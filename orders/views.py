@@ -8,6 +8,7 @@ from django.conf import settings
 # Import login_required before using it
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
+from utils.metrics import track_provider_call
 
 def verify_payment_status(cf_order_id):
     """Verify payment status with Cashfree API"""
@@ -19,10 +20,9 @@ def verify_payment_status(cf_order_id):
         secret_key = getattr(settings, 'CASHFREE_SECRET_KEY')
         env = getattr(settings, 'CASHFREE_ENV', 'TEST')
         
-        if env == 'PRODUCTION':
-            base_url = 'https://api.cashfree.com'
-        else:
-            base_url = 'https://sandbox.cashfree.com'
+        base_url = getattr(settings, 'CASHFREE_API_URL', '') or (
+            'https://api.cashfree.com' if env == 'PROD' else 'https://sandbox.cashfree.com'
+        )
         
         url = f"{base_url}/pg/orders/{cf_order_id}"
         
@@ -34,7 +34,8 @@ def verify_payment_status(cf_order_id):
         }
         
         logger.info(f'Verifying payment status for order {cf_order_id} at {url}')
-        response = requests.get(url, headers=headers, timeout=30)
+        with track_provider_call('cashfree', 'get_order'):
+            response = requests.get(url, headers=headers, timeout=30)
         
         if response.status_code == 200:
             data = response.json()
@@ -342,10 +343,9 @@ def checkout(request):
                 return redirect('cart:cart_detail')
             
             # Determine API endpoint
-            if env == 'TEST':
-                base_url = 'https://sandbox.cashfree.com'
-            else:
-                base_url = 'https://api.cashfree.com'
+            base_url = getattr(settings, 'CASHFREE_API_URL', '') or (
+                'https://sandbox.cashfree.com' if env == 'TEST' else 'https://api.cashfree.com'
+            )
             
             logger.info(f'Using Cashfree environment: {env}, URL: {base_url}')
             
@@ -383,12 +383,13 @@ def checkout(request):
                 logger.info(f'Creating Cashfree session for payment of ₹{final_amount}')
                 
                 # Make API call to Cashfree
-                response = requests.post(
-                    f'{base_url}/pg/orders',
-                    headers=headers,
-                    json=order_data,
-                    timeout=30
-                )
+                with track_provider_call('cashfree', 'create_order'):
+                    response = requests.post(
+                        f'{base_url}/pg/orders',
+                        headers=headers,
+                        json=order_data,
+                        timeout=30
+                    )
                 
                 logger.info(f'Cashfree API response status: {response.status_code}')
                 logger.info(f'Cashfree API response text: {response.text}')
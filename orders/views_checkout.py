@@ -5,6 +5,7 @@ UPDATED: Fixed Cashfree payment status handling for failed/cancelled payments
 """
 import uuid
 import logging
+from decimal import Decimal
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
@@ -16,6 +17,7 @@ from django.conf import settings
 from .models import Order, OrderItem
 from .cashfree_service import CashfreeService
 from cart.cart import Cart
+from coupons.services import CouponService
 from store.models import Product
 
 logger = logging.getLogger(__name__)
@@ -61,11 +63,14 @@ def checkout(request):
         else:
             mrp_total += float(product.price) * quantity
     
-    coupon_discount = request.session.get('coupon_discount', 0)
+    # Re-validate the applied coupon against the current cart
+    coupon, coupon_discount, coupon_error = CouponService.revalidate_session(request, cart.get_total_price_decimal())
+    if coupon_error:
+        messages.warning(request, coupon_error)
     
     # Handle form submission
     if request.method == 'POST':
-        return process_checkout(request, cart, coupon_discount)
+        return process_checkout(request, cart, coupon, coupon_discount)
     
     # Pre-fill form for authenticated users
     initial_data = {}
@@ -106,7 +111,7 @@ def checkout(request):
     })
 
 
-def process_checkout(request, cart, coupon_discount):
+def process_checkout(request, cart, coupon, coupon_discount):
     """
     Process checkout form submission and handle payment method
     """
@@ -163,10 +168,11 @@ def process_checkout(request, cart, coupon_discount):
             'zipcode': zipcode,
             'country': country,
             'phone': phone,
-            'coupon_discount': coupon_discount
+            'coupon_code': coupon.code if coupon else None,
+            'coupon_discount': str(coupon_discount)
         })
     elif payment_method == 'cod':
-        return process_cod_order(request, cart, final_amount, {
+        return process_cod_order(request, cart, final_amount, coupon, coupon_discount, {
             'first_name': first_name,
             'last_name': last_name,
             'email': email,
@@ -281,7 +287,7 @@ def process_cashfree_payment(request, cart, final_amount, customer_data):
     })
 
 
-def process_cod_order(request, cart, final_amount, customer_data):
+def process_cod_order(request, cart, final_amount, coupon, coupon_discount, customer_data):
     """
     Process Cash on Delivery order
     """
@@ -289,6 +295,13 @@ def process_cod_order(request, cart, final_amount, customer_data):
     
     try:
         with transaction.atomic():
+            # Count the coupon use first; bounded by usage_limit, so stop before
+            # creating the order (and sending its emails) if it ran out meanwhile
+            if coupon and not CouponService.reserve(coupon):
+                CouponService.clear_session(request)
+                messages.error(request, f'Coupon "{coupon.code}" is no longer available. Please review your order total.')
+                return redirect('orders:checkout')
+            
             # Create order
             order = Order.objects.create(
                 user=request.user if request.user.is_authenticated else None,
@@ -321,8 +334,12 @@ def process_cod_order(request, cart, final_amount, customer_data):
                 product.stock -= quantity
                 product.save(update_fields=['stock'])
             
+            if coupon:
+                CouponService.record_usage(coupon, order, request.user, coupon_discount)
+            
             # Clear cart
             cart.clear()
+            CouponService.clear_session(request)
             
             logger.info(f"COD order created: {order.id}")
             messages.success(request, f'Order {order.order_number} placed successfully!')
@@ -447,6 +464,13 @@ def create_confirmed_order(request, pending_order, cashfree_order_id):
                     logger.error(f"Product {product_id} not found")
                     continue
             
+            # Payment was already taken at the discounted amount, so the order is
+            # honoured even if the coupon ran out while the customer was paying
+            coupon = CouponService.get_coupon(customer.get('coupon_code'))
+            if coupon and not CouponService.redeem(coupon, order, request.user, Decimal(customer['coupon_discount'])):
+                logger.warning(f"Coupon {coupon.code} exhausted before payment {cashfree_order_id} was confirmed")
+            CouponService.clear_session(request)
+            
             # Clear session data
             if 'pending_order' in request.session:
                 del request.session['pending_order']
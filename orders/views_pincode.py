@@ -3,6 +3,7 @@ import json
 import time
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from utils.metrics import track_provider_call
 
 _shiprocket_token = None
 _shiprocket_token_expiry = 0
@@ -19,8 +20,11 @@ def get_shiprocket_token():
     password = getattr(settings, 'SHIPROCKET_API_PASSWORD', None)
     if not email or not password:
         return None
-    login_url = 'https://apiv2.shiprocket.in/v1/external/auth/login'
-    resp = requests.post(login_url, json={'email': email, 'password': password})
+    api_url = getattr(settings, 'SHIPROCKET_API_URL', 'https://apiv2.shiprocket.in/v1/external')
+    timeout = getattr(settings, 'SHIPROCKET_TIMEOUT', 10)
+    login_url = f'{api_url}/auth/login'
+    with track_provider_call('shiprocket', 'login'):
+        resp = requests.post(login_url, json={'email': email, 'password': password}, timeout=timeout)
     if resp.status_code == 200 and resp.json().get('token'):
         _shiprocket_token = resp.json()['token']
         # Shiprocket tokens are valid for 24 hours, but we'll refresh every 23 hours
@@ -40,7 +44,8 @@ def check_pincode(request):
         token = get_shiprocket_token()
         if not token:
             return JsonResponse({'message': 'Could not authenticate with Shiprocket.'})
-        url = f'https://apiv2.shiprocket.in/v1/external/courier/serviceability/'
+        api_url = getattr(settings, 'SHIPROCKET_API_URL', 'https://apiv2.shiprocket.in/v1/external')
+        url = f'{api_url}/courier/serviceability/'
         params = {
             'pickup_postcode': pickup_pincode,
             'delivery_postcode': pincode,
@@ -48,7 +53,8 @@ def check_pincode(request):
             'weight': 0.5,  # in kg, adjust as needed
         }
         headers = {'Authorization': f'Bearer {token}'}
-        r = requests.get(url, params=params, headers=headers)
+        with track_provider_call('shiprocket', 'serviceability'):
+            r = requests.get(url, params=params, headers=headers, timeout=getattr(settings, 'SHIPROCKET_TIMEOUT', 10))
         if r.status_code == 200:
             resp = r.json()
             if resp.get('status') == 200 and resp.get('data', {}).get('available_courier_companies'):
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+        ('store', '0014_lead_coupon_code'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', '-created_at'], name='review_product_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', '-helpful_count', '-created_at'], name='review_product_helpful_idx'),
+        ),
+    ]
@@ -17,6 +17,11 @@ class Review(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ('product', 'user')  # One review per user per product
+        indexes = [
+            # Review listings on product_detail: newest first / most helpful first
+            models.Index(fields=['product', '-created_at'], name='review_product_recent_idx'),
+            models.Index(fields=['product', '-helpful_count', '-created_at'], name='review_product_helpful_idx'),
+        ]
         
     def __str__(self):
         return f'{self.user.username} - {self.product.name} ({self.rating} stars)'
@@ -0,0 +1,93 @@
+"""
+Service layer for product reviews.
+"""
+from typing import Dict, Optional
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.paginator import Paginator, Page
+from django.db.models import Avg, Count
+from .models import Review
+
+
+class ReviewService:
+    """Service for paginated review listings and cached rating summaries."""
+
+    PAGE_SIZE = 10
+    STATS_CACHE_TIMEOUT = 60 * 30  # Invalidated on review save/delete
+    # Both orderings are served by the (product, ...) indexes on Review
+    SORTS = {
+        'helpful': ('-helpful_count', '-created_at', '-id'),
+        'recent': ('-created_at', '-id'),
+    }
+    DEFAULT_SORT = 'helpful'
+
+    @staticmethod
+    def _stats_key(product_id: int) -> str:
+        return f'review_stats_{product_id}'
+
+    @staticmethod
+    def get_stats(product_id: int) -> Dict[str, any]:
+        """
+        Get review count and average rating for a product.
+
+        Args:
+            product_id: Product primary key.
+
+        Returns:
+            Dictionary with review_count and average_rating.
+        """
+        key = ReviewService._stats_key(product_id)
+        stats = cache.get(key)
+        if stats is None:
+            row = Review.objects.filter(product_id=product_id).aggregate(count=Count('id'), average=Avg('rating'))
+            stats = {'review_count': row['count'], 'average_rating': round(row['average'] or 0, 1)}
+            cache.set(key, stats, ReviewService.STATS_CACHE_TIMEOUT)
+        return stats
+
+    @staticmethod
+    def invalidate_stats(product_id: int) -> None:
+        cache.delete(ReviewService._stats_key(product_id))
+
+    @staticmethod
+    def get_page(product_id: int, page: int = 1, sort: str = DEFAULT_SORT, count: Optional[int] = None) -> Page:
+        """
+        Get one page of a product's reviews.
+
+        Args:
+            product_id: Product primary key.
+            page: 1-based page number (out-of-range pages return the last page).
+            sort: 'helpful' (helpful_count, then newest) or 'recent'.
+            count: Known total review count, to skip the paginator's COUNT query.
+
+        Returns:
+            Page of Review instances with their users loaded.
+        """
+        ordering = ReviewService.SORTS.get(sort, ReviewService.SORTS[ReviewService.DEFAULT_SORT])
+        reviews = Review.objects.filter(product_id=product_id).select_related('user').only(
+            'id', 'product_id', 'rating', 'title', 'comment', 'created_at', 'verified_purchase', 'helpful_count',
+            'user__id', 'user__username', 'user__first_name', 'user__last_name',
+        ).order_by(*ordering)
+        paginator = Paginator(reviews, ReviewService.PAGE_SIZE)
+        if count is not None:
+            paginator.count = count
+        return paginator.get_page(page)
+
+    @staticmethod
+    def user_has_reviewed(product_id: int, user: User) -> bool:
+        if not user.is_authenticated:
+            return False
+        return Review.objects.filter(product_id=product_id, user=user).exists()
+
+    @staticmethod
+    def serialize(review: Review) -> Dict[str, any]:
+        """Review as a JSON-safe dictionary for the lazy-loading endpoint."""
+        return {
+            'id': review.id,
+            'author': review.user.get_full_name() or review.user.username,
+            'rating': review.rating,
+            'title': review.title,
+            'comment': review.comment,
+            'created_at': review.created_at.isoformat(),
+            'verified_purchase': review.verified_purchase,
+            'helpful_count': review.helpful_count,
+        }
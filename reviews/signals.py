@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Review
+from .services import ReviewService
+from utils import pagecache
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review_stats(sender, instance, **kwargs):
+    """Drop the cached rating summary and the cached pages showing it when a review changes"""
+    ReviewService.invalidate_stats(instance.product_id)
+    pagecache.bump_generation()
@@ -1,3 +1,78 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from benchmarks.seed import seed
+from orders.models import Order, OrderItem
+from orders.services import PurchaseHistoryService
+from store.models import Product
+from .models import Review
+from .services import ReviewService
+
+
+class ProductReviewListingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(sellers=1, products=1, users=0, categories=1)
+        cls.product = Product.objects.get()
+        for i in range(ReviewService.PAGE_SIZE + 3):
+            user = User.objects.create_user(f'reviewer_{i}')
+            Review.objects.create(product=cls.product, user=user, rating=5, title='t', comment=f'review {i}', helpful_count=i % 4)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_detail_renders_first_page_only(self):
+        response = self.client.get(reverse('store:product_detail', args=[self.product.slug]))
+        self.assertEqual(len(response.context['reviews']), ReviewService.PAGE_SIZE)
+        self.assertEqual(response.context['review_count'], ReviewService.PAGE_SIZE + 3)
+        helpful = [review.helpful_count for review in response.context['reviews']]
+        self.assertEqual(helpful, sorted(helpful, reverse=True))
+
+    def test_json_endpoint_pages_and_stops(self):
+        url = reverse('reviews:product_reviews', args=[self.product.id])
+        second = self.client.get(url, {'page': 2}).json()
+        self.assertEqual((len(second['reviews']), second['has_next']), (3, False))
+        self.assertEqual(self.client.get(url, {'page': 3}).json()['reviews'], [])
+
+    def test_stats_cache_invalidated_on_new_review(self):
+        before = ReviewService.get_stats(self.product.id)['review_count']
+        Review.objects.create(product=self.product, user=User.objects.create_user('late'), rating=1, title='t', comment='c')
+        self.assertEqual(ReviewService.get_stats(self.product.id)['review_count'], before + 1)
+
+
+class AddReviewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(sellers=1, products=1, users=1, categories=1)
+        cls.product = Product.objects.get()
+        cls.customer = User.objects.get(username='bench_user_0')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.customer)
+
+    def _deliver_order(self):
+        order = Order.objects.create(
+            user=self.customer, first_name='B', last_name='U', email='b@example.com', address='1 Road',
+            city='City', state='State', zipcode='000000', total_amount=self.product.price,
+        )
+        OrderItem.objects.create(order=order, product=self.product, price=self.product.price)
+        with self.captureOnCommitCallbacks(execute=True):
+            order.order_status = 'delivered'
+            order.save()
+
+    def _post_review(self):
+        return self.client.post(reverse('reviews:add_review', args=[self.product.id]), {'rating': 4, 'comment': 'Nice'})
+
+    def test_verified_purchase_follows_delivery(self):
+        self.assertFalse(PurchaseHistoryService.has_purchased(self.customer, self.product.id))  # cached empty set
+        self._deliver_order()
+        self._post_review()
+        self.assertTrue(Review.objects.get(user=self.customer).verified_purchase)
+
+    def test_second_review_is_rejected_by_constraint(self):
+        self._post_review()
+        self._post_review()
+        self.assertEqual(Review.objects.filter(user=self.customer, product=self.product).count(), 1)
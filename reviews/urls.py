@@ -6,4 +6,5 @@ app_name = 'reviews'
 urlpatterns = [
     path('add/<int:product_id>/', views.add_review, name='add_review'),
     path('delete/<int:review_id>/', views.delete_review, name='delete_review'),
+    path('product/<int:product_id>/', views.product_reviews, name='product_reviews'),
 ]
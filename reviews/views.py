@@ -1,30 +1,18 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.http import JsonResponse
 from .models import Review
+from .services import ReviewService
 from store.models import Product
-from orders.models import Order, OrderItem
+from orders.services import PurchaseHistoryService
 
 @login_required
 def add_review(request, product_id):
     product = get_object_or_404(Product, id=product_id)
     
-    # Check if user has purchased this product
-    has_purchased = OrderItem.objects.filter(
-        order__user=request.user,
-        product=product,
-        order__order_status='delivered'
-    ).exists()
-    
     if request.method == 'POST':
-        print(f"Review form submitted for product {product.id}")  # Debug
-        print(f"POST data: {request.POST}")  # Debug
-        
-        # Check if user already reviewed this product
-        if Review.objects.filter(product=product, user=request.user).exists():
-            messages.error(request, 'You have already reviewed this product.')
-            return redirect('store:product_detail', slug=product.slug)
-        
         rating = request.POST.get('rating')
         comment = request.POST.get('comment')
         slug = request.POST.get('slug', product.slug)
@@ -43,14 +31,21 @@ def add_review(request, product_id):
         except ValueError:
             messages.error(request, 'Invalid rating value.')
             return redirect('store:product_detail', slug=slug)
-        review = Review.objects.create(
-            product=product,
-            user=request.user,
-            rating=rating,
-            title=title,
-            comment=comment,
-            verified_purchase=has_purchased
-        )
+        
+        # One review per user per product is enforced by unique_together
+        try:
+            with transaction.atomic():
+                review = Review.objects.create(
+                    product=product,
+                    user=request.user,
+                    rating=rating,
+                    title=title,
+                    comment=comment,
+                    verified_purchase=PurchaseHistoryService.has_purchased(request.user, product.id)
+                )
+        except IntegrityError:
+            messages.error(request, 'You have already reviewed this product.')
+            return redirect('store:product_detail', slug=slug)
         
         # Send review notification email to seller
         try:
@@ -73,3 +68,25 @@ def delete_review(request, review_id):
     review.delete()
     messages.success(request, 'Review deleted successfully.')
     return redirect('store:product_detail', slug=product_slug)
+
+
+def product_reviews(request, product_id):
+    """JSON page of a product's reviews, lazy-loaded by the product detail page"""
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page = 1
+    sort = request.GET.get('sort', ReviewService.DEFAULT_SORT)
+    
+    stats = ReviewService.get_stats(product_id)
+    reviews_page = ReviewService.get_page(product_id, page, sort, count=stats['review_count'])
+    # get_page clamps out-of-range numbers to the last page; return nothing instead
+    reviews = reviews_page.object_list if reviews_page.number == page else []
+    
+    return JsonResponse({
+        'reviews': [ReviewService.serialize(review) for review in reviews],
+        'page': page,
+        'has_next': reviews_page.number == page and reviews_page.has_next(),
+        'review_count': stats['review_count'],
+        'average_rating': stats['average_rating'],
+    })
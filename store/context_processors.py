@@ -1,14 +1,24 @@
-from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from . import read_models
 from .models import Category
+from .read_models import CategoryLink
+
+
+def _load_categories():
+    return read_models.get_or_build(
+        'all_categories_list', CategoryLink,
+        lambda: read_models.category_links(Category.objects.all().order_by('name')),
+        60 * 60,
+    )  # Cache for 1 hour
 
 
 def categories(request):
-    """Make all categories available in all templates"""
-    categories_list = cache.get('all_categories_list')
-    if categories_list is None:
-        categories_list = list(Category.objects.all().order_by('name'))
-        cache.set('all_categories_list', categories_list, 60 * 60)  # Cache for 1 hour
+    """
+    Make all categories available in all templates.
+
+    Loaded lazily: the category nav and search hints in the base templates
+    are cached fragments, so most renders never evaluate the list.
+    """
     return {
-        'all_categories': categories_list,
+        'all_categories': SimpleLazyObject(_load_categories),
     }
-
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+from store.services import RecommendationService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild frequently-bought-together recommendations from order history (run from cron, e.g. nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=RecommendationService.TOP_K, help='Neighbors kept per product')
+        parser.add_argument('--min-count', type=int, default=1, help='Minimum number of shared orders for a pair')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['top_k'] < 1 or kwargs['min_count'] < 1:
+            raise CommandError('--top-k and --min-count must be at least 1')
+        count = RecommendationService.build(top_k=kwargs['top_k'], min_count=kwargs['min_count'])
+        self.stdout.write(self.style.SUCCESS(f'Stored recommendations for {count} product(s)'))
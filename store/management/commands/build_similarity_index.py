@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from store.services import SimilarityService
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the similar-products index from product names and descriptions (run from cron, e.g. nightly); '
+        'with --pending, only index products added or edited since (e.g. every few minutes)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=SimilarityService.TOP_K, help='Neighbors kept per product')
+        parser.add_argument('--pending', action='store_true', help='Only index new and edited products')
+        parser.add_argument('--limit', type=int, default=None, help='With --pending, maximum number of products')
+
+    def handle(self, *args, **kwargs):
+        if kwargs['top_k'] < 1:
+            raise CommandError('--top-k must be at least 1')
+        if kwargs['pending']:
+            count = SimilarityService.update_pending(top_k=kwargs['top_k'], limit=kwargs['limit'])
+            self.stdout.write(self.style.SUCCESS(f'Indexed {count} pending product(s)'))
+        else:
+            count = SimilarityService.build(top_k=kwargs['top_k'])
+            self.stdout.write(self.style.SUCCESS(f'Indexed {count} product(s)'))
@@ -0,0 +1,50 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Muted hero loops: H.264 for every browser, capped at 720p, moov atom first so playback starts while downloading
+FFMPEG_ARGS = [
+    '-an', '-c:v', 'libx264', '-preset', 'slow', '-crf', '28', '-pix_fmt', 'yuv420p',
+    '-vf', "scale='min(1280,iw)':-2", '-movflags', '+faststart',
+]
+
+
+class Command(BaseCommand):
+    help = 'Re-encode the hero videos in static/videos for the web (needs ffmpeg; run before collectstatic and commit the result)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--directory', default=str(Path(settings.BASE_DIR) / 'static' / 'videos'), help='Folder with the .mp4 files')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the videos that would be re-encoded')
+
+    def handle(self, *args, **kwargs):
+        ffmpeg = shutil.which('ffmpeg')
+        if not ffmpeg and not kwargs['dry_run']:
+            raise CommandError('ffmpeg is not installed')
+        videos = sorted(Path(kwargs['directory']).glob('*.mp4'))
+
+        saved = 0
+        for video in videos:
+            if kwargs['dry_run']:
+                self.stdout.write(f'{video.name}: {video.stat().st_size // 1024} KB')
+                continue
+            output = video.with_suffix('.web.mp4')
+            result = subprocess.run([ffmpeg, '-y', '-loglevel', 'error', '-i', str(video), *FFMPEG_ARGS, str(output)])
+            if result.returncode != 0:
+                output.unlink(missing_ok=True)
+                self.stderr.write(f'{video.name}: ffmpeg failed')
+                continue
+            before, after = video.stat().st_size, output.stat().st_size
+            if after < before:
+                # Same name, so templates and the manifest need no changes
+                output.replace(video)
+                saved += before - after
+                self.stdout.write(f'{video.name}: {before // 1024} KB -> {after // 1024} KB')
+            else:
+                output.unlink()
+                self.stdout.write(f'{video.name}: already optimized')
+
+        if not kwargs['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Saved {saved // 1024} KB across {len(videos)} video(s)'))
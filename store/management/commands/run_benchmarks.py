@@ -0,0 +1,119 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from benchmarks import seed as bench_seed
+from benchmarks.runner import BenchmarkRunner, compare
+from benchmarks.scenarios import SCENARIOS
+from orders.fake_providers import FakeProviderConfig, FakeProviderServer
+
+
+class Command(BaseCommand):
+    help = 'Seed benchmark data and measure latency/queries for home, listing, detail, cart and checkout'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sellers', type=int, default=5)
+        parser.add_argument('--products', type=int, default=500)
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--iterations', type=int, default=50, help='Recorded runs per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Unrecorded runs per scenario (fills caches)')
+        parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                            help='Scenario to run (repeatable, default: all)')
+        parser.add_argument('--authenticated-ratio', type=float, default=0.5,
+                            help='Share of virtual users that are logged-in customers')
+        parser.add_argument('--provider-latency-ms', type=float, default=50,
+                            help='Latency of the in-process fake Cashfree/Shiprocket server')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--skip-seed', action='store_true', help='Reuse existing bench data')
+        parser.add_argument('--flush', action='store_true', help='Delete bench data and exit')
+        parser.add_argument('--json', dest='json_path', help='Write results to this file')
+        parser.add_argument('--baseline', help='Compare against a previous --json output')
+        parser.add_argument('--max-regression', type=float, default=20.0,
+                            help='Allowed %% increase of p95/queries vs baseline before failing')
+        parser.add_argument('--force', action='store_true',
+                            help='Run even when DEBUG is False (seeds listings and places orders in this database)')
+        parser.add_argument('--queries-only', action='store_true',
+                            help='Only fail on query count regressions (latency is noisy on shared CI)')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError(
+                'DEBUG is False: refusing to seed bench products and place orders in what may be a '
+                'production database. Pass --force to run anyway.'
+            )
+
+        if options['flush']:
+            bench_seed.flush()
+            self.stdout.write(self.style.SUCCESS('Benchmark data removed'))
+            return
+
+        if not options['skip_seed']:
+            created = bench_seed.seed(
+                sellers=options['sellers'],
+                products=options['products'],
+                users=options['users'],
+                seed_value=options['seed'],
+            )
+            self.stdout.write(f'Seeded: {created}')
+
+        targets = bench_seed.load_targets()
+        if not targets['product_ids']:
+            raise CommandError('No benchmark products found; run without --skip-seed first')
+
+        fake = FakeProviderServer(port=0, config=FakeProviderConfig(
+            latency_ms=options['provider_latency_ms'], send_webhooks=False,
+        )).start()
+
+        scenarios = options['scenario'] or list(SCENARIOS)
+        runner = BenchmarkRunner(
+            targets,
+            iterations=options['iterations'],
+            warmup=options['warmup'],
+            authenticated_ratio=options['authenticated_ratio'],
+            seed_value=options['seed'],
+        )
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=['testserver'],
+                SECURE_SSL_REDIRECT=False,
+                EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                FAKE_PROVIDERS_ENABLED=True,
+                CASHFREE_API_URL=f'{fake.url}/cashfree',
+                SHIPROCKET_API_URL=f'{fake.url}/shiprocket/v1/external',
+            ):
+                results = runner.run(scenarios)
+        finally:
+            fake.stop()
+
+        self._print_results(results, runner.throughput, runner.scenario_throughput())
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump({
+                    'results': results,
+                    'throughput_rps': runner.throughput,
+                    'scenarios_per_second': runner.scenario_throughput(),
+                }, f, indent=2)
+            self.stdout.write(f"Results written to {options['json_path']}")
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)['results']
+            problems = compare(results, baseline, options['max_regression'], options['queries_only'])
+            if problems:
+                for problem in problems:
+                    self.stdout.write(self.style.ERROR(f'  REGRESSION {problem}'))
+                raise CommandError(f'{len(problems)} regression(s) over {options["max_regression"]}%')
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
+
+    def _print_results(self, results, throughput, scenario_throughput):
+        header = f"{'step':<40}{'reqs':>6}{'err':>5}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'max q':>7}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for key, r in results.items():
+            line = (f"{key:<40}{r['requests']:>6}{r['errors']:>5}{r['mean_ms']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}"
+                    f"{r['p99_ms']:>9}{r['mean_queries']:>9}{r['max_queries']:>7}")
+            self.stdout.write(self.style.ERROR(line) if r['errors'] else line)
+        for scenario, rate in scenario_throughput.items():
+            self.stdout.write(f'{scenario}: {rate} scenario runs/s (wall clock)')
+        self.stdout.write(f'Overall throughput: {throughput} req/s (wall clock, single client, sequential)')
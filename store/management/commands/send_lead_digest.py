@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from store.services import LeadService
+
+
+class Command(BaseCommand):
+    help = 'Email admins one digest of discount popup leads not yet reported (run from cron, e.g. hourly)'
+
+    def handle(self, *args, **kwargs):
+        count = LeadService.send_digest()
+        if count:
+            self.stdout.write(self.style.SUCCESS(f'Sent lead digest with {count} lead(s)'))
+        else:
+            self.stdout.write('No new leads')
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_is_listable(apps, schema_editor):
+    Product = apps.get_model('store', 'Product')
+    Product.objects.filter(
+        available=True, approved=True, seller__seller_profile__approval_status='approved',
+    ).update(is_listable=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0014_lead_coupon_code'),
+        ('accounts', '0009_notification_feed_retention_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='is_listable',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(backfill_is_listable, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_listable', True)), fields=['-created'], name='product_listable_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_listable', True)), fields=['category', '-created'], name='product_listable_cat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_listable', True)), fields=['category', 'price'], name='product_listable_cat_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_listable', True)), fields=['major_category', '-created'], name='product_listable_major_idx'),
+        ),
+    ]
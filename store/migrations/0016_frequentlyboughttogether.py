@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0015_product_is_listable'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FrequentlyBoughtTogether',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField(help_text='Co-purchase cosine similarity (0-1)')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='store.product')),
+                ('recommended', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bought_with', to='store.product')),
+            ],
+            options={
+                'ordering': ['product', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('product', 'rank'), name='fbt_product_rank_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0016_frequentlyboughttogether'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.IntegerField()),
+                ('weight', models.FloatField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='store.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', '-weight'], name='product_term_weight_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'term'), name='product_term_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SimilarProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField(help_text='Cosine similarity of the TF-IDF vectors (0-1)')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='store.product')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='store.product')),
+            ],
+            options={
+                'ordering': ['product', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('product', 'rank'), name='similar_product_rank_uniq')],
+            },
+        ),
+    ]
@@ -81,9 +81,15 @@ class Product(models.Model):
     available = models.BooleanField(default=True)
     featured = models.BooleanField(default=False)
     approved = models.BooleanField(default=False)  # Products need approval before being visible
+    # available AND approved AND seller approved; kept in sync by save() and
+    # ProductService.refresh_listing() so storefront queries need no seller joins
+    is_listable = models.BooleanField(default=False, editable=False)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
+    LISTING_FIELDS = ('available', 'approved', 'seller_id')
+    TEXT_FIELDS = ('name', 'description')  # Indexed by store/similarity.py
+
     class Meta:
         ordering = ['-created']
         indexes = [
@@ -92,6 +98,11 @@ class Product(models.Model):
             models.Index(fields=['sku']),
             models.Index(fields=['created']),
             models.Index(fields=['seller', 'approved']),
+            # Storefront listings only ever read listable rows
+            models.Index(fields=['-created'], condition=models.Q(is_listable=True), name='product_listable_created_idx'),
+            models.Index(fields=['category', '-created'], condition=models.Q(is_listable=True), name='product_listable_cat_idx'),
+            models.Index(fields=['category', 'price'], condition=models.Q(is_listable=True), name='product_listable_cat_price_idx'),
+            models.Index(fields=['major_category', '-created'], condition=models.Q(is_listable=True), name='product_listable_major_idx'),
         ]
         permissions = [
             ("can_add_product", "Can add product"),
@@ -101,7 +112,52 @@ class Product(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_listing_state = instance._listing_state()
+        instance._loaded_text = instance._text_state()
+        instance._loaded_in_stock = instance._in_stock_state()
+        return instance
+
+    def _listing_state(self):
+        # __dict__ so deferred fields are not loaded (they just force a recompute)
+        return tuple(self.__dict__.get(field) for field in self.LISTING_FIELDS)
+
+    def _text_state(self):
+        return tuple(self.__dict__.get(field) for field in self.TEXT_FIELDS)
+
+    def _in_stock_state(self):
+        stock = self.__dict__.get('stock')
+        return None if stock is None else stock > 0
+
+    def in_stock_changed(self) -> bool:
+        """True when the product went in or out of stock since loading (cards and filters show this)."""
+        return getattr(self, '_loaded_in_stock', None) != self._in_stock_state()
+
+    def text_changed(self) -> bool:
+        """True for new products and when name/description changed since loading."""
+        return getattr(self, '_loaded_text', None) != self._text_state()
+
+    def refresh_is_listable(self):
+        """Recompute is_listable; the seller's approval is only queried when it can matter."""
+        from accounts.models import SellerProfile
+        self.is_listable = bool(self.available and self.approved) and SellerProfile.objects.filter(
+            user_id=self.seller_id, approval_status='approved'
+        ).exists()
+
     def save(self, *args, **kwargs):
+        # Seller approval changes are applied in bulk, so an unchanged product keeps its flag
+        if getattr(self, '_loaded_listing_state', None) != self._listing_state():
+            self.refresh_is_listable()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'is_listable'}
+        # Stock is shown on the storefront and cache keys/validators derive from updated,
+        # so stock-only saves (checkout, cancellations) touch it too
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'stock' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'updated'}
         if not self.slug:
             base_slug = slugify(self.name)
             slug = base_slug
@@ -158,10 +214,13 @@ class Product(models.Model):
             except Exception as e:
                 logger.error(f"Error processing image for product {self.name}: {str(e)}")
         else:
-            logger.debug(f"Skipping image processing for product {self.name}: image_field={image_field}, image_field.name={getattr(image_field, 'name', None)}, image_field.file={getattr(image_field, 'file', None)}, image_field._file={getattr(image_field, '_file', None)}")
+            logger.debug(f"Skipping image processing for product {self.name}: image_field={image_field}, image_field.name={getattr(image_field, 'name', None)}, image_field._file={getattr(image_field, '_file', None)}")
 
         # Save first to get an ID for SKU generation (if new product)
         super().save(*args, **kwargs)
+        self._loaded_listing_state = self._listing_state()
+        self._loaded_text = self._text_state()
+        self._loaded_in_stock = self._in_stock_state()
 
         # Auto-generate SKU if not provided
         if not self.sku:
@@ -177,6 +236,10 @@ class Product(models.Model):
     def is_on_sale(self):
         return self.compare_price and self.compare_price > self.price
 
+    @property
+    def image_url(self):
+        return self.image.url if self.image else ''
+
     @property
     def discount_percentage(self):
         if self.is_on_sale:
@@ -282,3 +345,64 @@ class Lead(models.Model):
         return f"{self.name} - {self.mobile} ({self.coupon_code or 'No coupon'})"
 
 
+
+
+class FrequentlyBoughtTogether(models.Model):
+    """
+    Top co-purchased products for each product, ranked from 1.
+
+    Rebuilt offline from order history (manage.py build_recommendations);
+    read through RecommendationService.
+    """
+    product = models.ForeignKey(Product, related_name='+', on_delete=models.CASCADE)
+    recommended = models.ForeignKey(Product, related_name='bought_with', on_delete=models.CASCADE)
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField(help_text='Co-purchase cosine similarity (0-1)')
+
+    class Meta:
+        ordering = ['product', 'rank']
+        constraints = [
+            # Also the index behind the per-product lookup
+            models.UniqueConstraint(fields=['product', 'rank'], name='fbt_product_rank_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.product_id} -> {self.recommended_id} (#{self.rank})'
+
+
+class ProductTerm(models.Model):
+    """
+    Inverted index of hashed name/description terms with TF-IDF weights.
+
+    Rebuilt by manage.py build_similarity_index and kept current for edited
+    products by store.signals (see store/similarity.py).
+    """
+    term = models.IntegerField()
+    product = models.ForeignKey(Product, related_name='terms', on_delete=models.CASCADE)
+    weight = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'term'], name='product_term_uniq'),
+        ]
+        indexes = [
+            # Postings of a term, strongest first
+            models.Index(fields=['term', '-weight'], name='product_term_weight_idx'),
+        ]
+
+
+class SimilarProduct(models.Model):
+    """Most similar products by name/description for each product, ranked from 1."""
+    product = models.ForeignKey(Product, related_name='+', on_delete=models.CASCADE)
+    similar = models.ForeignKey(Product, related_name='similar_to', on_delete=models.CASCADE)
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField(help_text='Cosine similarity of the TF-IDF vectors (0-1)')
+
+    class Meta:
+        ordering = ['product', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'rank'], name='similar_product_rank_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.product_id} -> {self.similar_id} (#{self.rank})'
@@ -0,0 +1,207 @@
+"""
+Compact read models for cached catalog data.
+
+Caching Product/Category instances pickles the whole ORM object graph
+(model state, related caches, prefetched querysets); every cache hit then
+pays to unpickle it. The storefront only needs a handful of fields, so
+cached entries hold plain tuples of primitives and are turned back into
+these slotted dataclasses on read. Templates use them like model
+instances for the attributes they need (name, price, get_absolute_url...).
+
+Bump ROW_VERSION when a row layout changes so old entries are ignored.
+"""
+from dataclasses import astuple, dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from django.urls import reverse
+
+from utils.caching import get_or_compute, invalidate
+from utils.metrics import observe_cache_value
+
+ROW_VERSION = 1
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def timestamp_micros(value: Optional[datetime]) -> int:
+    return (value - EPOCH) // timedelta(microseconds=1) if value else 0
+
+
+def _datetime(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def _decimal(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+@dataclass(frozen=True, slots=True)
+class ProductCard:
+    """Fields rendered by the product card fragments."""
+    id: int
+    name: str
+    slug: str
+    price: Decimal
+    compare_price: Optional[Decimal]
+    image_url: str
+    stock: int
+    category_id: int
+    updated: datetime
+
+    @property
+    def pk(self) -> int:
+        return self.id
+
+    @property
+    def is_on_sale(self) -> bool:
+        return bool(self.compare_price and self.compare_price > self.price)
+
+    def get_absolute_url(self) -> str:
+        return reverse('store:product_detail', args=[self.slug])
+
+    @classmethod
+    def from_product(cls, product) -> 'ProductCard':
+        return cls(
+            product.id, product.name, product.slug, product.price, product.compare_price,
+            product.image_url, product.stock, product.category_id, product.updated,
+        )
+
+    def to_row(self) -> tuple:
+        return (
+            self.id, self.name, self.slug, str(self.price), _decimal(self.compare_price),
+            self.image_url, self.stock, self.category_id, timestamp_micros(self.updated),
+        )
+
+    @classmethod
+    def from_row(cls, row: tuple) -> 'ProductCard':
+        id_, name, slug, price, compare_price, image_url, stock, category_id, updated = row
+        return cls(
+            id_, name, slug, Decimal(price), None if compare_price is None else Decimal(compare_price),
+            image_url, stock, category_id, _datetime(updated),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class ProductDetail:
+    """Fields rendered by the product detail page (reviews are loaded separately)."""
+    id: int
+    name: str
+    slug: str
+    sku: str
+    description: str
+    price: Decimal
+    compare_price: Optional[Decimal]
+    image_url: str
+    image_urls: Tuple[str, ...]
+    stock: int
+    category_id: int
+    category_name: str
+    category_slug: str
+    updated: datetime
+
+    @property
+    def pk(self) -> int:
+        return self.id
+
+    @property
+    def is_on_sale(self) -> bool:
+        return bool(self.compare_price and self.compare_price > self.price)
+
+    def get_absolute_url(self) -> str:
+        return reverse('store:product_detail', args=[self.slug])
+
+    @classmethod
+    def from_product(cls, product) -> 'ProductDetail':
+        """Build from a Product with category selected and images prefetched."""
+        return cls(
+            product.id, product.name, product.slug, product.sku, product.description,
+            product.price, product.compare_price, product.image_url,
+            tuple(img.image.url for img in product.images.all() if img.image),
+            product.stock, product.category_id, product.category.name, product.category.slug, product.updated,
+        )
+
+    def to_row(self) -> tuple:
+        row = list(astuple(self))
+        row[5], row[6], row[13] = str(self.price), _decimal(self.compare_price), timestamp_micros(self.updated)
+        return tuple(row)
+
+    @classmethod
+    def from_row(cls, row: tuple) -> 'ProductDetail':
+        row = list(row)
+        row[5] = Decimal(row[5])
+        row[6] = None if row[6] is None else Decimal(row[6])
+        row[13] = _datetime(row[13])
+        return cls(*row)
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryLink:
+    """Category as used by navigation and filters."""
+    id: int
+    name: str
+    slug: str
+    listable_count: int = 0
+
+    def get_absolute_url(self) -> str:
+        return reverse('store:product_list_by_category', args=[self.slug])
+
+    @classmethod
+    def from_category(cls, category) -> 'CategoryLink':
+        return cls(category.id, category.name, category.slug, getattr(category, 'listable_count', 0))
+
+    def to_row(self) -> tuple:
+        return astuple(self)
+
+    @classmethod
+    def from_row(cls, row: tuple) -> 'CategoryLink':
+        return cls(*row)
+
+
+def _encode(key: str, value) -> tuple:
+    if isinstance(value, list):
+        payload = (ROW_VERSION, [item.to_row() for item in value])
+    else:
+        payload = (ROW_VERSION, value.to_row())
+    observe_cache_value(key, payload)
+    return payload
+
+
+def _decode(payload, model):
+    if not isinstance(payload, tuple) or len(payload) != 2 or payload[0] != ROW_VERSION:
+        return None
+    rows = payload[1]
+    if isinstance(rows, list):
+        return [model.from_row(row) for row in rows]
+    return model.from_row(rows)
+
+
+def get_or_build(key: str, model, build: Callable[[], object], timeout: int):
+    """
+    Cached read model(s) for key, built on a miss.
+
+    Entries are stored as plain rows through utils.caching.get_or_compute, so
+    hot keys get early refresh, a recompute lock and stale-while-revalidate.
+
+    Args:
+        key: Cache key (deleted by store.signals on changes).
+        model: Read model class the entry holds.
+        build: Callable returning a read model or a list of one kind.
+        timeout: Nominal freshness in seconds.
+
+    Returns:
+        A model instance or a list of them.
+    """
+    value = _decode(get_or_compute(key, lambda: _encode(key, build()), timeout), model)
+    if value is None:  # Written with an older row layout
+        invalidate(key)
+        value = _decode(get_or_compute(key, lambda: _encode(key, build()), timeout), model)
+    return value
+
+
+def cards(products: Iterable) -> List[ProductCard]:
+    return [ProductCard.from_product(product) for product in products]
+
+
+def category_links(categories: Iterable) -> List[CategoryLink]:
+    return [CategoryLink.from_category(category) for category in categories]
@@ -2,12 +2,26 @@
 Service layer for store business logic.
 Separates business logic from views for better maintainability and testability.
 """
-from typing import Optional, Dict, List, Tuple
-from django.db.models import Q, QuerySet, Avg, Sum, F
+import heapq
+import logging
+import math
+from collections import Counter, defaultdict
+from itertools import groupby, islice
+from operator import itemgetter
+from typing import Iterable, Optional, Dict, List, Tuple
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Q, QuerySet, Avg, Count, Sum, F
 from django.core.cache import cache
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.contrib.auth.models import User
-from .models import Product, Category
+from .models import Product, Category, Lead, FrequentlyBoughtTogether, ProductTerm, SimilarProduct
+from . import read_models, similarity
+from .read_models import CategoryLink, ProductCard
+from utils import caching, pagecache, ratelimit
+
+logger = logging.getLogger(__name__)
 
 
 class ProductService:
@@ -21,11 +35,37 @@ class ProductService:
         Returns:
             QuerySet of approved products with optimized queries.
         """
-        return Product.objects.filter(
-            available=True,
-            approved=True,
-            seller__seller_profile__approval_status='approved'
-        ).select_related('category', 'seller', 'seller__seller_profile')
+        return Product.objects.filter(is_listable=True).select_related('category')
+
+    @staticmethod
+    def refresh_listing(seller_ids) -> int:
+        """
+        Recompute Product.is_listable for all products of the given sellers.
+
+        Call after seller approval changes that bypass SellerProfile.save()
+        (e.g. queryset.update() in admin actions); saves are handled by
+        store.signals.
+
+        Args:
+            seller_ids: User ids of the sellers whose status changed.
+
+        Returns:
+            Number of products that are now listable.
+        """
+        from accounts.models import SellerProfile
+        seller_ids = list(seller_ids)
+        approved_ids = SellerProfile.objects.filter(
+            user_id__in=seller_ids, approval_status='approved'
+        ).values_list('user_id', flat=True)
+        Product.objects.filter(seller_id__in=seller_ids, is_listable=True).exclude(
+            seller_id__in=approved_ids, available=True, approved=True
+        ).update(is_listable=False)
+        listable = Product.objects.filter(
+            seller_id__in=approved_ids, available=True, approved=True, is_listable=False
+        ).update(is_listable=True)
+        caching.invalidate('home_new_arrivals', 'home_featured_products', 'home_best_selling_products', 'product_list_categories')
+        pagecache.bump_generation()
+        return listable
     
     @staticmethod
     def get_product_by_slug(slug: str) -> Optional[Product]:
@@ -139,25 +179,21 @@ class ProductService:
     @staticmethod
     def get_related_products(product: Product, limit: int = 4) -> List[Product]:
         """
-        Get related products from the same category.
+        Get related products: frequently bought together, then the same category.
         
         Args:
-            product: Product to find related items for.
+            product: Product (or ProductDetail) to find related items for.
             limit: Maximum number of related products.
             
         Returns:
-            List of related products.
+            List of ProductCard read models.
         """
         cache_key = f'related_products_{product.category_id}_{product.id}'
-        related = cache.get(cache_key)
-        
-        if related is None:
-            related = list(Product.objects.filter(
-                category=product.category,
-                available=True,
-                approved=True
-            ).exclude(id=product.id).select_related('category', 'seller')[:limit])
-            cache.set(cache_key, related, 60 * 30)  # Cache for 30 minutes
+        related = read_models.get_or_build(
+            cache_key, ProductCard,
+            lambda: read_models.cards(RecommendationService.bought_together(product.id, product.category_id, limit)),
+            60 * 30,
+        )  # Cache for 30 minutes; picks up a rebuild within that time
         
         return related
     
@@ -185,21 +221,333 @@ class ProductService:
         }
 
 
+class RecommendationService:
+    """Frequently-bought-together products from order history, with a same-category fallback."""
+
+    TOP_K = 8
+    MAX_BASKET_SIZE = 50  # Bulk orders say little about which products go together
+
+    @staticmethod
+    def build(top_k: int = TOP_K, min_count: int = 1) -> int:
+        """
+        Rebuild FrequentlyBoughtTogether from all non-cancelled orders.
+
+        Pairs are counted sparsely (only products that actually share an
+        order) and scored by cosine similarity of the products' order sets,
+        co_orders / sqrt(orders_a * orders_b), so best sellers do not end up
+        next to everything.
+
+        Args:
+            top_k: Neighbors kept per product.
+            min_count: Minimum number of shared orders for a pair.
+
+        Returns:
+            Number of products that got recommendations.
+        """
+        from orders.models import OrderItem
+        items = OrderItem.objects.exclude(order__order_status='cancelled').order_by('order_id').values_list(
+            'order_id', 'product_id'
+        ).iterator(chunk_size=5000)
+
+        orders_with = Counter()
+        co_orders = defaultdict(Counter)
+        for _, rows in groupby(items, key=itemgetter(0)):
+            basket = sorted({product_id for _, product_id in rows})
+            if len(basket) > RecommendationService.MAX_BASKET_SIZE:
+                continue
+            orders_with.update(basket)
+            for i, first in enumerate(basket):
+                for second in basket[i + 1:]:
+                    co_orders[first][second] += 1
+                    co_orders[second][first] += 1
+
+        neighbors = []
+        for product_id, counts in co_orders.items():
+            scored = [
+                (count / math.sqrt(orders_with[product_id] * orders_with[other]), count, other)
+                for other, count in counts.items() if count >= min_count
+            ]
+            for rank, (score, _, other) in enumerate(heapq.nlargest(top_k, scored), start=1):
+                neighbors.append(FrequentlyBoughtTogether(
+                    product_id=product_id, recommended_id=other, rank=rank, score=score,
+                ))
+
+        with transaction.atomic():
+            FrequentlyBoughtTogether.objects.all().delete()
+            FrequentlyBoughtTogether.objects.bulk_create(neighbors, batch_size=1000)
+        return len({row.product_id for row in neighbors})
+
+    @staticmethod
+    def bought_together(product_id: int, category_id: int, limit: int = 4) -> List[Product]:
+        """
+        Products bought with a product, topped up with similar products and then its category.
+
+        Args:
+            product_id: Product primary key.
+            category_id: Category used for the fallback.
+            limit: Maximum number of products.
+
+        Returns:
+            Listable products, best first.
+        """
+        products = list(Product.objects.filter(
+            bought_with__product_id=product_id, is_listable=True
+        ).order_by('bought_with__rank')[:limit])
+        if len(products) < limit:
+            # Then look-alikes by name/description
+            seen = {product_id, *(product.id for product in products)}
+            products += [
+                product for product in SimilarityService.similar(product_id, limit) if product.id not in seen
+            ][:limit - len(products)]
+        return RecommendationService._fill_from_categories(products, [product_id], [category_id], limit)
+
+    @staticmethod
+    def for_cart(products: Iterable[Product], limit: int = 4) -> List[Product]:
+        """
+        Products frequently bought with anything in the cart.
+
+        Args:
+            products: Products in the cart.
+            limit: Maximum number of products.
+
+        Returns:
+            Listable products not in the cart, highest combined score first.
+        """
+        products = list(products)
+        if not products:
+            return []
+        in_cart = [product.id for product in products]
+        ranked = FrequentlyBoughtTogether.objects.filter(
+            product_id__in=in_cart, recommended__is_listable=True
+        ).exclude(recommended_id__in=in_cart).values('recommended_id').annotate(
+            total=Sum('score')
+        ).order_by('-total', 'recommended_id')[:limit]
+        ids = [row['recommended_id'] for row in ranked]
+        by_id = Product.objects.in_bulk(ids)
+        recommended = [by_id[product_id] for product_id in ids if product_id in by_id]
+        category_ids = list(dict.fromkeys(product.category_id for product in products))
+        return RecommendationService._fill_from_categories(recommended, in_cart, category_ids, limit)
+
+    @staticmethod
+    def _fill_from_categories(products: List[Product], exclude_ids: List[int], category_ids: List[int],
+                              limit: int) -> List[Product]:
+        if len(products) >= limit:
+            return products
+        exclude_ids = [*exclude_ids, *(product.id for product in products)]
+        return products + list(Product.objects.filter(
+            category_id__in=category_ids, is_listable=True
+        ).exclude(id__in=exclude_ids).order_by('-created')[:limit - len(products)])
+
+
+class SimilarityService:
+    """Content-based similar products from hashed TF-IDF vectors (see store/similarity.py)."""
+
+    TOP_K = 8
+    CHUNK_SIZE = 2000
+
+    @staticmethod
+    def _counts_in_chunks():
+        # Term counts of available products, CHUNK_SIZE products at a time
+        rows = Product.objects.filter(available=True).order_by('pk').values_list(
+            'id', 'name', 'description'
+        ).iterator(chunk_size=SimilarityService.CHUNK_SIZE)
+        while chunk := list(islice(rows, SimilarityService.CHUNK_SIZE)):
+            yield [(product_id, similarity.term_counts(name, description)) for product_id, name, description in chunk]
+
+    @staticmethod
+    def build(top_k: int = TOP_K) -> int:
+        """
+        Rebuild ProductTerm and SimilarProduct for all available products.
+
+        Products are streamed three times (document frequencies, inverted
+        index, then vectors and neighbors), so memory is bounded by the
+        index rather than the catalog. Rows are replaced one chunk per
+        transaction; the storefront keeps reading the previous neighbors of
+        products not reached yet.
+
+        Args:
+            top_k: Neighbors kept per product.
+
+        Returns:
+            Number of products indexed.
+        """
+        document_frequencies, documents = Counter(), 0
+        for chunk in SimilarityService._counts_in_chunks():
+            for _, counts in chunk:
+                document_frequencies.update(counts.keys())
+            documents += len(chunk)
+
+        postings = {}
+        for chunk in SimilarityService._counts_in_chunks():
+            for product_id, counts in chunk:
+                similarity.add_postings(postings, product_id, similarity.vectorize(counts, document_frequencies, documents))
+
+        indexed = 0
+        for chunk in SimilarityService._counts_in_chunks():
+            terms, neighbors = [], []
+            for product_id, counts in chunk:
+                vector = similarity.vectorize(counts, document_frequencies, documents)
+                terms += [ProductTerm(product_id=product_id, term=term, weight=weight) for term, weight in vector.items()]
+                matches = similarity.top_k(similarity.query_terms(vector), postings, top_k, exclude=(product_id,))
+                neighbors += [
+                    SimilarProduct(product_id=product_id, similar_id=other, rank=rank, score=score)
+                    for rank, (score, other) in enumerate(matches, start=1)
+                ]
+            product_ids = [product_id for product_id, _ in chunk]
+            with transaction.atomic():
+                ProductTerm.objects.filter(product_id__in=product_ids).delete()
+                SimilarProduct.objects.filter(product_id__in=product_ids).delete()
+                ProductTerm.objects.bulk_create(terms, batch_size=5000)
+                SimilarProduct.objects.bulk_create(neighbors, batch_size=1000)
+            indexed += len(chunk)
+
+        # Products that went unavailable since the last build (deleted ones cascade)
+        unavailable = Product.objects.filter(available=False).values('pk')
+        ProductTerm.objects.filter(product_id__in=unavailable).delete()
+        SimilarProduct.objects.filter(product_id__in=unavailable).delete()
+        return indexed
+
+    @staticmethod
+    def mark_stale(product_id: int) -> None:
+        """Queue a product for update_pending() (a product without terms is pending)."""
+        ProductTerm.objects.filter(product_id=product_id).delete()
+
+    @staticmethod
+    def update_pending(top_k: int = TOP_K, limit: Optional[int] = None) -> int:
+        """
+        Index products added or edited since they were last indexed.
+
+        Run from cron (build_similarity_index --pending) rather than on the
+        request that saved the product.
+
+        Args:
+            top_k: Neighbors kept per product.
+            limit: Maximum number of products to process.
+
+        Returns:
+            Number of products processed.
+        """
+        pending = Product.objects.filter(available=True, terms__isnull=True).order_by('pk').values_list('pk', flat=True)
+        product_ids = list(pending[:limit] if limit else pending)
+        for product_id in product_ids:
+            SimilarityService.update_product(product_id, top_k)
+        return len(product_ids)
+
+    @staticmethod
+    def update_product(product_id: int, top_k: int = TOP_K) -> bool:
+        """
+        Re-index one product after its name/description changed.
+
+        IDF comes from the stored index, so weights drift slightly until the
+        next full build; other products pick this one up as a neighbor at
+        that build too.
+
+        Args:
+            product_id: Product primary key.
+            top_k: Neighbors kept.
+
+        Returns:
+            False if the product is gone or unavailable (its entries are removed).
+        """
+        row = Product.objects.filter(pk=product_id, available=True).values_list('name', 'description').first()
+        if row is None:
+            with transaction.atomic():
+                ProductTerm.objects.filter(product_id=product_id).delete()
+                SimilarProduct.objects.filter(product_id=product_id).delete()
+            return False
+
+        counts = similarity.term_counts(*row)
+        document_frequencies = dict(
+            ProductTerm.objects.filter(term__in=list(counts)).exclude(product_id=product_id).values('term').annotate(
+                df=Count('id')
+            ).values_list('term', 'df')
+        )
+        documents = Product.objects.filter(available=True).count()
+        vector = similarity.vectorize(counts, document_frequencies, documents)
+        terms = similarity.query_terms(vector)
+        matches = similarity.top_k(terms, SimilarityService._postings(terms), top_k, exclude=(product_id,))
+
+        with transaction.atomic():
+            ProductTerm.objects.filter(product_id=product_id).delete()
+            SimilarProduct.objects.filter(product_id=product_id).delete()
+            ProductTerm.objects.bulk_create(
+                [ProductTerm(product_id=product_id, term=term, weight=weight) for term, weight in vector.items()]
+            )
+            SimilarProduct.objects.bulk_create([
+                SimilarProduct(product_id=product_id, similar_id=other, rank=rank, score=score)
+                for rank, (score, other) in enumerate(matches, start=1)
+            ])
+        return True
+
+    @staticmethod
+    def _postings(terms, listable_only: bool = False) -> Dict[int, List[Tuple[float, int]]]:
+        # One short index range scan per term (product_term_weight_idx)
+        postings = {}
+        for term, _ in terms:
+            rows = ProductTerm.objects.filter(term=term)
+            if listable_only:
+                rows = rows.filter(product__is_listable=True)
+            postings[term] = [
+                (weight, product_id)
+                for product_id, weight in rows.order_by('-weight').values_list('product_id', 'weight')[:similarity.MAX_POSTINGS]
+            ]
+        return postings
+
+    @staticmethod
+    def similar(product_id: int, limit: int = 4) -> List[Product]:
+        """
+        Listable products most similar to a product by name/description.
+
+        Args:
+            product_id: Product primary key.
+            limit: Maximum number of products.
+
+        Returns:
+            Products, most similar first (one indexed query).
+        """
+        return list(Product.objects.filter(
+            similar_to__product_id=product_id, is_listable=True
+        ).order_by('similar_to__rank')[:limit])
+
+    @staticmethod
+    def search_backfill(query: str, exclude_ids: Iterable[int] = (), limit: int = 4) -> List[Product]:
+        """
+        Products sharing the most (weighted) words with a search query.
+
+        Used when a search has few exact matches.
+
+        Args:
+            query: Search text.
+            exclude_ids: Products already shown.
+            limit: Maximum number of products.
+
+        Returns:
+            Listable products, best match first.
+        """
+        terms = [(term, 1.0) for term in similarity.term_counts(query)]
+        if not terms:
+            return []
+        matches = similarity.top_k(terms, SimilarityService._postings(terms, listable_only=True), limit, exclude=exclude_ids)
+        by_id = Product.objects.in_bulk([product_id for _, product_id in matches])
+        return [by_id[product_id] for _, product_id in matches if product_id in by_id]
+
+
 class CategoryService:
     """Service for category-related business logic."""
     
     @staticmethod
-    def get_all_categories() -> QuerySet[Category]:
+    def get_all_categories() -> List[CategoryLink]:
         """
         Get all categories with caching.
         
         Returns:
-            Cached queryset of all categories.
+            Cached list of CategoryLink read models.
         """
-        categories = cache.get('all_categories')
-        if categories is None:
-            categories = Category.objects.all()
-            cache.set('all_categories', categories, 60 * 60)  # Cache for 1 hour
+        categories = read_models.get_or_build(
+            'all_categories', CategoryLink,
+            lambda: read_models.category_links(Category.objects.all()),
+            60 * 60,
+        )  # Cache for 1 hour
         return categories
     
     @staticmethod
@@ -231,43 +579,41 @@ class HomePageService:
             Dictionary containing new arrivals, featured, best selling, and categories.
         """
         # New arrivals
-        new_arrivals = cache.get('home_new_arrivals')
-        if new_arrivals is None:
-            new_arrivals = list(Product.objects.filter(
+        new_arrivals = read_models.get_or_build(
+            'home_new_arrivals', ProductCard,
+            lambda: read_models.cards(Product.objects.filter(
                 major_category='new_arrivals',
-                available=True,
-                approved=True,
-                seller__seller_profile__approval_status='approved'
-            ).select_related('category', 'seller').order_by('-created')[:8])
-            cache.set('home_new_arrivals', new_arrivals, 60 * 15)
+                is_listable=True
+            ).order_by('-created')[:8]),
+            60 * 15,
+        )
         
         # Featured products
-        featured_products = cache.get('home_featured_products')
-        if featured_products is None:
-            featured_products = list(Product.objects.filter(
+        featured_products = read_models.get_or_build(
+            'home_featured_products', ProductCard,
+            lambda: read_models.cards(Product.objects.filter(
                 major_category='featured',
-                available=True,
-                approved=True,
-                seller__seller_profile__approval_status='approved'
-            ).select_related('category', 'seller').order_by('-created')[:8])
-            cache.set('home_featured_products', featured_products, 60 * 15)
+                is_listable=True
+            ).order_by('-created')[:8]),
+            60 * 15,
+        )
         
         # Best selling
-        best_selling = cache.get('home_best_selling_products')
-        if best_selling is None:
-            best_selling = list(Product.objects.filter(
+        best_selling = read_models.get_or_build(
+            'home_best_selling_products', ProductCard,
+            lambda: read_models.cards(Product.objects.filter(
                 major_category='best_selling',
-                available=True,
-                approved=True,
-                seller__seller_profile__approval_status='approved'
-            ).select_related('category', 'seller').order_by('-created')[:8])
-            cache.set('home_best_selling_products', best_selling, 60 * 15)
+                is_listable=True
+            ).order_by('-created')[:8]),
+            60 * 15,
+        )
         
         # Categories
-        categories = cache.get('home_categories')
-        if categories is None:
-            categories = list(Category.objects.all()[:6])
-            cache.set('home_categories', categories, 60 * 60)
+        categories = read_models.get_or_build(
+            'home_categories', CategoryLink,
+            lambda: read_models.category_links(Category.objects.all()[:6]),
+            60 * 60,
+        )
         
         return {
             'new_arrivals': new_arrivals,
@@ -276,3 +622,108 @@ class HomePageService:
             'categories': categories,
         }
 
+
+
+class LeadService:
+    """Service for discount-popup lead capture (rate limited, deduplicated)."""
+    
+    IP_BURST = 5
+    IP_REFILL_SECONDS = 60  # One more submission per IP per minute after the burst
+    PHONE_BURST = 2
+    PHONE_REFILL_SECONDS = 60 * 60
+    DEDUP_TIMEOUT = 60 * 60 * 24
+    DIGEST_LIMIT = 500
+    
+    @staticmethod
+    def validate(name: str, phone: str) -> Optional[str]:
+        """
+        Validate popup input.
+        
+        Returns:
+            Error message, or None if valid.
+        """
+        if not name or not phone:
+            return 'Please provide both name and phone number.'
+        if not phone.isdigit() or len(phone) != 10:
+            return 'Please provide a valid 10-digit phone number.'
+        return None
+    
+    @staticmethod
+    def is_rate_limited(request, phone: str) -> bool:
+        """
+        Check the per-IP and per-phone token buckets.
+        
+        Args:
+            request: Current request (for the client IP).
+            phone: Submitted mobile number.
+            
+        Returns:
+            True if the submission should be rejected.
+        """
+        ip_allowed = ratelimit.allow(
+            f'lead_ip_{ratelimit.client_ip(request)}', LeadService.IP_BURST, LeadService.IP_REFILL_SECONDS
+        )
+        phone_allowed = ratelimit.allow(
+            f'lead_phone_{phone}', LeadService.PHONE_BURST, LeadService.PHONE_REFILL_SECONDS
+        )
+        return not (ip_allowed and phone_allowed)
+    
+    @staticmethod
+    def capture(name: str, phone: str, coupon_code: Optional[str] = None) -> bool:
+        """
+        Store a lead unless this mobile already left one.
+        
+        The row is inserted before the visitor is told it succeeded and the
+        dedup key is only set once it is stored, so a database error reaches
+        the view (which reports a failure) and the visitor can retry. No
+        email is sent here; admins get a periodic digest (send_lead_digest).
+        
+        Args:
+            name: Visitor name.
+            phone: 10-digit mobile number.
+            coupon_code: Coupon handed out to the visitor, if any.
+            
+        Returns:
+            True if the lead was stored, False if it was a duplicate.
+        """
+        seen_key = f'lead_seen_{phone}'
+        if cache.get(seen_key):
+            return False
+        if not Lead.objects.filter(mobile=phone).exists():
+            Lead.objects.create(name=name[:100], mobile=phone, coupon_code=coupon_code)
+            created = True
+        else:
+            created = False
+        cache.set(seen_key, 1, LeadService.DEDUP_TIMEOUT)
+        return created
+    
+    @staticmethod
+    def send_digest() -> int:
+        """
+        Email admins one summary of all leads not yet reported.
+        
+        Returns:
+            Number of leads included in the digest.
+        """
+        leads = list(Lead.objects.filter(email_sent=False).order_by('created')[:LeadService.DIGEST_LIMIT])
+        if not leads:
+            return 0
+        lines = [
+            f'{lead.created.strftime("%Y-%m-%d %H:%M")}  {lead.name}  {lead.mobile}  {lead.coupon_code or "-"}'
+            for lead in leads
+        ]
+        site_url = getattr(settings, 'SITE_URL', '').rstrip('/')
+        message = (
+            f'{len(leads)} new lead(s) from the discount popup:\n\n' + '\n'.join(lines) +
+            f'\n\nView all leads in the admin panel:\n{site_url}/admin/store/lead/\n'
+        )
+        admin_email = getattr(settings, 'ADMIN_EMAIL', settings.DEFAULT_FROM_EMAIL)
+        send_mail(
+            f'Lead digest: {len(leads)} new discount popup lead(s)',
+            message,
+            settings.DEFAULT_FROM_EMAIL,
+            [admin_email],
+            fail_silently=False,
+        )
+        Lead.objects.filter(pk__in=[lead.pk for lead in leads]).update(email_sent=True)
+        return len(leads)
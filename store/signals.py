@@ -1,9 +1,20 @@
+from django.conf import settings
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from accounts.models import SellerProfile
 from .models import Product, Category
+from .templatetags.store_fragments import invalidate_product_cards
+from utils import caching, pagecache
+
+# {% cache %} fragments in base.html / base_plain.html rendered from the category list
+CATEGORY_FRAGMENTS = ('category_nav', 'category_search_hints')
+
+# save(update_fields=...) that only changes stock (Product.save adds updated)
+STOCK_ONLY_FIELDS = frozenset({'stock', 'updated'})
 
 def create_seller_group_and_permissions(sender, **kwargs):
     """Create the Sellers group and assign permissions"""
@@ -34,17 +45,17 @@ def create_seller_group_and_permissions(sender, **kwargs):
 
 def _invalidate_product_cache(product_slug=None, category_id=None):
     """Helper function to invalidate product-related cache"""
+    keys = [
+        # Home page caches
+        'home_new_arrivals', 'home_featured_products', 'home_best_selling_products',
+        # Category caches (product_list_categories holds listable product counts)
+        'all_categories', 'home_categories', 'product_list_categories',
+    ]
     if product_slug:
-        cache.delete(f'product_detail_{product_slug}')
-    
-    # Clear home page caches
-    cache.delete('home_new_arrivals')
-    cache.delete('home_featured_products')
-    cache.delete('home_best_selling_products')
-    
-    # Clear category caches
-    cache.delete('all_categories')
-    cache.delete('home_categories')
+        keys.append(f'product_detail_{product_slug}')
+    # Also drops the keys from every worker's in-process tier
+    caching.invalidate(*keys)
+    pagecache.bump_generation()
     
     # Clear related products cache for this category
     # Note: We can't use delete_pattern with standard cache API,
@@ -82,20 +93,56 @@ def auto_approve_admin_products(sender, instance, created, **kwargs):
         if is_superuser or is_seller_approved:
             if not instance.approved:
                 instance.approved = True
-                Product.objects.filter(pk=instance.pk).update(approved=True)
+                instance.refresh_is_listable()
+                Product.objects.filter(pk=instance.pk).update(approved=True, is_listable=instance.is_listable)
+    
+    update_fields = kwargs.get('update_fields')
+    if not created and update_fields and update_fields <= STOCK_ONLY_FIELDS and not instance.in_stock_changed():
+        # Checkout/cancellation moved the count but the product stayed in (or out of) stock:
+        # only its detail page shows the number (page cache is versioned by updated)
+        caching.invalidate(f'product_detail_{instance.slug}')
+        return
     
     # Invalidate cache when product is saved/updated
     _invalidate_product_cache(product_slug=instance.slug, category_id=instance.category_id)
 
 
+@receiver(post_save, sender=Product)
+def update_similarity_index(sender, instance, created, **kwargs):
+    """Queue an edited product for re-indexing (new products have no terms, so they are queued already)"""
+    if settings.SIMILARITY_INCREMENTAL and not created and instance.text_changed():
+        from .services import SimilarityService
+        SimilarityService.mark_stale(instance.pk)
+
+
 @receiver(post_delete, sender=Product)
 def invalidate_cache_on_delete(sender, instance, **kwargs):
     """Invalidate cache when product is deleted"""
     _invalidate_product_cache(product_slug=instance.slug, category_id=instance.category_id)
+    invalidate_product_cards(instance)
+
+
+def _invalidate_category_cache():
+    """Helper function to invalidate category lists and the rendered category nav"""
+    caching.invalidate('all_categories', 'all_categories_list', 'home_categories', 'product_list_categories')
+    cache.delete_many([make_template_fragment_key(name) for name in CATEGORY_FRAGMENTS])
+    pagecache.bump_generation()
 
 
 @receiver(post_save, sender=Category)
 def invalidate_cache_on_category_save(sender, instance, **kwargs):
     """Invalidate cache when category is saved"""
-    cache.delete('all_categories')
-    cache.delete('home_categories')
\ No newline at end of file
+    _invalidate_category_cache()
+
+
+@receiver(post_delete, sender=Category)
+def invalidate_cache_on_category_delete(sender, instance, **kwargs):
+    """Invalidate cache when category is deleted"""
+    _invalidate_category_cache()
+
+
+@receiver(post_save, sender=SellerProfile)
+def refresh_listing_on_seller_save(sender, instance, **kwargs):
+    """Keep Product.is_listable in step with the seller's approval status"""
+    from .services import ProductService
+    ProductService.refresh_listing([instance.user_id])
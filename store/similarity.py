@@ -0,0 +1,114 @@
+"""
+Hashed TF-IDF vectors over product names and descriptions.
+
+Words are lowercased, stop words dropped, and hashed into HASH_BUCKETS
+feature ids with crc32 (the hashing trick), so no vocabulary is stored and
+new words need no refit. Name words count NAME_BOOST times. Weights are
+sublinear TF times smoothed IDF, cut to a product's MAX_TERMS strongest
+terms and L2-normalized, so the dot product of two vectors is their cosine
+similarity.
+
+Neighbors come from an inverted index (term -> products, strongest
+MAX_POSTINGS kept per term) probed with a product's QUERY_TERMS strongest
+terms. That bounds the work per product by QUERY_TERMS * MAX_POSTINGS
+whatever the catalog size, so a full rebuild grows linearly with the
+number of products and its memory with the number of distinct terms;
+the score is the cosine restricted to those terms.
+"""
+import heapq
+import math
+import re
+import zlib
+from collections import Counter, defaultdict
+from operator import itemgetter
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+HASH_BUCKETS = 1 << 20
+MAX_TERMS = 32
+QUERY_TERMS = 16
+MAX_POSTINGS = 200
+NAME_BOOST = 2
+
+TOKEN_RE = re.compile(r'[^\W_]{2,}')  # Letters and digits, any script
+TAG_RE = re.compile(r'<[^>]+>')  # Descriptions may contain HTML from the editor
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or our that the this to with you your'.split()
+)
+
+Vector = Dict[int, float]
+Postings = Mapping[int, List[Tuple[float, int]]]  # term -> [(weight, product id)], at most MAX_POSTINGS
+
+
+def term_id(token: str) -> int:
+    return zlib.crc32(token.encode()) % HASH_BUCKETS
+
+
+def term_counts(name: str, description: str = '') -> Counter:
+    """Hashed term frequencies of a product (or a search query passed as name)."""
+    counts = Counter()
+    for text, boost in ((name or '', NAME_BOOST), (TAG_RE.sub(' ', description or ''), 1)):
+        for token in TOKEN_RE.findall(text.lower()):
+            if token not in STOP_WORDS:
+                counts[term_id(token)] += boost
+    return counts
+
+
+def idf(document_frequency: int, documents: int) -> float:
+    return math.log((1 + documents) / (1 + document_frequency)) + 1
+
+
+def vectorize(counts: Mapping[int, int], document_frequencies: Mapping[int, int], documents: int) -> Vector:
+    """
+    Normalized TF-IDF vector of one product.
+
+    Args:
+        counts: Output of term_counts().
+        document_frequencies: Number of products containing each term.
+        documents: Number of products in the index.
+
+    Returns:
+        {term id: weight} with at most MAX_TERMS entries and unit length.
+    """
+    weights = {
+        term: (1 + math.log(count)) * idf(document_frequencies.get(term, 0), documents)
+        for term, count in counts.items()
+    }
+    strongest = heapq.nlargest(MAX_TERMS, weights.items(), key=itemgetter(1))
+    norm = math.sqrt(sum(weight * weight for _, weight in strongest)) or 1.0
+    return {term: weight / norm for term, weight in strongest}
+
+
+def query_terms(vector: Vector) -> List[Tuple[int, float]]:
+    return heapq.nlargest(QUERY_TERMS, vector.items(), key=itemgetter(1))
+
+
+def add_postings(postings: Dict[int, List[Tuple[float, int]]], product_id: int, vector: Vector) -> None:
+    """Add a product to an inverted index, keeping each term's MAX_POSTINGS strongest entries (min-heaps)."""
+    for term, weight in vector.items():
+        entries = postings.setdefault(term, [])
+        if len(entries) < MAX_POSTINGS:
+            heapq.heappush(entries, (weight, product_id))
+        elif weight > entries[0][0]:
+            heapq.heapreplace(entries, (weight, product_id))
+
+
+def top_k(terms: Iterable[Tuple[int, float]], postings: Postings, k: int, exclude: Iterable[int] = ()) -> List[Tuple[float, int]]:
+    """
+    Best matching products for weighted query terms.
+
+    Args:
+        terms: (term id, weight) pairs, e.g. query_terms(vector).
+        postings: Inverted index (see add_postings()).
+        k: Number of results.
+        exclude: Product ids to leave out (the product itself, results already shown).
+
+    Returns:
+        [(score, product id)], best first.
+    """
+    scores = defaultdict(float)
+    for term, weight in terms:
+        for other_weight, product_id in postings.get(term, ()):
+            scores[product_id] += weight * other_weight
+    for product_id in exclude:
+        scores.pop(product_id, None)
+    return heapq.nlargest(k, ((score, product_id) for product_id, score in scores.items()))
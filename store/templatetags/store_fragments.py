@@ -0,0 +1,65 @@
+"""
+Cached template fragments for the storefront.
+
+Product cards (Product instances or store.read_models.ProductCard) are
+rendered once per (variant, product id, updated timestamp, in/out of stock,
+FRAGMENT_CACHE_VERSION) and reused across requests and pages. Any save of
+the product changes its updated timestamp and therefore the key, so edits
+(price, stock, image) show up immediately. The stock state the cards render
+("Out of Stock") is part of the key as well, for cards built from rows
+whose stock was changed with a queryset update(); store/signals.py also
+drops the cards of deleted products.
+
+The cards contain add-to-cart forms, so the CSRF token is rendered as a
+placeholder and filled in with the current request's token after the cache
+lookup - the cached HTML never contains a per-user value.
+"""
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from store.read_models import timestamp_micros
+
+register = template.Library()
+
+CARD_VARIANTS = ('home', 'list', 'related')
+CSRF_PLACEHOLDER = '__csrf_token__'
+
+
+def product_card_key(product, variant: str) -> str:
+    # Microseconds: two saves can fall in the same second
+    stock = 'out' if product.stock == 0 else 'in'  # Same test as the card templates
+    return (
+        f'product_card_{variant}_{product.pk}_{timestamp_micros(product.updated)}_{stock}'
+        f'_v{settings.FRAGMENT_CACHE_VERSION}'
+    )
+
+
+def invalidate_product_cards(product) -> None:
+    """Drop the cached cards of a product (all variants) for its current timestamp."""
+    cache.delete_many([product_card_key(product, variant) for variant in CARD_VARIANTS])
+
+
+@register.simple_tag(takes_context=True)
+def product_card(context, product, variant):
+    """
+    Render a product card from templates/store/fragments/product_card_<variant>.html.
+
+    Usage: {% product_card product 'list' %}
+    """
+    if variant not in CARD_VARIANTS:
+        raise template.TemplateSyntaxError(f'Unknown product card variant: {variant!r}')
+    key = product_card_key(product, variant)
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(
+            f'store/fragments/product_card_{variant}.html',
+            {'product': product, 'csrf_token': CSRF_PLACEHOLDER},
+        )
+        cache.set(key, html, settings.FRAGMENT_CACHE_TIMEOUT)
+    request = context.get('request')
+    token = get_token(request) if request is not None else ''
+    return mark_safe(html.replace(CSRF_PLACEHOLDER, token))
@@ -1,3 +1,604 @@
-from django.test import TestCase
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import DatabaseError, connection
+from django.http import Http404, HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import ResolverMatch, reverse
+
+from accounts.models import Profile, SellerProfile
+from benchmarks.seed import seed
+from orders.models import Order, OrderItem
+from store import context_processors, similarity
+from store.models import Category, FrequentlyBoughtTogether, Lead, Product, ProductTerm, SimilarProduct
+from store.read_models import ProductCard
+from store.services import LeadService, ProductService, RecommendationService, SimilarityService
+from store.templatetags.store_fragments import product_card_key
+from utils import caching, pagecache, staticfiles
+from utils.caching import local_cache
+from utils.db import ReplicaRouter, use_primary, use_replica
+from utils.decorators import query_budget
+from utils.metrics import CACHE_VALUE_BYTES
+from utils.middleware import (
+    QueryBudgetExceeded, ReplicaPinningMiddleware, RequestMetrics, RequestMetricsMiddleware, _current_metrics,
+)
+from utils.pagecache import CSRF_PLACEHOLDER
+from utils.staticfiles import _CSS_TOKEN_RE, _css_token
+
+def _run_queries(count):
+    with connection.cursor() as cursor:
+        for _ in range(count):
+            cursor.execute('SELECT 1')
+
+
+@query_budget(2)
+def budgeted_view(request):
+    _run_queries(int(request.GET.get('queries', 0)))
+    return HttpResponse('ok')
+
+
+class CatalogTestCase(TestCase):
+    """Catalog from benchmarks.seed (override SEED), with an empty cache for every test."""
+
+    SEED = {'sellers': 1, 'products': 2, 'users': 0, 'categories': 1}
+
+    @classmethod
+    def setUpTestData(cls):
+        seed(**cls.SEED)
+
+    def setUp(self):
+        cache.clear()
+
+
+class QueryBudgetTests(TestCase):
+    """Strict-mode query budgets must fail the request that breaches them."""
+
+    def _call(self, queries):
+        request = RequestFactory().get('/budgeted/', {'queries': queries})
+        request.resolver_match = ResolverMatch(budgeted_view, (), {}, url_name='budgeted')
+        middleware = RequestMetricsMiddleware(lambda req: req.resolver_match.func(req))
+        return middleware(request)
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_decorated_view_within_budget_passes(self):
+        self.assertEqual(self._call(2).status_code, 200)
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_decorated_view_over_budget_raises(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self._call(3)
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_non_strict_mode_only_logs(self):
+        with self.assertLogs('utils.middleware', level='WARNING'):
+            self.assertEqual(self._call(3).status_code, 200)
+
+    @override_settings(QUERY_BUDGET_STRICT=True, QUERY_BUDGETS={'store:home': 0}, PAGE_CACHE_ENABLED=False)
+    def test_settings_budget_applies_to_real_view(self):
+        cache.clear()  # Cold read-model caches, so the view has to query
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('store:home'))
+
+
+class CacheInstrumentationTests(TestCase):
+    def test_get_many_counts_each_key_once(self):
+        RequestMetricsMiddleware(lambda request: HttpResponse())
+        cache.set('metrics-test-hit', 1)
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            cache.get_many(['metrics-test-hit', 'metrics-test-miss'])
+        finally:
+            _current_metrics.reset(token)
+        self.assertEqual((metrics.cache_hits, metrics.cache_misses), (1, 1))
+
+
+class MetricsViewAccessTests(TestCase):
+    @override_settings(DEBUG=False, METRICS_TOKEN='', METRICS_ALLOWED_IPS=['10.0.0.5'])
+    def test_no_token_outside_debug_rejects_unlisted_ip(self):
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.9')
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(DEBUG=False, METRICS_TOKEN='', METRICS_ALLOWED_IPS=['10.0.0.5'])
+    def test_no_token_outside_debug_allows_listed_ip(self):
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.5')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(DEBUG=False, METRICS_TOKEN='s3cret')
+    def test_token_required_when_configured(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+
+
+class LeadPipelineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _submit(self, phone, ip='198.51.100.7'):
+        return self.client.post(
+            reverse('store:submit_lead'), data=f'{{"name": "Visitor", "phone": "{phone}"}}',
+            content_type='application/json', REMOTE_ADDR=ip,
+        )
+
+    def test_leads_are_stored_deduplicated_and_mailed_as_digest(self):
+        self._submit('9000000001')
+        self._submit('9000000001')
+        self._submit('9000000002')
+        self.assertEqual(sorted(Lead.objects.values_list('mobile', flat=True)), ['9000000001', '9000000002'])
+        self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(LeadService.send_digest(), 2)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(Lead.objects.filter(email_sent=False).exists())
+
+    def test_failed_insert_reports_failure_and_allows_a_retry(self):
+        with mock.patch.object(Lead.objects, 'create', side_effect=DatabaseError('disk full')):
+            self.assertFalse(self._submit('9000000005').json()['success'])
+        self.assertTrue(self._submit('9000000005').json()['success'])
+        self.assertTrue(Lead.objects.filter(mobile='9000000005').exists())
+
+    def test_ip_rate_limit(self):
+        statuses = [self._submit(f'90000001{i:02d}').status_code for i in range(LeadService.IP_BURST + 1)]
+        self.assertEqual(statuses[-1], 429)
+        self.assertEqual(statuses.count(200), LeadService.IP_BURST)
+        self.assertEqual(self._submit('9000000999', ip='198.51.100.8').status_code, 200)
+
+
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch('utils.db.replica_configured', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_use_replica_only_inside_scope_and_for_catalog_apps(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Product))
+        with use_replica():
+            self.assertEqual(router.db_for_read(Product), 'replica')
+            self.assertIsNone(router.db_for_read(Profile))
+            with use_primary():
+                self.assertIsNone(router.db_for_read(Product))
+
+    def test_write_pins_request_and_sets_cookie(self):
+        router = ReplicaRouter()
+        reads = []
+
+        def view(request):
+            with use_replica():
+                reads.append(router.db_for_read(Product))
+                router.db_for_write(Product)
+                reads.append(router.db_for_read(Product))
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(view)(RequestFactory().get('/'))
+        self.assertEqual(reads, ['replica', None])
+        self.assertIn(ReplicaPinningMiddleware.COOKIE_NAME, response.cookies)
+
+        pinned_request = RequestFactory().get('/')
+        pinned_request.COOKIES[ReplicaPinningMiddleware.COOKIE_NAME] = '1'
+        reads.clear()
+        ReplicaPinningMiddleware(view)(pinned_request)
+        self.assertEqual(reads[0], None)
+
+
+class FragmentCacheTests(CatalogTestCase):
+    SEED = dict(CatalogTestCase.SEED, products=3, users=1, categories=2)
+
+    def _render(self, template_string, **context):
+        return Template(template_string).render(Context(dict(context, request=RequestFactory().get('/'))))
+
+    def test_product_card_is_cached_without_the_csrf_token(self):
+        product = Product.objects.first()
+        template = "{% load store_fragments %}{% product_card product 'list' %}"
+        first = self._render(template, product=product)
+        cached = cache.get(product_card_key(product, 'list'))
+        self.assertIn(product.name, cached)
+        self.assertIn('__csrf_token__', cached)
+        self.assertNotIn('__csrf_token__', first)
+
+        with self.assertNumQueries(0):
+            self._render(template, product=product)
+
+        product.price = product.price + 1
+        product.save()
+        self.assertIn(f'₹{product.price}', self._render(template, product=Product.objects.get(pk=product.pk)))
+
+    def test_stock_only_saves_change_the_card(self):
+        product = Product.objects.first()
+        template = "{% load store_fragments %}{% product_card product 'list' %}"
+        self.assertNotIn('Out of Stock', self._render(template, product=product))
+
+        # How checkout decrements stock
+        product.stock = 0
+        product.save(update_fields=['stock'])
+        product = Product.objects.get(pk=product.pk)
+        self.assertIn('Out of Stock', self._render(template, product=product))
+
+        product.stock = 5
+        product.save(update_fields=['stock'])
+        self.assertNotIn('Out of Stock', self._render(template, product=Product.objects.get(pk=product.pk)))
+
+    def test_category_nav_fragment_is_invalidated_on_category_save(self):
+        template = '{% load cache %}{% cache 3600 category_nav %}{% for c in all_categories %}{{ c.name }};{% endfor %}{% endcache %}'
+        self._render(template, **context_processors.categories(None))
+        with self.assertNumQueries(0):
+            self._render(template, **context_processors.categories(None))
+
+        category = Category.objects.first()
+        category.name = 'Renamed Category'
+        category.save()
+        self.assertIn('Renamed Category', self._render(template, **context_processors.categories(None)))
+
+
+class ListableFlagTests(CatalogTestCase):
+    def test_seller_status_changes_update_products(self):
+        profile = SellerProfile.objects.get()
+        profile.approval_status = 'suspended'
+        profile.save()
+        self.assertFalse(Product.objects.filter(is_listable=True).exists())
+        self.assertEqual(len(self.client.get(reverse('store:product_list')).context['products'].object_list), 0)
+
+        # Admin actions use queryset.update() and refresh explicitly
+        SellerProfile.objects.filter(pk=profile.pk).update(approval_status='approved')
+        self.assertEqual(ProductService.refresh_listing([profile.user_id]), 2)
+        self.assertEqual(ProductService.get_approved_products().count(), 2)
+
+    def test_product_save_recomputes_only_when_listing_fields_change(self):
+        product = Product.objects.first()
+        product.stock -= 1
+        with CaptureQueriesContext(connection) as queries:
+            product.save()
+        self.assertFalse(any('accounts_sellerprofile' in q['sql'] for q in queries.captured_queries))
+
+        product.available = False
+        product.save()
+        self.assertFalse(Product.objects.get(pk=product.pk).is_listable)
+
+
+class ReadModelCacheTests(CatalogTestCase):
+    SEED = dict(CatalogTestCase.SEED, products=3)
+
+    @override_settings(PAGE_CACHE_ENABLED=False)  # Exercise the view, not the page cache
+    def test_pages_cache_plain_rows_and_render_from_them(self):
+        product = Product.objects.first()
+        url = reverse('store:product_detail', args=[product.slug])
+        self.client.get(url)
+        payload, expires_at, compute_seconds = cache.get(f'product_detail_{product.slug}')
+        self.assertFalse(any(isinstance(value, Product) for value in payload[1]))
+        self.assertIn('family="product_detail"', '\n'.join(CACHE_VALUE_BYTES.render()))
+
+        response = self.client.get(url)
+        self.assertEqual(response.context['product'].price, product.price)
+        self.assertContains(response, product.name)
+        self.assertEqual(len(response.context['related_products']), 2)
+
+    def test_row_round_trip(self):
+        product = Product.objects.first()
+        card = ProductCard.from_product(product)
+        self.assertEqual(ProductCard.from_row(card.to_row()), card)
+        self.assertEqual(card.get_absolute_url(), product.get_absolute_url())
+
+
+class StampedeProtectionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_stale_value_is_served_while_another_request_refreshes(self):
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+        self.assertEqual(caching.get_or_compute('stampede_key', compute, 60), 1)
+        self.assertEqual(caching.get_or_compute('stampede_key', compute, 60), 1)
+
+        # Past the logical expiry while the lock is held elsewhere: stale value, no recompute
+        value, expires_at, delta = cache.get('stampede_key')
+        cache.set('stampede_key', (value, expires_at - 3600, delta), 600)
+        cache.add('stampede_key:lock', 1, 30)
+        self.assertEqual(caching.get_or_compute('stampede_key', compute, 60), 1)
+        self.assertEqual(len(calls), 1)
+
+        # Lock released: the next request refreshes
+        cache.delete('stampede_key:lock')
+        self.assertEqual(caching.get_or_compute('stampede_key', compute, 60), 2)
+        self.assertIsNone(cache.get('stampede_key:lock'))
+
+        with mock.patch.object(caching.random, 'uniform', return_value=1.1):
+            self.assertEqual(caching.jittered(100), 110)
+
+    def test_failed_compute_caches_nothing_and_releases_lock(self):
+        def missing():
+            raise Http404
+        with self.assertRaises(Http404):
+            caching.get_or_compute('missing_key', missing, 60)
+        self.assertIsNone(cache.get('missing_key'))
+        self.assertIsNone(cache.get('missing_key:lock'))
+
+
+@override_settings(LOCAL_CACHE_ENABLED=True, LOCAL_CACHE_CHECK_INTERVAL=0, LOCAL_CACHE_MAX_ENTRIES=2)
+class LocalCacheTierTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+
+    def test_hot_keys_are_served_locally_until_another_worker_invalidates(self):
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+        self.assertEqual(caching.get_or_compute('home_sections', compute, 60), 1)
+        cache.delete('home_sections')  # Shared copy gone, local copy still valid
+        self.assertEqual(caching.get_or_compute('home_sections', compute, 60), 1)
+
+        cache.set(caching.GENERATION_KEY, 'bumped-by-another-worker', None)
+        self.assertEqual(caching.get_or_compute('home_sections', compute, 60), 2)
+
+        caching.invalidate('home_sections')
+        self.assertEqual(caching.get_or_compute('home_sections', compute, 60), 3)
+
+    def test_only_designated_families_are_local_and_size_is_bounded(self):
+        caching.get_or_compute('product_detail_x', lambda: 1, 60)
+        self.assertIs(caching.local_cache.get('product_detail_x'), caching._MISSING)
+
+        for key in ('home_a', 'home_b', 'home_c'):
+            caching.get_or_compute(key, lambda: key, 60)
+        self.assertIs(caching.local_cache.get('home_a'), caching._MISSING)
+        self.assertEqual(caching.local_cache.get('home_c'), 'home_c')
+
+
+class PageCacheTests(CatalogTestCase):
+    def test_anonymous_pages_are_cached_without_personal_values(self):
+        url = reverse('store:product_list')
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('public', first['Cache-Control'])
+        self.assertIn('s-maxage', first['Cache-Control'])
+        self.assertIn('Cookie', first['Vary'])
+        self.assertContains(first, CSRF_PLACEHOLDER)
+        self.assertNotIn('csrftoken', first.cookies)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        # Catalog changes bump the page generation
+        product = Product.objects.first()
+        product.name = 'Renamed Product'
+        product.save()
+        self.assertContains(self.client.get(url), 'Renamed Product')
+
+    def test_stock_only_saves_refresh_the_product_page_without_a_generation_bump(self):
+        product = Product.objects.filter(stock__gt=1).first()
+        detail_url = reverse('store:product_detail', args=[product.slug])
+        list_url = reverse('store:product_list')
+        self.assertContains(self.client.get(detail_url), f'max="{product.stock}"')
+        self.client.get(list_url)
+        page_generation, local_generation = pagecache.generation(), cache.get(caching.GENERATION_KEY)
+
+        # How checkout decrements stock
+        product.stock -= 1
+        product.save(update_fields=['stock'])
+        self.assertEqual(pagecache.generation(), page_generation)
+        self.assertEqual(cache.get(caching.GENERATION_KEY), local_generation)
+        self.assertContains(self.client.get(detail_url), f'max="{product.stock}"')
+        with self.assertNumQueries(0):
+            self.client.get(list_url)  # Other pages stay cached
+
+        # Selling out changes the cards and the in-stock filter everywhere
+        product.stock = 0
+        product.save(update_fields=['stock'])
+        self.assertNotEqual(pagecache.generation(), page_generation)
+
+    def test_visitors_with_a_session_get_private_uncached_pages(self):
+        User.objects.create_user('shopper', password='pw')
+        self.client.login(username='shopper', password='pw')
+        for _ in range(2):
+            response = self.client.get(reverse('store:home'))
+            self.assertIn('private', response['Cache-Control'])
+            self.assertIsNotNone(response.context)  # Rendered by the view every time
+
+    def test_session_state_endpoint(self):
+        self.client.post(reverse('cart:cart_add', args=[self._product_id()]), {'quantity': 2})
+        response = self.client.get(reverse('cart:session_state'))
+        data = response.json()
+        self.assertEqual(data['count'], 2)
+        self.assertFalse(data['authenticated'])
+        self.assertTrue(data['csrf_token'])
+        self.assertIn('no-store', response['Cache-Control'])
+
+    def _product_id(self):
+        return Product.objects.values_list('id', flat=True).first()
+
+
+class ConditionalGetTests(CatalogTestCase):
+    def test_unchanged_product_page_is_not_rendered_again(self):
+        product = Product.objects.first()
+        url = reverse('store:product_detail', args=[product.slug])
+        first = self.client.get(url)
+        self.assertTrue(first.has_header('Last-Modified'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+        product.name = 'Renamed Product'
+        product.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertContains(response, 'Renamed Product')
+
+    def test_category_page_validators_and_missing_category(self):
+        category = Category.objects.first()
+        url = reverse('store:product_list_by_category', args=[category.slug])
+        first = self.client.get(url)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        missing = reverse('store:product_list_by_category', args=['no-such-category'])
+        self.assertEqual(self.client.get(missing, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 404)
+
+
+class StaticPipelineTests(TestCase):
+    def test_css_minifier_keeps_strings_and_license_comments(self):
+        css = '/*! keep */\na ,\nb {\n  color : red ;\n}\n/* drop */\n.c { content: "x  /* y */"; margin: calc(1px + 2px) }'
+        self.assertEqual(
+            _CSS_TOKEN_RE.sub(_css_token, css).strip(),
+            '/*! keep */ a,b{color : red;} .c{content: "x  /* y */";margin: calc(1px + 2px)}',
+        )
+
+    def test_serve_prefers_precompressed_hashed_files(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(STATIC_ROOT=root):
+            path = Path(root) / 'app.0123456789ab.css'
+            path.write_text('body { color: red; }\n' * 200)
+            self.assertEqual(staticfiles.precompress(str(path)), [str(path) + '.gz'])
+
+            request = RequestFactory().get('/static/app.0123456789ab.css', HTTP_ACCEPT_ENCODING='gzip, deflate')
+            response = staticfiles.serve(request, 'app.0123456789ab.css')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(response['Content-Type'], 'text/css')
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertIn('Accept-Encoding', response['Vary'])
+            response.close()
+
+            response = staticfiles.serve(RequestFactory().get('/'), 'app.0123456789ab.css')
+            self.assertFalse(response.has_header('Content-Encoding'))
+            response.close()
+
+            with self.assertRaises(SuspiciousFileOperation):
+                staticfiles.serve(RequestFactory().get('/'), '../outside.css')
+
+
+class RecommendationTests(CatalogTestCase):
+    SEED = dict(CatalogTestCase.SEED, products=6)
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.products = list(Product.objects.order_by('id'))
+
+    def _order(self, *products, status='pending'):
+        order = Order.objects.create(
+            first_name='A', last_name='B', email='a@example.com', address='1 Road', city='C', state='S',
+            zipcode='1', total_amount=0, order_status=status,
+        )
+        OrderItem.objects.bulk_create([OrderItem(order=order, product=p, price=p.price) for p in products])
+
+    def test_build_ranks_co_purchases_and_serves_them_with_fallback(self):
+        a, b, c, d = self.products[:4]
+        self._order(a, b)
+        self._order(a, b)
+        self._order(a, b, c)
+        self._order(a, c)
+        self._order(a, d, status='cancelled')
+        self.assertEqual(RecommendationService.build(top_k=2), 3)
+
+        self.assertEqual(
+            list(FrequentlyBoughtTogether.objects.filter(product=b).values_list('recommended_id', 'rank')),
+            [(a.id, 1), (c.id, 2)],
+        )
+        with self.assertNumQueries(3):  # Neighbors, similar products, then the category top-up
+            related = RecommendationService.bought_together(a.id, a.category_id, limit=4)
+        self.assertEqual([p.id for p in related[:2]], [b.id, c.id])  # d only shared a cancelled order
+        self.assertEqual(len(related), 4)
+        self.assertNotIn(a.id, [p.id for p in related])
+
+        self.assertEqual([p.id for p in RecommendationService.for_cart([b], limit=2)], [a.id, c.id])
+
+    def test_pages_show_recommendations(self):
+        a, b = self.products[:2]
+        self._order(a, b)
+        RecommendationService.build()
+
+        response = self.client.get(reverse('store:product_detail', args=[a.slug]))
+        self.assertEqual(response.context['related_products'][0].id, b.id)
+
+        self.client.post(reverse('cart:cart_add', args=[a.id]), {'quantity': 1})
+        response = self.client.get(reverse('cart:cart_detail'))
+        self.assertEqual(response.context['bought_together'][0].id, b.id)
+        self.assertContains(response, 'Frequently Bought Together')
+
+
+class SimilarityTests(CatalogTestCase):
+    NAMES = [
+        ('Rose Glow Face Serum', 'Vitamin C serum for glowing skin'),
+        ('Rose Glow Night Serum', 'Overnight <b>vitamin</b> serum with rose oil'),
+        ('Matte Red Lipstick', 'Long lasting matte lipstick'),
+        ('Nude Matte Lipstick', 'Creamy matte lipstick in nude'),
+        ('Charcoal Face Wash', 'Deep cleansing face wash'),
+        ('Aloe Body Lotion', 'Light lotion for dry skin'),
+    ]
+
+    SEED = dict(CatalogTestCase.SEED, products=len(NAMES))
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.products = list(Product.objects.order_by('id'))
+        for product, (name, description) in zip(cls.products, cls.NAMES):
+            Product.objects.filter(pk=product.pk).update(name=name, description=description)
+
+    def test_vectors_are_normalized_hashed_terms(self):
+        counts = similarity.term_counts('Rose Serum', 'The <p>rose</p> serum, for skin')
+        self.assertEqual(counts[similarity.term_id('rose')], 3)  # Name words count twice, tags and stop words dropped
+        self.assertNotIn(similarity.term_id('the'), counts)
+        self.assertNotIn(similarity.term_id('p'), counts)
+        vector = similarity.vectorize(counts, {similarity.term_id('skin'): 5}, 10)
+        self.assertAlmostEqual(sum(weight * weight for weight in vector.values()), 1.0)
+        self.assertGreater(vector[similarity.term_id('rose')], vector[similarity.term_id('skin')])
+
+    def test_build_ranks_products_by_shared_words(self):
+        face_serum, night_serum, red_lipstick, nude_lipstick = self.products[:4]
+        with mock.patch.object(SimilarityService, 'CHUNK_SIZE', 4):  # Two chunks
+            self.assertEqual(SimilarityService.build(top_k=3), len(self.NAMES))
+        self.assertEqual(SimilarityService.similar(face_serum.id, limit=1)[0].id, night_serum.id)
+        self.assertEqual(SimilarityService.similar(red_lipstick.id, limit=1)[0].id, nude_lipstick.id)
+        self.assertNotIn(face_serum.id, [p.id for p in SimilarityService.similar(face_serum.id)])
+
+        with self.assertNumQueries(1):
+            SimilarityService.similar(face_serum.id)
+
+        # A rebuild replaces rows and drops products that went unavailable
+        Product.objects.filter(pk=nude_lipstick.pk).update(available=False)
+        self.assertEqual(SimilarityService.build(top_k=3), len(self.NAMES) - 1)
+        self.assertFalse(ProductTerm.objects.filter(product=nude_lipstick).exists())
+        self.assertNotIn(nude_lipstick.id, [p.id for p in SimilarityService.similar(red_lipstick.id)])
+
+    def test_edited_products_are_reindexed_by_the_pending_run(self):
+        SimilarityService.build()
+        self.assertEqual(SimilarityService.update_pending(), 0)
+        lotion, wash = self.products[5], self.products[4]
+        lotion.refresh_from_db()
+        lotion.name = 'Charcoal Face Scrub'
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            lotion.save()
+        self.assertEqual(callbacks, [])  # Nothing runs on the saving request
+        self.assertEqual(SimilarityService.update_pending(), 1)
+        self.assertEqual(SimilarityService.similar(lotion.id, limit=1)[0].id, wash.id)
+
+        lotion.stock += 1
+        lotion.save()
+        self.assertEqual(SimilarityService.update_pending(), 0)  # Text unchanged
+
+        Product.objects.filter(pk=lotion.pk).update(available=False)
+        self.assertFalse(SimilarityService.update_product(lotion.id))
+        self.assertFalse(SimilarProduct.objects.filter(product=lotion).exists())
+
+    def test_search_backfills_few_matches(self):
+        SimilarityService.build()
+        face_serum, night_serum, _, _, face_wash = self.products[:5]
+        backfill = SimilarityService.search_backfill('face serum', exclude_ids=[face_serum.id], limit=2)
+        self.assertEqual({p.id for p in backfill}, {night_serum.id, face_wash.id})
+
+        response = self.client.get(reverse('store:product_list'), {'q': 'night serum'})
+        self.assertEqual([p.id for p in response.context['products']], [night_serum.id])
+        self.assertIn(face_serum.id, [p.id for p in response.context['similar_results']])
+        self.assertNotIn(night_serum.id, [p.id for p in response.context['similar_results']])
+        self.assertContains(response, 'You May Also Like')
@@ -1,18 +1,27 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib import messages
 from django.core.cache import cache
 from django.views.decorators.cache import cache_page
 from django.views.decorators.vary import vary_on_headers
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse
 from django.views import View
 from django.db import connection
 from django.conf import settings
 from .models import Category, Product
+from . import read_models
+from .read_models import CategoryLink, ProductCard, ProductDetail
 from .forms import ProductForm
+from .services import ProductService, SimilarityService
 from accounts.models import SellerProfile
+from utils.metrics import registry as metrics_registry
+from utils.db import replica_reads
+from utils.pagecache import anonymous_page_cache, conditional_page
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class HealthCheckView(View):
@@ -69,10 +78,78 @@ class HealthCheckView(View):
             return {'healthy': False, 'message': f'Cache error: {str(e)}'}
 
 
+def _queue_depths():
+    """Work waiting on staff or background jobs, computed at scrape time"""
+    from orders.models import Order
+    from .models import Lead
+    return {
+        (('queue', 'orders_pending'),): Order.objects.filter(order_status='pending').count(),
+        (('queue', 'orders_awaiting_shipment'),): Order.objects.filter(
+            paid=True, shiprocket_order_id__isnull=True, order_status__in=['confirmed', 'processing']
+        ).count(),
+        (('queue', 'leads_email_unsent'),): Lead.objects.filter(email_sent=False).count(),
+        (('queue', 'products_pending_approval'),): Product.objects.filter(approved=False).count(),
+        (('queue', 'sellers_pending_approval'),): SellerProfile.objects.filter(approval_status='pending').count(),
+    }
+
+
+QUEUE_DEPTH = metrics_registry.gauge('queue_depth', 'Items waiting in each work queue', callback=_queue_depths)
+COMPONENT_HEALTH = metrics_registry.gauge('component_healthy', '1 if the component check passed, else 0')
+
+
+class MetricsView(HealthCheckView):
+    """
+    Prometheus scrape endpoint
+    Runs the health checks and renders all registered metrics as text
+    
+    Access: bearer METRICS_TOKEN when configured; otherwise, outside DEBUG,
+    only clients listed in METRICS_ALLOWED_IPS
+    """
+    
+    def get(self, request):
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        if token:
+            if request.headers.get('Authorization') != f'Bearer {token}':
+                return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+        elif not settings.DEBUG and request.META.get('REMOTE_ADDR') not in getattr(settings, 'METRICS_ALLOWED_IPS', []):
+            return HttpResponse('Forbidden', status=403, content_type='text/plain')
+        
+        COMPONENT_HEALTH.set(int(self.check_database()['healthy']), component='database')
+        COMPONENT_HEALTH.set(int(self.check_cache()['healthy']), component='cache')
+        
+        return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 def about_page(request):
     return render(request, 'store/about.html')
 
 
+def _product_detail(slug):
+    """Cached product core (reviews are paginated separately); 404 if unavailable."""
+    return read_models.get_or_build(
+        f'product_detail_{slug}', ProductDetail,
+        lambda: ProductDetail.from_product(get_object_or_404(
+            Product.objects.select_related('category').prefetch_related('images'),
+            slug=slug,
+            available=True
+        )),
+        60 * 30,
+    )  # Cache for 30 minutes
+
+
+def _product_updated(request, slug):
+    return _product_detail(slug).updated
+
+
+def _category_updated(request, category_slug=None):
+    if category_slug is None:
+        return read_models.EPOCH  # Listing changes are covered by the page generation
+    return Category.objects.filter(slug=category_slug).values_list('updated', flat=True).first()
+
+
+@conditional_page(_category_updated)
+@anonymous_page_cache(skip_params=('q',))
+@replica_reads
 def product_list(request, category_slug=None):
     if hasattr(request.user, 'profile') and request.user.profile.is_seller:
         from django.contrib import messages
@@ -93,18 +170,17 @@ def product_list(request, category_slug=None):
     use_cache = not query and not min_price and not max_price and not featured and not in_stock
     
     category = None
-    # Cache categories list (they don't change often)
-    categories = cache.get('all_categories')
-    if categories is None:
-        categories = Category.objects.all()
-        cache.set('all_categories', categories, 60 * 60)  # Cache for 1 hour
+    # Cache categories with their listable product counts (invalidated on product/category changes)
+    categories = read_models.get_or_build(
+        'product_list_categories', CategoryLink,
+        lambda: read_models.category_links(Category.objects.annotate(
+            listable_count=Count('products', filter=Q(products__is_listable=True))
+        )),
+        60 * 60,
+    )  # Cache for 1 hour
     
     # Only show approved products from approved sellers (optimized query)
-    products = Product.objects.filter(
-        available=True,
-        approved=True,
-        seller__seller_profile__approval_status='approved'
-    ).select_related('category', 'seller', 'seller__seller_profile')
+    products = Product.objects.filter(is_listable=True).select_related('category')
     
     if category_slug:
         category = get_object_or_404(Category, slug=category_slug)
@@ -152,10 +228,18 @@ def product_list(request, category_slug=None):
     except EmptyPage:
         products = paginator.page(paginator.num_pages)
     
+    # Few exact matches: suggest products whose names/descriptions share the search words
+    similar_results = []
+    if query and paginator.count < paginator.per_page:
+        similar_results = read_models.cards(SimilarityService.search_backfill(
+            query, exclude_ids=[product.id for product in products], limit=paginator.per_page - paginator.count,
+        ))
+    
     context = {
         'category': category,
         'categories': categories,
         'products': products,
+        'similar_results': similar_results,
         'query': query,
         'min_price': min_price,
         'max_price': max_price,
@@ -168,103 +252,80 @@ def product_list(request, category_slug=None):
     return render(request, 'store/product/list.html', context)
 
 
+@conditional_page(_product_updated)
+@anonymous_page_cache(version=_product_updated)
+@replica_reads
 def product_detail(request, slug):
     if hasattr(request.user, 'profile') and request.user.profile.is_seller:
         from django.contrib import messages
         messages.error(request, 'Sellers cannot view product details.')
         return redirect('accounts:seller_dashboard')
     
-    # Cache product detail
-    cache_key = f'product_detail_{slug}'
-    cached_product = cache.get(cache_key)
+    product = _product_detail(slug)
     
-    if cached_product:
-        product = cached_product
-    else:
-        product = get_object_or_404(
-            Product.objects.select_related('category', 'seller', 'seller__seller_profile')
-            .prefetch_related('reviews', 'images'),
-            slug=slug,
-            available=True
-        )
-        cache.set(cache_key, product, 60 * 30)  # Cache for 30 minutes
-    
-    # Cache related products
-    related_cache_key = f'related_products_{product.category_id}_{product.id}'
-    related_products = cache.get(related_cache_key)
-    
-    if related_products is None:
-        related_products = Product.objects.filter(
-            category=product.category, 
-            available=True,
-            approved=True
-        ).select_related('category', 'seller').exclude(id=product.id)[:4]
-        cache.set(related_cache_key, list(related_products), 60 * 30)  # Cache for 30 minutes
-    
-    # Get reviews data
-    reviews = product.reviews.all() if hasattr(product, 'reviews') else []
-    average_rating = 0
-    if reviews:
-        from django.db.models import Avg
-        avg = reviews.aggregate(Avg('rating'))['rating__avg']
-        average_rating = avg if avg else 0
-    
-    # Check if user has already reviewed
-    user_has_reviewed = False
-    if request.user.is_authenticated and reviews:
-        user_has_reviewed = reviews.filter(user=request.user).exists()
+    # Frequently bought together, topped up from the category (cached for 30 minutes)
+    related_products = ProductService.get_related_products(product, limit=4)
+    
+    # First page of reviews (most helpful first); further pages load from reviews:product_reviews
+    from reviews.services import ReviewService
+    from orders.services import PurchaseHistoryService
+    review_stats = ReviewService.get_stats(product.id)
+    reviews_page = ReviewService.get_page(product.id, count=review_stats['review_count'])
     
     context = {
         'product': product,
         'related_products': related_products,
-        'reviews': reviews,
-        'average_rating': average_rating,
-        'user_has_reviewed': user_has_reviewed,
+        'reviews': reviews_page.object_list,
+        'reviews_page': reviews_page,
+        'review_count': review_stats['review_count'],
+        'average_rating': review_stats['average_rating'],
+        'user_has_reviewed': ReviewService.user_has_reviewed(product.id, request.user),
+        'bought_before': PurchaseHistoryService.has_purchased(request.user, product.id),
     }
     return render(request, 'store/product/detail.html', context)
 
 
+@anonymous_page_cache()
+@replica_reads
 def home(request):
     if hasattr(request.user, 'profile') and request.user.profile.is_seller:
         from django.contrib import messages
         messages.error(request, 'Sellers cannot access the main store.')
         return redirect('accounts:seller_dashboard')
     
-    # Cache home page data
-    new_arrivals = cache.get('home_new_arrivals')
-    if new_arrivals is None:
-        new_arrivals = Product.objects.filter(
+    # Cache home page data (compact read models, see store/read_models.py)
+    new_arrivals = read_models.get_or_build(
+        'home_new_arrivals', ProductCard,
+        lambda: read_models.cards(Product.objects.filter(
             major_category='new_arrivals',
-            available=True,
-            approved=True,
-            seller__seller_profile__approval_status='approved'
-        ).select_related('category', 'seller').order_by('-created')[:8]
-        cache.set('home_new_arrivals', list(new_arrivals), 60 * 15)  # Cache for 15 minutes
-    
-    featured_products = cache.get('home_featured_products')
-    if featured_products is None:
-        featured_products = Product.objects.filter(
+            is_listable=True
+        ).order_by('-created')[:8]),
+        60 * 15,
+    )  # Cache for 15 minutes
+    
+    featured_products = read_models.get_or_build(
+        'home_featured_products', ProductCard,
+        lambda: read_models.cards(Product.objects.filter(
             major_category='featured',
-            available=True,
-            approved=True,
-            seller__seller_profile__approval_status='approved'
-        ).select_related('category', 'seller').order_by('-created')[:8]
-        cache.set('home_featured_products', list(featured_products), 60 * 15)  # Cache for 15 minutes
-    
-    best_selling_products = cache.get('home_best_selling_products')
-    if best_selling_products is None:
-        best_selling_products = Product.objects.filter(
+            is_listable=True
+        ).order_by('-created')[:8]),
+        60 * 15,
+    )  # Cache for 15 minutes
+    
+    best_selling_products = read_models.get_or_build(
+        'home_best_selling_products', ProductCard,
+        lambda: read_models.cards(Product.objects.filter(
             major_category='best_selling',
-            available=True,
-            approved=True,
-            seller__seller_profile__approval_status='approved'
-        ).select_related('category', 'seller').order_by('-created')[:8]
-        cache.set('home_best_selling_products', list(best_selling_products), 60 * 15)  # Cache for 15 minutes
+            is_listable=True
+        ).order_by('-created')[:8]),
+        60 * 15,
+    )  # Cache for 15 minutes
     
-    categories = cache.get('home_categories')
-    if categories is None:
-        categories = Category.objects.all()[:6]
-        cache.set('home_categories', list(categories), 60 * 60)  # Cache for 1 hour
+    categories = read_models.get_or_build(
+        'home_categories', CategoryLink,
+        lambda: read_models.category_links(Category.objects.all()[:6]),
+        60 * 60,
+    )  # Cache for 1 hour
 
     context = {
         'new_arrivals': new_arrivals,
@@ -277,10 +338,9 @@ def home(request):
 
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.core.mail import send_mail
 from django.conf import settings
 import json
-from .models import Lead
+from .services import LeadService
 
 
 @csrf_exempt
@@ -292,51 +352,18 @@ def submit_lead(request):
             name = data.get('name', '').strip()
             phone = data.get('phone', '').strip()
             
-            if not name or not phone:
-                return JsonResponse({
-                    'success': False, 
-                    'message': 'Please provide both name and phone number.'
-                })
+            error = LeadService.validate(name, phone)
+            if error:
+                return JsonResponse({'success': False, 'message': error})
             
-            # Create lead record
-            lead = Lead.objects.create(
-                name=name,
-                mobile=phone
-            )
+            if LeadService.is_rate_limited(request, phone):
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Too many requests. Please try again later.'
+                }, status=429)
             
-            # Send email to admin
-            try:
-                subject = f'New Lead: {name} - 10% Discount Offer'
-                message = f'''
-New lead has been submitted from the discount popup:
-
-Name: {name}
-Mobile: {phone}
-Date: {lead.created.strftime("%Y-%m-%d %H:%M:%S")}
-
-This lead is interested in the 10% discount offer.
-You can view this lead in the admin dashboard.
-                '''
-                
-                # Get admin email from settings or use default
-                admin_email = getattr(settings, 'ADMIN_EMAIL', settings.DEFAULT_FROM_EMAIL)
-                
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [admin_email],
-                    fail_silently=False,
-                )
-                
-                lead.email_sent = True
-                lead.save()
-                
-            except Exception as e:
-                # Log error but don't fail the request
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.error(f'Error sending lead email: {str(e)}')
+            # Deduplicated insert; admins are notified by the periodic lead digest
+            LeadService.capture(name, phone)
             
             return JsonResponse({
                 'success': True,
@@ -349,6 +376,7 @@ You can view this lead in the admin dashboard.
                 'message': 'Invalid data format.'
             })
         except Exception as e:
+            logger.error(f'Error in submit_lead: {str(e)}')
             return JsonResponse({
                 'success': False,
                 'message': 'Something went wrong. Please try again.'
@@ -595,6 +623,7 @@ def admin_add_product(request):
 
 
 @login_required
+@replica_reads
 def manage_sellers(request):
     """View for superuser to manage all sellers"""
     if not request.user.is_superuser:
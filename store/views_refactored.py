@@ -10,6 +10,7 @@ from django.http import HttpRequest, HttpResponse
 from utils.decorators import customer_required
 from utils.logging_config import get_logger, log_view_execution
 from .services import ProductService, CategoryService, HomePageService
+from .read_models import ProductDetail
 
 logger = get_logger(__name__)
 
@@ -142,7 +143,7 @@ def product_detail(request: HttpRequest, slug: str) -> HttpResponse:
         user_has_reviewed = review_stats['reviews'].filter(user=request.user).exists()
     
     context = {
-        'product': product,
+        'product': ProductDetail.from_product(product),
         'related_products': related_products,
         'average_rating': review_stats['average_rating'],
         'total_reviews': review_stats['total_reviews'],
@@ -0,0 +1,195 @@
+"""
+Stampede-safe cache reads for expensive, shared keys (home sections,
+product detail, related products, category lists).
+
+get_or_compute() stores each value in an envelope with its logical expiry
+and the time it took to compute, and keeps it in the cache for a grace
+period after that expiry:
+
+- Probabilistic early refresh ("XFetch"): shortly before expiry, a request
+  may recompute the value early; the closer to expiry and the slower the
+  computation, the likelier. Hot keys are refreshed before they expire.
+- Per-key recompute lock: only the request that wins cache.add() on the
+  lock key recomputes. Everyone else keeps serving the current value.
+- Stale-while-revalidate: after the logical expiry the stale value is still
+  served (for up to STALE_GRACE seconds) while the lock holder recomputes.
+- TTL jitter: timeouts are spread by +/-JITTER so keys written together do
+  not all expire together.
+
+Explicitly deleted keys (signal invalidation) have no stale value; the first
+request recomputes while the others briefly wait for it (LOCK_WAIT) before
+falling back to computing themselves.
+
+Keys starting with one of settings.LOCAL_CACHE_PREFIXES are additionally
+kept in a small per-process LRU (local_cache) for up to LOCAL_CACHE_TTL
+seconds, saving a Redis round-trip and unpickle per read. invalidate()
+bumps a shared generation key; each process compares it at most every
+LOCAL_CACHE_CHECK_INTERVAL seconds and drops its local entries when it
+changed, so other workers see invalidations within that interval.
+"""
+import math
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics as prometheus
+
+BETA = 1.0  # > 1 refreshes earlier, < 1 later
+JITTER = 0.1
+STALE_GRACE = 60 * 5
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 0.5
+LOCK_POLL = 0.05
+GENERATION_KEY = 'local_cache_generation'
+_MISSING = object()
+
+
+class LocalCache:
+    """Thread-safe bounded LRU with per-entry expiry and a shared generation check."""
+
+    def __init__(self):
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self._checked_at = 0.0
+
+    def _sync_generation(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < settings.LOCAL_CACHE_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        generation = cache.get(GENERATION_KEY)
+        if generation is None:
+            cache.add(GENERATION_KEY, uuid.uuid4().hex, None)
+            generation = cache.get(GENERATION_KEY)
+        if generation != self._generation:
+            self.clear()
+            self._generation = generation
+
+    def get(self, key: str) -> Any:
+        self._sync_generation()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.LOCAL_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalCache()
+
+
+def _is_local(key: str) -> bool:
+    return settings.LOCAL_CACHE_ENABLED and key.startswith(tuple(settings.LOCAL_CACHE_PREFIXES))
+
+
+def jittered(timeout: int, jitter: float = JITTER) -> int:
+    """Spread a timeout by +/- jitter (a fraction of it)."""
+    return max(1, int(timeout * random.uniform(1 - jitter, 1 + jitter)))
+
+
+def _lock_key(key: str) -> str:
+    return f'{key}:lock'
+
+
+def _should_refresh(expires_at: float, delta: float, beta: float) -> bool:
+    # XFetch: -log(U) is exponential, so early refreshes become likely only near expiry
+    return time.time() - delta * beta * math.log(random.random() or 1e-12) >= expires_at
+
+
+def _compute_and_store(key: str, compute: Callable[[], Any], timeout: int) -> Any:
+    started = time.monotonic()
+    value = compute()
+    delta = time.monotonic() - started
+    ttl = jittered(timeout)
+    cache.set(key, (value, time.time() + ttl, delta), ttl + STALE_GRACE)
+    return value
+
+
+def get_or_compute(key: str, compute: Callable[[], Any], timeout: int, beta: float = BETA) -> Any:
+    """
+    Return the cached value for key, recomputing it without a stampede.
+
+    Hot keys (LOCAL_CACHE_PREFIXES) are served from the in-process tier first.
+
+    Args:
+        key: Cache key (invalidate(key) drops it everywhere).
+        compute: Zero-argument callable producing the value. Exceptions
+            (e.g. Http404) propagate and nothing is cached.
+        timeout: Nominal freshness in seconds (jittered).
+        beta: Early-refresh aggressiveness.
+
+    Returns:
+        The cached or freshly computed value.
+    """
+    if not _is_local(key):
+        return _get_or_compute_shared(key, compute, timeout, beta)
+    value = local_cache.get(key)
+    if value is not _MISSING:
+        prometheus.CACHE_REQUESTS.inc(family=prometheus.cache_key_family(key), result='local_hit')
+        return value
+    value = _get_or_compute_shared(key, compute, timeout, beta)
+    local_cache.set(key, value, min(timeout, settings.LOCAL_CACHE_TTL))
+    return value
+
+
+def invalidate(*keys: str) -> None:
+    """
+    Drop keys from the shared cache and from every process's local tier.
+
+    Use instead of cache.delete() for keys read through get_or_compute().
+    """
+    cache.delete_many(keys)
+    if any(_is_local(key) for key in keys):
+        for key in keys:
+            local_cache.delete(key)
+        cache.set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def _get_or_compute_shared(key: str, compute: Callable[[], Any], timeout: int, beta: float) -> Any:
+    envelope = cache.get(key)
+    if envelope is not None:
+        value, expires_at, delta = envelope
+        if not _should_refresh(expires_at, delta, beta):
+            return value
+        if not cache.add(_lock_key(key), 1, LOCK_TIMEOUT):
+            return value  # Someone else is refreshing; serve the current (possibly stale) value
+    elif not cache.add(_lock_key(key), 1, LOCK_TIMEOUT):
+        # Cold key being computed elsewhere: wait briefly for it instead of piling on
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL)
+            envelope = cache.get(key)
+            if envelope is not None:
+                return envelope[0]
+        return _compute_and_store(key, compute, timeout)
+
+    try:
+        return _compute_and_store(key, compute, timeout)
+    finally:
+        cache.delete(_lock_key(key))
@@ -0,0 +1,148 @@
+"""
+Database connection management and read-replica routing.
+
+Counts connection opens per worker process (a persistent-connection setup
+should open roughly one per worker/thread, not one per request) and offers
+an optional warm-up so the first request does not pay connection setup.
+
+ReplicaRouter sends reads to the 'replica' alias (when configured) only
+inside an explicit replica scope (@replica_reads / use_replica()), only for
+REPLICA_APP_LABELS, and never once the current request or session has
+written (see ReplicaPinningMiddleware) or inside use_primary().
+"""
+import contextvars
+import logging
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+DB_CONNECTIONS_OPENED = registry.counter(
+    'db_connections_opened_total', 'Database connections opened, by alias and worker pid')
+
+
+@receiver(connection_created)
+def count_connection_opened(sender, connection, **kwargs):
+    DB_CONNECTIONS_OPENED.inc(alias=connection.alias, pid=os.getpid())
+
+
+def warm_up_connections() -> None:
+    """
+    Open (and health-check) a connection for every configured alias.
+
+    Call once per worker process, after forking. With gunicorn --preload this
+    would open the socket in the master and share it with every worker, so
+    keep DB_WARMUP off in that setup.
+    """
+    for alias in connections:
+        try:
+            connections[alias].ensure_connection()
+        except Exception as e:
+            logger.warning(f'Database warm-up failed for {alias}: {str(e)}')
+
+
+REPLICA = 'replica'
+# Catalog/analytics apps whose reads may lag; auth, sessions and accounts always use the primary
+REPLICA_APP_LABELS = frozenset({'store', 'blog', 'reviews', 'orders'})
+
+DB_READS_ROUTED = registry.counter('db_reads_routed_total', 'Router read decisions by target alias')
+
+
+@dataclass
+class RoutingState:
+    """Per-request routing flags, set up by ReplicaPinningMiddleware."""
+    pinned: bool = False  # Session wrote recently (cookie); read your own writes
+    wrote: bool = False  # This request has written
+
+
+_request_state: contextvars.ContextVar = contextvars.ContextVar('db_routing_state', default=None)
+_replica_scope: contextvars.ContextVar = contextvars.ContextVar('db_replica_scope', default=False)
+_force_primary: contextvars.ContextVar = contextvars.ContextVar('db_force_primary', default=False)
+
+
+@contextmanager
+def use_replica():
+    """Allow replica reads for the enclosed block (subject to pinning)."""
+    token = _replica_scope.set(True)
+    try:
+        yield
+    finally:
+        _replica_scope.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Force every read in the enclosed block to the primary."""
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+def replica_reads(view_func: Callable) -> Callable:
+    """
+    Decorator for read-only views/services that tolerate replication lag.
+    
+    Usage:
+        @replica_reads
+        def product_list(request):
+            ...
+    """
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        with use_replica():
+            return view_func(*args, **kwargs)
+    return wrapper
+
+
+def primary_db(view_func: Callable) -> Callable:
+    """Decorator forcing all reads in a view/function to the primary."""
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        with use_primary():
+            return view_func(*args, **kwargs)
+    return wrapper
+
+
+def replica_configured() -> bool:
+    return REPLICA in settings.DATABASES
+
+
+class ReplicaRouter:
+    """Route scoped catalog/analytics reads to the replica; everything else to default."""
+    
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        if not (_replica_scope.get() and replica_configured()) or _force_primary.get():
+            return None
+        state = _request_state.get()
+        if state and (state.pinned or state.wrote):
+            DB_READS_ROUTED.inc(alias='default', reason='pinned')
+            return None
+        if model._meta.app_label not in REPLICA_APP_LABELS:
+            return None
+        DB_READS_ROUTED.inc(alias=REPLICA, reason='scope')
+        return REPLICA
+    
+    def db_for_write(self, model, **hints) -> str:
+        state = _request_state.get()
+        if state:
+            state.wrote = True
+        return 'default'
+    
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        # Same data on both aliases
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        return db != REPLICA
@@ -65,3 +65,21 @@ def profile_required(view_func: Callable) -> Callable:
         return view_func(request, *args, **kwargs)
     return wrapper
 
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    Decorator to declare the maximum number of SQL queries a view may issue.
+    
+    Enforced by utils.middleware.RequestMetricsMiddleware and takes precedence
+    over settings.QUERY_BUDGETS.
+    
+    Usage:
+        @query_budget(15)
+        def my_view(request):
+            ...
+    """
+    def decorator(view_func: Callable) -> Callable:
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
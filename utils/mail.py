@@ -0,0 +1,30 @@
+"""
+Email backend wrapper that records delivery latency in utils.metrics.
+"""
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .metrics import track_provider_call
+
+
+class InstrumentedEmailBackend(BaseEmailBackend):
+    """
+    Delegate to settings.EMAIL_DELIVERY_BACKEND and time each send.
+
+    Reported as provider "smtp" in provider_request_duration_seconds.
+    """
+
+    def __init__(self, fail_silently=False, **kwargs):
+        super().__init__(fail_silently=fail_silently)
+        self.backend = get_connection(settings.EMAIL_DELIVERY_BACKEND, fail_silently=fail_silently, **kwargs)
+
+    def open(self):
+        return self.backend.open()
+
+    def close(self):
+        return self.backend.close()
+
+    def send_messages(self, email_messages):
+        with track_provider_call('smtp', 'send_messages'):
+            return self.backend.send_messages(email_messages)
@@ -0,0 +1,241 @@
+"""
+Minimal Prometheus-style metrics registry.
+
+Counters, gauges and histograms are kept in process memory and rendered in
+the Prometheus text exposition format by store.views.MetricsView. With
+several gunicorn workers each worker reports its own series; scrape them
+individually or aggregate with `sum by` in queries.
+"""
+import pickle
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+VALUE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Cache key prefixes reported as separate families; anything else is "other"
+CACHE_KEY_FAMILIES = (
+    'product_detail_',
+    'related_products_',
+    'home_',
+    'all_categories',
+    'product_list_categories',
+    'product_card_',
+    'template.cache.',
+    'coupon_',
+    'review_stats_',
+    'purchased_products_',
+    'local_cache_generation',
+    'page_generation',
+    'page_',
+)
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    body = ','.join('{}="{}"'.format(k, v.replace('\\', '\\\\').replace('"', '\\"')) for k, v in pairs)
+    return '{' + body + '}'
+
+
+class Metric:
+    """Base class for a named metric with labelled series"""
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}'] + self.samples()
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f'{self.name}{_format_labels(k)} {v}' for k, v in sorted(self._values.items())]
+
+
+class Gauge(Metric):
+    """Gauge set directly or computed at scrape time by a callback returning {labels-tuple: value}"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, callback: Optional[Callable[[], Dict]] = None):
+        super().__init__(name, documentation)
+        self._values: Dict[LabelKey, float] = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def samples(self) -> List[str]:
+        if self.callback:
+            for labels, value in self.callback().items():
+                self.set(value, **dict(labels))
+        with self._lock:
+            return [f'{self.name}{_format_labels(k)} {v}' for k, v in sorted(self._values.items())]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, List[float]] = {}  # bucket counts..., +Inf count, sum
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_format_labels(key, [("le", repr(float(bound)))])} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{_format_labels(key, [("le", "+Inf")])} {cumulative}')
+            lines.append(f'{self.name}_count{_format_labels(key)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(key)} {series[-1]}')
+        return lines
+
+
+class Registry:
+    """Holds metrics by name; get-or-create so modules can declare them at import time"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, documentation, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, **kwargs)
+            return metric
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._get_or_create(Counter, name, documentation)
+
+    def gauge(self, name: str, documentation: str, callback: Optional[Callable[[], Dict]] = None) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, callback=callback)
+
+    def histogram(self, name: str, documentation: str, buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, buckets=buckets)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            try:
+                lines.extend(metric.render())
+            except Exception as e:  # A failing gauge callback must not break the scrape
+                lines.append(f'# {metric.name} unavailable: {str(e)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.histogram(
+    'http_request_duration_seconds', 'Request latency by URL name, method and status class')
+REQUEST_QUERIES = registry.histogram(
+    'http_request_db_queries', 'SQL queries issued per request by URL name', buckets=QUERY_COUNT_BUCKETS)
+DB_TIME = registry.counter('db_query_seconds_total', 'Time spent in SQL by URL name')
+CACHE_REQUESTS = registry.counter('cache_requests_total', 'Cache lookups by key family and result (hit/miss)')
+CACHE_VALUE_BYTES = registry.histogram(
+    'cache_value_bytes', 'Pickled size of values written to the cache by key family', buckets=VALUE_SIZE_BUCKETS)
+PROVIDER_LATENCY = registry.histogram(
+    'provider_request_duration_seconds', 'Outbound provider call latency (Cashfree, Shiprocket, SMTP)')
+PROVIDER_ERRORS = registry.counter('provider_errors_total', 'Outbound provider calls that raised')
+
+
+def cache_key_family(key: str) -> str:
+    """
+    Map a cache key to the family reported in cache_requests_total.
+
+    Args:
+        key: Cache key as passed to cache.get.
+
+    Returns:
+        Family prefix or 'other'.
+    """
+    key = str(key)
+    for prefix in CACHE_KEY_FAMILIES:
+        if key.startswith(prefix):
+            return prefix.rstrip('_')
+    return 'other'
+
+
+def observe_cache_value(key: str, value) -> None:
+    """Record the pickled size of a value about to be cached (call on cache misses only)."""
+    size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    CACHE_VALUE_BYTES.observe(size, family=cache_key_family(key))
+
+
+def observe_request(view_name: Optional[str], method: str, status: int, duration: float,
+                    queries: int, db_time: float) -> None:
+    """Record one finished request (called by RequestMetricsMiddleware)."""
+    view = view_name or 'unresolved'
+    REQUEST_LATENCY.observe(duration, view=view, method=method, status=f'{status // 100}xx')
+    REQUEST_QUERIES.observe(queries, view=view)
+    DB_TIME.inc(db_time, view=view)
+
+
+@contextmanager
+def track_provider_call(provider: str, operation: str):
+    """
+    Time an outbound call to a third-party provider.
+
+    Usage:
+        with track_provider_call('cashfree', 'create_order'):
+            response = requests.post(...)
+    """
+    start = time.perf_counter()
+    outcome = 'ok'
+    try:
+        yield
+    except Exception:
+        outcome = 'error'
+        PROVIDER_ERRORS.inc(provider=provider, operation=operation)
+        raise
+    finally:
+        PROVIDER_LATENCY.observe(time.perf_counter() - start, provider=provider, operation=operation, outcome=outcome)
@@ -0,0 +1,222 @@
+"""
+Request instrumentation middleware.
+
+Counts SQL queries, DB time and cache hits/misses for every request,
+reports them through a Server-Timing header and a sampled structured log,
+and enforces per-view query budgets (raising in strict mode, e.g. tests).
+"""
+import contextvars
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.db import connections
+
+from . import db as db_routing
+from . import metrics as prometheus
+
+logger = logging.getLogger(__name__)
+
+_current_metrics: contextvars.ContextVar = contextvars.ContextVar('request_metrics', default=None)
+_MISSING = object()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when a view issues more queries than its budget"""
+
+
+@dataclass
+class RequestMetrics:
+    """Counters collected while a single request is processed"""
+    queries: int = 0
+    db_time: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+
+def get_request_metrics() -> Optional[RequestMetrics]:
+    """
+    Get the metrics object for the request being processed.
+
+    Returns:
+        RequestMetrics instance or None outside of a request.
+    """
+    return _current_metrics.get()
+
+
+class QueryCounter:
+    """connection.execute_wrapper hook that feeds RequestMetrics"""
+
+    def __init__(self, metrics: RequestMetrics):
+        self.metrics = metrics
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.metrics.queries += 1
+            self.metrics.db_time += time.perf_counter() - start
+
+
+def _record_cache_lookup(key, hit: bool) -> None:
+    prometheus.CACHE_REQUESTS.inc(family=prometheus.cache_key_family(key), result='hit' if hit else 'miss')
+    metrics = _current_metrics.get()
+    if metrics:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+def _instrument_cache_class(cache_class) -> None:
+    """
+    Wrap get (and get_many, if the backend overrides it) once to count hits and misses.
+
+    BaseCache.get_many loops over self.get, so wrapping both on a backend that
+    inherits it would count every key twice; in that case only get is wrapped.
+    Extra positional/keyword arguments (e.g. django-redis' ``client=``) are
+    forwarded untouched.
+    """
+    if getattr(cache_class, '_metrics_instrumented', False):
+        return
+    original_get = cache_class.get
+    original_get_many = cache_class.get_many
+
+    def get(self, key, default=None, *args, **kwargs):
+        value = original_get(self, key, _MISSING, *args, **kwargs)
+        hit = value is not _MISSING
+        _record_cache_lookup(key, hit)
+        return value if hit else default
+
+    def get_many(self, keys, *args, **kwargs):
+        keys = list(keys)
+        result = original_get_many(self, keys, *args, **kwargs)
+        for key in keys:
+            _record_cache_lookup(key, key in result)
+        return result
+
+    cache_class.get = get
+    if original_get_many is not BaseCache.get_many:
+        cache_class.get_many = get_many
+    cache_class._metrics_instrumented = True
+
+
+class RequestMetricsMiddleware:
+    """
+    Collect per-request query/cache metrics and enforce query budgets.
+
+    Budgets come from settings.QUERY_BUDGETS ({'app:url_name': max_queries})
+    or the @query_budget decorator. With QUERY_BUDGET_STRICT a breach raises
+    QueryBudgetExceeded so the test client fails the test; otherwise it is
+    logged as a warning.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        for alias in settings.CACHES:
+            _instrument_cache_class(type(caches[alias]))
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(QueryCounter(metrics)))
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        duration = time.perf_counter() - start
+
+        if getattr(settings, 'SERVER_TIMING_ENABLED', False):
+            response['Server-Timing'] = self._server_timing(metrics, duration)
+
+        budget, view_name = self._budget_for(request)
+        prometheus.observe_request(
+            view_name, request.method, response.status_code, duration, metrics.queries, metrics.db_time
+        )
+        over_budget = budget is not None and metrics.queries > budget
+        sample_rate = getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 0.0)
+        if over_budget or (sample_rate and random.random() < sample_rate):
+            self._log(request, response, metrics, duration, view_name, budget, over_budget)
+
+        if over_budget and getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(
+                f'{view_name} issued {metrics.queries} queries (budget {budget}) for {request.path}'
+            )
+        return response
+
+    @staticmethod
+    def _server_timing(metrics: RequestMetrics, duration: float) -> str:
+        return ', '.join([
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+            f'cache;desc="{metrics.cache_hits} hits {metrics.cache_misses} misses"',
+            f'app;dur={duration * 1000:.1f}',
+        ])
+
+    @staticmethod
+    def _budget_for(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return None, None
+        budget = getattr(match.func, 'query_budget', None)
+        if budget is None:
+            budget = getattr(settings, 'QUERY_BUDGETS', {}).get(match.view_name)
+        return budget, match.view_name
+
+    @staticmethod
+    def _log(request, response, metrics, duration, view_name, budget, over_budget):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'queries': metrics.queries,
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+            'query_budget': budget,
+        }
+        if over_budget:
+            logger.warning(f'Query budget exceeded: {json.dumps(record)}')
+        else:
+            logger.info(f'Request metrics: {json.dumps(record)}')
+
+
+class ReplicaPinningMiddleware:
+    """
+    Read-your-writes for replica routing (utils.db.ReplicaRouter).
+    
+    A request that writes sets a short-lived cookie; while it is present the
+    session's reads stay on the primary, so a customer never sees the
+    replica's slightly older copy of something they just changed.
+    """
+    
+    COOKIE_NAME = 'db_pin'
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        state = db_routing.RoutingState(pinned=self.COOKIE_NAME in request.COOKIES)
+        token = db_routing._request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            db_routing._request_state.reset(token)
+        if state.wrote and db_routing.replica_configured():
+            response.set_cookie(
+                self.COOKIE_NAME, '1', max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 10),
+                httponly=True, samesite='Lax', secure=request.is_secure(),
+            )
+        return response
@@ -0,0 +1,215 @@
+"""
+Full-page cache for anonymous storefront traffic.
+
+Apart from CSRF tokens, home, product_list and product_detail render the
+same HTML for every visitor without a session cookie: no login, no cart,
+no coupon and no pending messages (a "messages" cookie also opts out).
+For those requests @anonymous_page_cache stores the rendered page with
+every token replaced by CSRF_PLACEHOLDER and serves it to later anonymous
+requests without running the view. Pages never set cookies or contain a
+per-visitor value; base.html fills the placeholders and the cart badge
+from cart:session_state once loaded.
+
+Headers:
+    Cache-Control: public, max-age=0, s-maxage=<timeout> when the request was
+        anonymous (a reverse proxy may serve it; browsers revalidate), and
+        private, no-cache otherwise.
+    Vary: Cookie on both, so shared caches never hand the anonymous page to
+        a visitor with a session. Proxies should bypass their cache when the
+        session or messages cookie is present rather than vary on all cookies.
+    ETag: weak hash of the placeholder page; If-None-Match gets a 304.
+
+Cached pages are keyed by host, full path and a generation that
+store.signals and reviews.signals bump on catalog changes
+(bump_generation()), so edits show up on the next request. Changes that
+only one page shows (a product's stock count) use the decorator's
+version callable instead of emptying every page. The generation
+is the time of the last bump, which lets @conditional_page derive
+Last-Modified/ETag validators for anonymous requests from a model
+timestamp and the generation alone, answering 304 before the view runs.
+"""
+import hashlib
+import re
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+GENERATION_KEY = 'page_generation'
+CSRF_PLACEHOLDER = '__csrf_token__'
+# Output of {% csrf_token %}; the product card fragments render the same tag
+CSRF_INPUT_RE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+
+def is_anonymous_request(request) -> bool:
+    """True if the response cannot depend on who is asking (see module docstring)."""
+    return (
+        request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and CookieStorage.cookie_name not in request.COOKIES
+    )
+
+
+def _new_generation() -> str:
+    return str(time.time_ns() // 1000)  # Microseconds, see generation_time()
+
+
+def generation() -> str:
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        # Lost or never set: treat the catalog as changed now
+        value = _new_generation()
+        if not cache.add(GENERATION_KEY, value, None):
+            value = cache.get(GENERATION_KEY, value)
+    return value
+
+
+def generation_time(value: Optional[str] = None) -> datetime:
+    """When the catalog last changed, as far as cached pages are concerned."""
+    value = generation() if value is None else value
+    try:
+        return datetime.fromtimestamp(int(value) / 1_000_000, tz=timezone.utc)
+    except ValueError:
+        return datetime.now(timezone.utc)
+
+
+def bump_generation() -> None:
+    """Drop every cached page (call when catalog data shown on storefront pages changes)."""
+    cache.set(GENERATION_KEY, _new_generation(), None)
+
+
+def page_key(request, version='') -> str:
+    digest = hashlib.md5(f'{request.get_host()}{request.get_full_path()}{version}'.encode()).hexdigest()
+    return f'page_{generation()}_{digest}'
+
+
+def _etag(content: str) -> str:
+    return 'W/"%s"' % hashlib.md5(content.encode()).hexdigest()
+
+
+def _public_response(request, content: str, content_type: str, etag: str, timeout: int) -> HttpResponse:
+    response = get_conditional_response(request, etag=etag) or HttpResponse(content, content_type=content_type)
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=0, s_maxage=timeout)
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def anonymous_page_cache(
+    timeout: int = None, skip_params: Iterable[str] = (), version: Optional[Callable] = None
+) -> Callable:
+    """
+    Cache a storefront view's full response for anonymous visitors.
+
+    Usage:
+        @anonymous_page_cache(skip_params=('q',))
+        def product_list(request):
+            ...
+
+    Args:
+        timeout: Seconds a page is kept (defaults to settings.PAGE_CACHE_TIMEOUT).
+        skip_params: Query parameters that make a request uncached (e.g. free-text search).
+        version: Called with the view's arguments; its result is part of the key,
+            so a page can change without bumping the generation for every page
+            (e.g. the product's updated timestamp after a stock-only save).
+
+    Returns:
+        Decorator for function-based views.
+    """
+    def decorator(view_func: Callable) -> Callable:
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            page_timeout = settings.PAGE_CACHE_TIMEOUT if timeout is None else timeout
+            cacheable = (
+                settings.PAGE_CACHE_ENABLED
+                and is_anonymous_request(request)
+                and not any(request.GET.get(param) for param in skip_params)
+            )
+            if not cacheable:
+                response = view_func(request, *args, **kwargs)
+                patch_cache_control(response, private=True, no_cache=True)
+                patch_vary_headers(response, ('Cookie',))
+                return response
+
+            key = page_key(request, version(request, *args, **kwargs) if version else '')
+            cached = cache.get(key)
+            if cached is not None:
+                return _public_response(request, *cached, page_timeout)
+
+            response = view_func(request, *args, **kwargs)
+            if (
+                response.status_code != 200
+                or response.streaming
+                or response.cookies
+                or request.session.modified
+            ):
+                patch_cache_control(response, private=True, no_cache=True)
+                patch_vary_headers(response, ('Cookie',))
+                return response
+            content = CSRF_INPUT_RE.sub(
+                rf'\g<1>{CSRF_PLACEHOLDER}\g<2>', response.content.decode(response.charset)
+            )
+            # The rendered tokens were replaced, so don't send this visitor a CSRF cookie
+            # either: the page must be identical for everyone. session_state sets it.
+            request.META.pop('CSRF_COOKIE_NEEDS_UPDATE', None)
+            cached = (content, response['Content-Type'], _etag(content))
+            cache.set(key, cached, page_timeout)
+            return _public_response(request, *cached, page_timeout)
+        return wrapper
+    return decorator
+
+
+def conditional_page(updated: Callable[..., Optional[datetime]]) -> Callable:
+    """
+    Answer conditional GETs from anonymous visitors without running the view.
+
+    Validators are derived from the object's own timestamp and the page
+    generation: Last-Modified is the later of the two and the ETag hashes
+    both. Requests with a session are passed through untouched, since their
+    pages depend on who is asking.
+
+    Usage:
+        @conditional_page(_post_updated)
+        def blog_detail(request, slug):
+            ...
+
+    Args:
+        updated: Called with the view's arguments; returns the timestamp of
+            the data the page shows, or None to skip validation (e.g. the
+            object does not exist and the view should 404).
+
+    Returns:
+        Decorator for function-based views. Place it outside
+        @anonymous_page_cache, whose content ETag is kept on responses.
+    """
+    def decorator(view_func: Callable) -> Callable:
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not is_anonymous_request(request):
+                return view_func(request, *args, **kwargs)
+            timestamp = updated(request, *args, **kwargs)
+            if timestamp is None:
+                return view_func(request, *args, **kwargs)
+            current = generation()
+            last_modified = int(max(timestamp, generation_time(current)).timestamp())
+            etag = 'W/"%s"' % hashlib.md5(f'{current}:{timestamp.timestamp()}'.encode()).hexdigest()
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.headers.setdefault('ETag', etag)
+                response.headers.setdefault('Last-Modified', http_date(last_modified))
+                if not response.has_header('Cache-Control'):
+                    patch_cache_control(response, public=True, max_age=0)  # Always revalidate
+                patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,40 @@
+"""
+Cache-backed token-bucket rate limiting.
+
+Buckets live in the default cache, so limits are shared between workers
+when the cache is Redis and per-process with LocMemCache. The read/update
+is not atomic; under heavy contention a few extra requests may slip
+through, which is acceptable for abuse protection.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def allow(key: str, capacity: int, refill_seconds: float) -> bool:
+    """
+    Take one token from a bucket, refilling one token every refill_seconds.
+
+    Args:
+        key: Bucket identifier, e.g. 'lead_ip_1.2.3.4'.
+        capacity: Maximum burst size.
+        refill_seconds: Seconds needed to regain one token.
+
+    Returns:
+        True if the request is allowed, False if the bucket is empty.
+    """
+    cache_key = f'ratelimit_{key}'
+    now = time.time()
+    tokens, updated = cache.get(cache_key) or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) / refill_seconds)
+    allowed = tokens >= 1
+    if allowed:
+        tokens -= 1
+    # Expire once the bucket would be full again anyway
+    cache.set(cache_key, (tokens, now), int(capacity * refill_seconds) + 1)
+    return allowed
+
+
+def client_ip(request) -> str:
+    """Client address as seen by Django (configure the proxy to set REMOTE_ADDR)."""
+    return request.META.get('REMOTE_ADDR', '')
@@ -0,0 +1,125 @@
+"""
+Hybrid session engine (SESSION_ENGINE = 'utils.sessions').
+
+Anonymous visitors without a cart keep their (small) session in a signed
+cookie, so browsing the catalogue never writes a django_session row. As
+soon as a session needs server-side state - a logged-in user, a non-empty
+cart, or data too large for a cookie - it is moved to the server store
+named by SESSION_SERVER_ENGINE (cached_db when a shared cache such as Redis
+is configured, plain db otherwise) and stays there.
+
+Cookie-mode session keys are signing.dumps() payloads, which always contain
+':'; server keys are 32 lowercase alphanumerics, so the two never clash.
+Cookie-mode sessions cannot be revoked server-side, which is why anything
+tied to an account or an order is kept on the server.
+
+CrawlerAwareSessionMiddleware replaces Django's SessionMiddleware and skips
+session handling altogether for crawler GET/HEAD requests without a
+session cookie.
+"""
+import re
+from functools import lru_cache
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core import signing
+
+ServerSessionStore = import_module(
+    getattr(settings, 'SESSION_SERVER_ENGINE', 'django.contrib.sessions.backends.db')
+).SessionStore
+
+SIGNING_SALT = 'utils.sessions'
+
+
+def is_cookie_key(session_key) -> bool:
+    return bool(session_key) and ':' in session_key
+
+
+class SessionStore(ServerSessionStore):
+    """Signed-cookie session until the data needs the server store (see module docstring)."""
+
+    def _needs_server(self, data: dict) -> bool:
+        if self.session_key and not is_cookie_key(self.session_key):
+            return True  # Already server-side; never downgrade
+        if '_auth_user_id' in data or data.get(settings.CART_SESSION_ID):
+            return True
+        return len(self._encode_cookie(data)) > getattr(settings, 'SESSION_COOKIE_MAX_BYTES', 2048)
+
+    def _encode_cookie(self, data: dict) -> str:
+        return signing.dumps(data, compress=True, salt=SIGNING_SALT, serializer=self.serializer)
+
+    def load(self):
+        if not is_cookie_key(self.session_key):
+            return super().load()
+        try:
+            return signing.loads(
+                self.session_key, salt=SIGNING_SALT, serializer=self.serializer,
+                max_age=self.get_session_cookie_age(),
+            )
+        except signing.BadSignature:
+            self._session_key = None
+            return {}
+
+    def exists(self, session_key):
+        if is_cookie_key(session_key):
+            return False
+        return super().exists(session_key)
+
+    def save(self, must_create=False):
+        data = self._get_session(no_load=must_create)
+        if not self._needs_server(data):
+            self._session_key = self._encode_cookie(data)
+            return
+        if is_cookie_key(self.session_key):
+            # Promote to the server store under a fresh key
+            self._session_key = None
+            return self.create()
+        return super().save(must_create=must_create)
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        if is_cookie_key(key):
+            # Nothing stored server-side; the middleware drops the cookie
+            if session_key is None:
+                self._session_key = None
+            return
+        return super().delete(session_key)
+
+
+@lru_cache(maxsize=1)
+def _crawler_pattern(pattern: str):
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def is_crawler(request) -> bool:
+    """True if the User-Agent matches settings.CRAWLER_USER_AGENT_PATTERN."""
+    pattern = getattr(settings, 'CRAWLER_USER_AGENT_PATTERN', '')
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    return bool(pattern and user_agent) and bool(_crawler_pattern(pattern).search(user_agent))
+
+
+class CrawlerAwareSessionMiddleware(SessionMiddleware):
+    """
+    SessionMiddleware that does no session work for crawlers.
+
+    Cacheable requests (GET/HEAD) from a crawler that sent no session cookie
+    get an empty, never-saved session: no session row, no Set-Cookie and no
+    "Vary: Cookie". Everyone else is handled exactly like SessionMiddleware.
+    """
+
+    def process_request(self, request):
+        if (
+            request.method in ('GET', 'HEAD')
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and is_crawler(request)
+        ):
+            request.session = self.SessionStore()
+            request.session_skipped = True
+            return
+        super().process_request(request)
+
+    def process_response(self, request, response):
+        if getattr(request, 'session_skipped', False):
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,211 @@
+"""
+Static asset pipeline: minified, content-hashed, precompressed files.
+
+CompressedManifestStaticFilesStorage (settings.STORAGES['staticfiles'])
+extends Django's ManifestStaticFilesStorage. During collectstatic it:
+
+1. writes content-hashed copies and staticfiles.json (Django's manifest);
+2. minifies the hashed CSS and JS (rcssmin/rjsmin when installed; otherwise
+   CSS comments and whitespace are stripped conservatively and JS is left
+   as is);
+3. stores .gz (and .br when the brotli package is installed) next to each
+   hashed text asset, keeping them only when they save at least 5%.
+
+serve() is the matching static handler for deployments without Cloudinary
+or a front-end web server (settings.STATIC_SERVE_LOCAL): it picks the best
+precompressed variant the client accepts and sends hashed files with a
+one-year immutable Cache-Control. Videos are not touched here; see the
+optimize_videos management command.
+"""
+import gzip
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.xml', '.html', '.map', '.ttf', '.eot', '.ico')
+MIN_COMPRESS_SIZE = 1024
+MIN_SAVING = 0.05
+# Preferred first; suffix of the precompressed file
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')  # ManifestStaticFilesStorage names: style.<12 hex>.css
+
+# Strings are matched first so nothing inside them is touched; /*! ... */ license comments are kept
+_CSS_TOKEN_RE = re.compile(
+    r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|/\*!.*?\*/)|/\*.*?\*/|\s*([{};,])\s*|\s+''',
+    re.S,
+)
+
+
+def _css_token(match) -> str:
+    if match.group(1):
+        return match.group(1)
+    if match.group(2):
+        return match.group(2)
+    return '' if match.group(0).startswith('/*') else ' '
+
+
+def minify_css(css: str) -> str:
+    if rcssmin is not None:
+        return rcssmin.cssmin(css, keep_bang_comments=True)
+    return _CSS_TOKEN_RE.sub(_css_token, css).strip()
+
+
+def minify_js(js: str) -> str:
+    if rjsmin is not None:
+        return rjsmin.jsmin(js, keep_bang_comments=True)
+    return js  # No safe minifier without a JS parser
+
+
+def _minify_file(path: str) -> bool:
+    name = os.path.basename(path)
+    if '.min.' in name:
+        return False
+    if name.endswith('.css'):
+        minify = minify_css
+    elif name.endswith('.js'):
+        minify = minify_js
+    else:
+        return False
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    minified = minify(source)
+    if len(minified) >= len(source):
+        return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(minified)
+    return True
+
+
+def precompress(path: str) -> list:
+    """
+    Write .gz/.br variants of a file that compress well.
+
+    Args:
+        path: Absolute path of the (hashed) file.
+
+    Returns:
+        Paths of the variants written.
+    """
+    if not path.endswith(COMPRESSIBLE_EXTENSIONS):
+        return []
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return []
+    variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(data, quality=11)))
+    written = []
+    for suffix, compressed in variants:
+        if len(compressed) <= len(data) * (1 - MIN_SAVING):
+            with open(path + suffix, 'wb') as f:
+                f.write(compressed)
+            written.append(path + suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also minifies and precompresses the hashed files (see module docstring)."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+
+        # Django hashes the source files, so the hashed copies are minified afterwards;
+        # the hash still changes exactly when the source does.
+        minified = sum(_minify_file(self.path(name)) for name in hashed_names)
+        compressed = sum(len(precompress(self.path(name))) for name in hashed_names)
+        logger.info(
+            'Static assets: %d minified, %d hashed, %d precompressed variants%s',
+            minified, len(hashed_names), compressed, '' if brotli else ' (gzip only, brotli not installed)',
+        )
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+
+        def keep_missing(matchobj):
+            try:
+                return converter(matchobj)
+            except ValueError:
+                # A vendored stylesheet references a file that is not shipped; leave the URL as is
+                logger.warning('%s references a missing file: %s', name, matchobj.group(0))
+                return matchobj.group(0)
+        return keep_missing
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Missing from static/, or nothing collected yet (tests, runserver):
+            # fall back to the plain name instead of failing the page
+            if self.hashed_files:
+                logger.warning('Static file %s is not in the manifest', name)
+            return name
+
+
+def serve(request, path):
+    """
+    Serve a file from STATIC_ROOT, preferring a precompressed variant.
+
+    Usage (ecommerce/urls.py, when settings.STATIC_SERVE_LOCAL):
+        re_path(r'^static/(?P<path>.*)$', staticfiles.serve)
+    """
+    name = posixpath.normpath(path).lstrip('/')
+    fullpath = safe_join(settings.STATIC_ROOT, name)
+    if not os.path.isfile(fullpath):
+        raise Http404('Static file not found')
+
+    encoding = None
+    accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    for candidate, suffix in ENCODINGS:
+        if candidate in accept_encoding and os.path.isfile(fullpath + suffix):
+            fullpath, encoding = fullpath + suffix, candidate
+            break
+
+    stat = os.stat(fullpath)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), int(stat.st_mtime)):
+        response = HttpResponseNotModified()
+    else:
+        content_type, _ = mimetypes.guess_type(name)
+        response = FileResponse(open(fullpath, 'rb'), content_type=content_type or 'application/octet-stream')
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        if encoding:
+            response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if HASHED_NAME_RE.search(name):
+        patch_cache_control(response, public=True, max_age=settings.STATIC_HASHED_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.STATIC_PLAIN_MAX_AGE)
+    return response